@@ -5,16 +5,22 @@ from loguru import logger
 from scipy import stats
 import numpy as np
 
+from pydss.dssElement import set_parameters
 from pydss.simulation_input_models import SimulationSettingsModel
 from pydss.utils import utils
 
 class MonteCarloSim:
 
-    def __init__(self, settings: SimulationSettingsModel, dssPaths, dssObjects, dssObjectsByClass):
+    def __init__(self, settings: SimulationSettingsModel, dssPaths, dssObjects, dssObjectsByClass,
+                 seed=None):
         self.__dssPaths = dssPaths
         self.__dssObjects = dssObjects
         self._settings = settings
         self.__dssObjectsByClass = dssObjectsByClass
+        self._seed = get_seed(settings) if seed is None else seed
+        self._num_scenarios = 0
+        # property to element name to (element, value before the first scenario)
+        self._original_values = {}
 
         try:
             MCfile = os.path.join(self._settings.project.active_scenario, 'Monte_Carlo', 'MonteCarloSettings.toml')
@@ -27,7 +33,27 @@ class MonteCarloSim:
             raise
         return
 
-    def Create_Scenario(self):
+    @property
+    def seed(self):
+        """Return the seed from which the seed of each scenario is derived."""
+        return self._seed
+
+    def Create_Scenario(self, scenario_number=None):
+        """Apply the random values of one scenario to the circuit. Restores
+        the properties changed by the previous scenario first, so scenarios
+        are independent of each other and of the order in which they run.
+
+        Parameters
+        ----------
+        scenario_number : int | None
+            Selects the random values. Defaults to the number of scenarios
+            created so far.
+
+        """
+        if scenario_number is None:
+            scenario_number = self._num_scenarios
+        self.Restore()
+        random_state = np.random.default_rng([self._seed, scenario_number])
         for key, Properties in self.__MCsettingsDict.items():
             if Properties['Class'] in self.__dssObjectsByClass:
                 Elements = self.__dssObjectsByClass[Properties['Class']]
@@ -39,21 +65,50 @@ class MonteCarloSim:
 
                 dist = getattr(stats, Properties['Distribution'].replace(' ', ''))
                 if not Properties['isList']:
-                    MCsamples = dist.rvs(*distParams, size=NumElms)
+                    MCsamples = dist.rvs(*distParams, size=NumElms, random_state=random_state)
                     if Properties['isInteger']:
                         MCsamples = [int(round(x)) for x in MCsamples]
-                    for ElmName, Value in zip(ElmNames,MCsamples):
-                        Elements[ElmName].SetParameter(Properties['Property'], Value)
+                    self._set_parameters([Elements[x] for x in ElmNames], Properties['Property'], MCsamples)
                 else:
-                    MCsamples = dist.rvs(*distParams, size=NumElms * Properties['ListLength'])
+                    MCsamples = dist.rvs(*distParams, size=NumElms * Properties['ListLength'],
+                                         random_state=random_state)
                     if Properties['isInteger']:
                         MCsamples = [int(round(x)) for x in MCsamples]
                     MCsamples = np.reshape(MCsamples, (NumElms, Properties['ListLength']))
-                    for ElmName, Value in zip(ElmNames, MCsamples):
-                        Value = str(Value).replace('\n', '').replace('\r', '').replace('[ ', '[').replace(' ]', ']')
-                        Elements[ElmName].SetParameter(Properties['Property'], Value)
+                    Values = [
+                        str(x).replace('\n', '').replace('\r', '').replace('[ ', '[').replace(' ]', ']')
+                        for x in MCsamples
+                    ]
+                    self._set_parameters([Elements[x] for x in ElmNames], Properties['Property'], Values)
             else:
                 logger.warning(Properties['Class'] + ' class not present in object dictionary.')
+        self._num_scenarios += 1
         return
 
+    def Restore(self):
+        """Set the properties changed by Create_Scenario back to their original values."""
+        for prop, original_values in self._original_values.items():
+            elements = [x[0] for x in original_values.values()]
+            set_parameters(elements, prop, [x[1] for x in original_values.values()])
+
+    def _set_parameters(self, elements, prop, values):
+        original_values = self._original_values.setdefault(prop, {})
+        for element in elements:
+            if element.FullName not in original_values:
+                original_values[element.FullName] = (element, element.GetParameter(prop))
+        set_parameters(elements, prop, values)
+
+
+def get_seed(settings: SimulationSettingsModel):
+    """Return the configured Monte Carlo seed or generate one.
+
+    Returns
+    -------
+    int
 
+    """
+    seed = settings.monte_carlo.seed
+    if seed is None:
+        seed = np.random.SeedSequence().entropy
+        logger.info("Generated Monte Carlo seed %s", seed)
+    return seed
@@ -41,6 +41,9 @@ class BaseProfileManager(abc.ABC):
     def update(self):
         pass
 
+    def close(self):
+        """Release resources held by the profile manager."""
+
 
 class BaseProfile(abc.ABC):
     def __init__(self, sim_instance, dataset, devices, solver, mapping_dict, logger, **kwargs):
@@ -1,4 +1,5 @@
 from pydss.ProfileManager.base_definitions import BaseProfileManager, BaseProfile
+from pydss.dssElement import set_parameters
 from pydss.ProfileManager.common import PROFILE_TYPES
 from pydss.exceptions import InvalidParameter
 from pydss.common import DATE_FORMAT
@@ -28,6 +29,7 @@ class ProfileManager(BaseProfileManager):
 
     def setup_profiles(self):
         self.Profiles = {}
+        self._matrix = None
         for group, profileMap in self.mapping.items():
             if group in self.store:
                 grp = self.store[group]
@@ -49,8 +51,44 @@ class ProfileManager(BaseProfileManager):
                         ))
             else:
                 self.logger.warning("Group {} not found in the h5 store".format(group))
+
+        profiles = list(self.Profiles.values())
+        self._matrix = self._create_matrix(profiles)
+        for row, profile in enumerate(profiles):
+            profile.set_matrix(self._matrix, row)
+        self._setup_object_values(profiles)
         return
 
+    def _create_matrix(self, profiles):
+        return ProfileMatrix(profiles, self.kwargs.get("bufferSize"))
+
+    def _setup_object_values(self, profiles):
+        # Object settings as arrays so that update can compute all object
+        # values with one vectorized operation.
+        rows = []
+        interpolate = []
+        scale = []
+        objects_by_property = {}
+        for row, profile in enumerate(profiles):
+            prop = decode_attribute(profile.attrs["units"])
+            for objName, obj in profile.Objects.items():
+                settings = profile.valueSettings[objName]
+                index = len(rows)
+                rows.append(row)
+                interpolate.append(settings["interpolate"])
+                mult = settings["multiplier"]
+                scale.append(mult / profile.attrs["max"] if settings["normalize"] else mult)
+                objs, indices = objects_by_property.setdefault(prop, ([], []))
+                objs.append(obj)
+                indices.append(index)
+        self._object_rows = np.array(rows, dtype=int)
+        self._object_interpolate = np.array(interpolate, dtype=bool)
+        self._object_scale = np.array(scale, dtype=float)
+        self._objects_by_property = {
+            prop: (objs, np.array(indices, dtype=int))
+            for prop, (objs, indices) in objects_by_property.items()
+        }
+
     def create_dataset(self, dname, pType, data ,startTime, resolution, units, info):
         grp = self.store[pType]
         if dname not in grp:
@@ -125,11 +163,15 @@ class ProfileManager(BaseProfileManager):
         return
 
     def update(self):
-        results = {}
-        for profileaName, profileObj in self.Profiles.items():
-            result = profileObj.update()
-            results[profileaName] = result
-        return results
+        values, interpolated = self._matrix.get_values(self.solver.GetDateTime())
+        object_values = np.where(
+            self._object_interpolate,
+            interpolated[self._object_rows],
+            values[self._object_rows],
+        ) * self._object_scale
+        for prop, (objs, indices) in self._objects_by_property.items():
+            set_parameters(objs, prop, object_values[indices])
+        return dict(zip(self.Profiles.keys(), values.tolist()))
 
 class Profile(BaseProfile):
 
@@ -144,42 +186,133 @@ class Profile(BaseProfile):
         self.valueSettings = {x['object']: {**self.DEFAULT_SETTINGS, **x} for x in mapping_dict}
 
         self.bufferSize = kwargs["bufferSize"]
-        self.buffer = np.zeros(self.bufferSize)
         self.profile = dataset
         self.neglectYear = kwargs["neglectYear"]
         self.Objects = devices
 
         self.attrs = self.profile.attrs
-        self.sTime = datetime.datetime.strptime(self.attrs["sTime"].decode(), DATE_FORMAT)
-        self.eTime = datetime.datetime.strptime(self.attrs["eTime"].decode(), '%Y-%m-%d %H:%M:%S.%f')
+        self.sTime = datetime.datetime.strptime(decode_attribute(self.attrs["sTime"]), DATE_FORMAT)
+        self.eTime = datetime.datetime.strptime(decode_attribute(self.attrs["eTime"]), '%Y-%m-%d %H:%M:%S.%f')
         self.simRes = solver.GetStepSizeSec()
         self.Time = copy.deepcopy(solver.GetDateTime())
+        self._matrix = None
+        self._row = None
         return
 
+    def set_matrix(self, matrix, row):
+        """Set the matrix that holds the values of this profile in row."""
+        self._matrix = matrix
+        self._row = row
+
     def update_profile_settings(self):
         return
 
     def update(self, updateObjectProperties=True):
         self.Time = copy.deepcopy(self.solver.GetDateTime())
-        if self.Time < self.sTime or self.Time > self.eTime:
-            value = 0
-            value1 = 0
-        else:
-            dT = (self.Time - self.sTime).total_seconds()
-            n = int(dT / self.attrs["resTime"])
-            value = self.profile[n]
-            dT2 = (self.Time - (self.sTime + datetime.timedelta(seconds=int(n * self.attrs["resTime"])))).total_seconds()
-            value1 = self.profile[n] + (self.profile[n+1] - self.profile[n]) * dT2 / self.attrs["resTime"]
+        if self._matrix is None:
+            self.set_matrix(ProfileMatrix([self], self.bufferSize), 0)
+        values, interpolated = self._matrix.get_values(self.Time, rows=[self._row])
+        value = values[0]
         if updateObjectProperties:
-            for objName, obj in self.Objects.items():
-                if self.valueSettings[objName]['interpolate']:
-                    value = value1
+            objValues = []
+            for objName in self.Objects:
+                valueF = interpolated[0] if self.valueSettings[objName]['interpolate'] else value
                 mult = self.valueSettings[objName]['multiplier']
                 if self.valueSettings[objName]['normalize']:
-                    valueF = value / self.attrs["max"] * mult
+                    valueF = valueF / self.attrs["max"] * mult
                 else:
-                    valueF = value * mult
-                obj.SetParameter(self.attrs["units"].decode(), valueF)
+                    valueF = valueF * mult
+                objValues.append(valueF)
+            set_parameters(list(self.Objects.values()), decode_attribute(self.attrs["units"]), objValues)
         return value
 
 
+def decode_attribute(value):
+    """Return a string attribute of a profile as str. h5py returns bytes."""
+    return value.decode() if isinstance(value, bytes) else value
+
+
+class ProfileMatrix:
+    """Holds the values of many profiles in one matrix with a row per profile.
+
+    If buffer_size is set, each row holds a window of buffer_size points that
+    is read from the store when the simulation time moves past it. Otherwise,
+    the profiles are read completely when the matrix is created.
+
+    """
+
+    def __init__(self, profiles, buffer_size=None):
+        self._setup_times(profiles)
+        max_points = int(self._num_points.max()) if profiles else 0
+        if buffer_size:
+            # Interpolation needs two consecutive points in the window.
+            self._window_size = max(2, min(buffer_size, max_points))
+        else:
+            self._window_size = max_points
+        self._data = np.zeros((len(profiles), self._window_size))
+        self._window_starts = np.zeros(len(profiles), dtype=int)
+        for row in range(len(profiles)):
+            self._read_window(row, 0)
+
+    def _setup_times(self, profiles):
+        self._datasets = [x.profile for x in profiles]
+        self._num_points = np.array([len(x) for x in self._datasets], dtype=int)
+        self._reference_time = min((x.sTime for x in profiles), default=None)
+        self._start_seconds = np.array([self._to_seconds(x.sTime) for x in profiles], dtype=float)
+        self._end_seconds = np.array([self._to_seconds(x.eTime) for x in profiles], dtype=float)
+        self._resolution = np.array([x.attrs["resTime"] for x in profiles], dtype=float)
+
+    def _to_seconds(self, time):
+        return (time - self._reference_time).total_seconds()
+
+    def _read_window(self, row, start):
+        end = min(start + self._window_size, self._num_points[row])
+        values = self._datasets[row][start:end]
+        self._data[row, :len(values)] = values
+        # Repeat the last point so that the next-point lookup at the end of the
+        # profile stays in the window.
+        self._data[row, len(values):] = values[-1] if len(values) else 0
+        self._window_starts[row] = start
+
+    def get_values(self, time, rows=None):
+        """Return the values of the profiles at time.
+
+        Parameters
+        ----------
+        time : datetime.datetime
+        rows : list | None
+            Rows of the profiles to return; defaults to all rows.
+
+        Returns
+        -------
+        tuple
+            np.ndarray, np.ndarray: values at the last point at or before time
+            and values interpolated between that point and the next. Both are
+            0 for profiles that do not cover time.
+
+        """
+        rows = np.arange(len(self._datasets)) if rows is None else np.asarray(rows, dtype=int)
+        if len(rows) == 0:
+            return np.zeros(0), np.zeros(0)
+        seconds = self._to_seconds(time) - self._start_seconds[rows]
+        resolution = self._resolution[rows]
+        in_range = (seconds >= 0) & (seconds <= self._end_seconds[rows] - self._start_seconds[rows])
+        last_index = self._num_points[rows] - 1
+        index = np.clip(np.floor(seconds / resolution).astype(int), 0, last_index)
+        next_index = np.minimum(index + 1, last_index)
+        values, next_values = self._read_points(rows, index, next_index, in_range)
+        fraction = (seconds - index * resolution) / resolution
+        interpolated = values + (next_values - values) * fraction
+        values = np.where(in_range, values, 0.0)
+        interpolated = np.where(in_range, interpolated, 0.0)
+        return values, interpolated
+
+    def _read_points(self, rows, index, next_index, in_range):
+        starts = self._window_starts[rows]
+        outside = in_range & ((index < starts) | (next_index >= starts + self._window_size))
+        for row, start in zip(rows[outside], index[outside]):
+            self._read_window(row, start)
+        # Windows are not moved for profiles that do not cover time.
+        offsets = np.where(in_range, index - self._window_starts[rows], 0)
+        next_offsets = np.where(in_range, offsets + next_index - index, 0)
+        return self._data[rows, offsets], self._data[rows, next_offsets]
@@ -0,0 +1,162 @@
+"""Profile store that keeps all profiles in one uncompressed, memory-mapped array.
+
+A store is a directory with two files:
+
+- profiles.npy: the values of all profiles, concatenated in one float64 array.
+- metadata.json: for each profile, the offset and number of points in the array
+  and the attributes of the h5 dataset it was converted from (sTime, eTime,
+  resTime, units, etc.).
+
+The array is opened with numpy.load(mmap_mode="r"). Lookups read only the pages
+that they touch, and all processes that use the same store on a node share the
+pages in the OS page cache. Use convert_h5_store to create a store from an h5
+profile store.
+
+"""
+
+import json
+import os
+
+import h5py
+import numpy as np
+
+from pydss.ProfileManager.base_definitions import BaseProfileManager
+from pydss.ProfileManager.hooks import h5
+from pydss.exceptions import InvalidConfiguration, InvalidParameter
+
+
+PROFILES_FILENAME = "profiles.npy"
+METADATA_FILENAME = "metadata.json"
+STORE_VERSION = 1
+
+
+class ProfileManager(h5.ProfileManager):
+
+    def __init__(self,  sim_instance, solver, options, logger, **kwargs):
+        BaseProfileManager.__init__(self, sim_instance, solver, options, logger, **kwargs)
+        self.Objects = kwargs["objects"]
+        if not os.path.isdir(self.basepath):
+            raise InvalidConfiguration(f"profile store {self.basepath} does not exist")
+        self.logger.info("Loading memory-mapped profile store %s", self.basepath)
+        self.store = MappedProfileStore(self.basepath)
+        self.setup_profiles()
+        return
+
+    def _create_matrix(self, profiles):
+        return MappedProfileMatrix(profiles, self.store.array)
+
+    def create_dataset(self, dname, pType, data, startTime, resolution, units, info):
+        raise InvalidParameter(
+            "memory-mapped profile stores are read-only; add profiles to an h5 store and "
+            "convert it with convert_h5_store"
+        )
+
+    def add_profiles(self, data, name, pType, startTime, resolution_sec=900, units="", info=""):
+        self.create_dataset(name, pType, data, startTime, resolution_sec, units, info)
+
+
+class MappedProfileStore:
+    """Provides access to the profiles in a memory-mapped store by group and name,
+    like an h5py.File."""
+
+    def __init__(self, directory):
+        with open(os.path.join(directory, METADATA_FILENAME)) as f_in:
+            metadata = json.load(f_in)
+        if metadata["version"] != STORE_VERSION:
+            raise InvalidConfiguration(
+                f"unsupported profile store version {metadata['version']} in {directory}"
+            )
+        self.array = np.load(os.path.join(directory, PROFILES_FILENAME), mmap_mode="r")
+        self._groups = {}
+        for path, attrs in metadata["profiles"].items():
+            group, name = path.split("/")
+            self._groups.setdefault(group, {})[name] = MappedProfile(self.array, attrs)
+
+    def __contains__(self, group):
+        return group in self._groups
+
+    def __getitem__(self, group):
+        return self._groups[group]
+
+
+class MappedProfile:
+    """One profile in a memory-mapped store. Supports len, slicing and attrs like
+    an h5py.Dataset."""
+
+    def __init__(self, array, attrs):
+        self.offset = attrs["offset"]
+        self.attrs = attrs
+        self._values = array[self.offset:self.offset + attrs["npts"]]
+
+    def __len__(self):
+        return len(self._values)
+
+    def __getitem__(self, key):
+        return self._values[key]
+
+
+class MappedProfileMatrix(h5.ProfileMatrix):
+    """ProfileMatrix that reads points directly from the memory-mapped array
+    instead of copying the profiles into memory."""
+
+    def __init__(self, profiles, array):
+        self._setup_times(profiles)
+        self._array = array
+        self._offsets = np.array([x.profile.offset for x in profiles], dtype=int)
+
+    def _read_points(self, rows, index, next_index, in_range):
+        # index is clamped to the profile, so this is valid for all rows.
+        offsets = self._offsets[rows]
+        return self._array[offsets + index], self._array[offsets + next_index]
+
+
+def convert_h5_store(h5_filename, directory):
+    """Convert an h5 profile store to a memory-mapped store.
+
+    Parameters
+    ----------
+    h5_filename : str
+        Profile store created by the h5 Profile Manager
+    directory : str
+        Directory for the new store; must not exist.
+
+    """
+    if os.path.exists(directory):
+        raise InvalidParameter(f"{directory} already exists")
+
+    with h5py.File(h5_filename, "r") as store:
+        datasets = []
+        store.visititems(
+            lambda name, item: datasets.append(name) if isinstance(item, h5py.Dataset) else None
+        )
+        os.makedirs(directory)
+        num_points = sum(len(store[x]) for x in datasets)
+        array = np.lib.format.open_memmap(
+            os.path.join(directory, PROFILES_FILENAME),
+            mode="w+",
+            dtype=np.float64,
+            shape=(num_points,),
+        )
+        profiles = {}
+        offset = 0
+        for name in datasets:
+            dataset = store[name]
+            array[offset:offset + len(dataset)] = dataset[:]
+            attrs = {key: _to_json_value(value) for key, value in dataset.attrs.items()}
+            attrs["offset"] = offset
+            attrs["npts"] = len(dataset)
+            profiles[name] = attrs
+            offset += len(dataset)
+        array.flush()
+        del array
+
+    with open(os.path.join(directory, METADATA_FILENAME), "w") as f_out:
+        json.dump({"version": STORE_VERSION, "profiles": profiles}, f_out, indent=2)
+
+
+def _to_json_value(value):
+    if isinstance(value, bytes):
+        return value.decode()
+    if isinstance(value, np.generic):
+        return value.item()
+    return value
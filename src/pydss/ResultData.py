@@ -9,13 +9,15 @@ from loguru import logger
 import pandas as pd
 
 from pydss.unitDefinations import unit_info
+from pydss.column_index import ColumnIndex
 from pydss.common import (
     PV_LOAD_SHAPE_FILENAME,
     PV_PROFILES_FILENAME,
     NODE_NAMES_BY_TYPE_FILENAME,
     DatasetPropertyType,
+    HdfCompression,
 )
-from pydss.dataset_buffer import DatasetBuffer
+from pydss.dataset_buffer import BackgroundDatasetWriter, DatasetBuffer, get_dataset_options
 from pydss.utils.dss_utils import get_node_names_by_type
 from pydss.exceptions import InvalidConfiguration, InvalidParameter
 from pydss.export_list_reader import ExportListReader, StoreValuesType
@@ -64,11 +66,17 @@ class ResultData:
         self._mode_dataset = None
         self._simulation_mode = []
         self._hdf_store = None
+        self._writer = None
         self._scenario = settings.project.active_scenario
         self._base_scenario = settings.project.active_scenario
         self._export_format = settings.exports.export_format
         self._export_compression = settings.exports.export_compression
         self._max_chunk_bytes = settings.exports.hdf_max_chunk_bytes
+        # These datasets have one small column. Compression saves little and
+        # slows down every read of the time index.
+        self._time_dataset_options = get_dataset_options(settings.exports)._replace(
+            compression=HdfCompression.NONE
+        )
         self._export_dir = os.path.join(
             self.system_paths["Export"],
             settings.project.active_scenario,
@@ -119,11 +127,17 @@ class ResultData:
                             logger.warning("Export class=%s is not present in the circuit", cls)
                             continue
 
-                        for obj in self._objects_by_class[cls].values():
-                            if obj.Enabled and prop.should_store_name(obj.FullName):
-                                dss_objs.append(obj)
+                        # Check the names first so that objects that are not
+                        # exported are not created.
+                        cls_objs = self._objects_by_class[cls]
+                        for name in cls_objs:
+                            if prop.should_store_name(name) and cls_objs[name].Enabled:
+                                dss_objs.append(cls_objs[name])
                 else:
-                    dss_objs = [x for x in objs.values() if x.Enabled and prop.should_store_name(x.FullName)]
+                    dss_objs = [
+                        objs[name] for name in objs
+                        if prop.should_store_name(name) and objs[name].Enabled
+                    ]
                 if prop.custom_metric is None:
                     self._add_opendss_metric(prop, dss_objs)
                 else:
@@ -174,14 +188,22 @@ class ResultData:
     def InitializeDataStore(self, hdf_store, num_steps, MC_scenario_number=None):
         if MC_scenario_number is not None:
             self._scenario = self._base_scenario + f"_MC{MC_scenario_number}"
+            if self._time_dataset is not None:
+                # The metrics wrote a previous Monte Carlo scenario. Start new
+                # datasets in the group for this one.
+                self._reset_metrics()
         self._hdf_store = hdf_store
+        if self._settings.exports.hdf_background_writer and self._writer is None:
+            self._writer = BackgroundDatasetWriter(self._settings.exports.hdf_writer_queue_size)
         self._time_dataset = DatasetBuffer(
             hdf_store=hdf_store,
             path=f"Exports/{self._scenario}/Timestamp",
             max_size=num_steps,
             dtype=float,
             columns=("Timestamp",),
-            max_chunk_bytes=self._max_chunk_bytes
+            max_chunk_bytes=self._max_chunk_bytes,
+            writer=self._writer,
+            dataset_options=self._time_dataset_options,
         )
         self._frequency_dataset = DatasetBuffer(
             hdf_store=hdf_store,
@@ -189,7 +211,9 @@ class ResultData:
             max_size=num_steps,
             dtype=float,
             columns=("Frequency",),
-            max_chunk_bytes=self._max_chunk_bytes
+            max_chunk_bytes=self._max_chunk_bytes,
+            writer=self._writer,
+            dataset_options=self._time_dataset_options,
         )
         self._mode_dataset = DatasetBuffer(
             hdf_store=hdf_store,
@@ -197,13 +221,15 @@ class ResultData:
             max_size=num_steps,
             dtype="S10",
             columns=("Mode",),
-            max_chunk_bytes=self._max_chunk_bytes
+            max_chunk_bytes=self._max_chunk_bytes,
+            writer=self._writer,
+            dataset_options=self._time_dataset_options,
         )
         self._cur_step = 0
 
         base_path = "Exports/" + self._scenario
         for metric in self._iter_metrics():
-            metric.initialize_data_store(hdf_store, base_path, num_steps)
+            metric.initialize_data_store(hdf_store, base_path, num_steps, writer=self._writer)
 
     def _iter_metrics(self):
         for metric in self._element_metrics.values():
@@ -213,6 +239,13 @@ class ResultData:
         for metric in self._circuit_metrics.values():
             yield metric
 
+    def _reset_metrics(self):
+        self._element_metrics.clear()
+        self._summed_element_metrics.clear()
+        self._circuit_metrics.clear()
+        self._current_results = {}
+        self._create_exports()
+
     @property
     def CurrentResults(self):
         return self._current_results
@@ -261,10 +294,20 @@ class ResultData:
         self._hdf_store = None
 
     def Close(self):
-        for dataset in (self._time_dataset, self._frequency_dataset, self._mode_dataset):
-            dataset.flush_data()
-        for metric in self._iter_metrics():
-            metric.close()
+        try:
+            for dataset in (self._time_dataset, self._frequency_dataset, self._mode_dataset):
+                dataset.flush_data()
+            for metric in self._iter_metrics():
+                metric.close()
+        finally:
+            if self._writer is not None:
+                # All data is in the store after this returns. It raises any
+                # error that occurred on the writer thread.
+                self._writer.shutdown()
+
+        if self._hdf_store is not None:
+            group = self._hdf_store[f"Exports/{self._scenario}"]
+            ColumnIndex.from_group(group).write(group)
 
     def _export_event_log(self, metadata):
         event_log = "event_log.csv"
@@ -429,13 +472,13 @@ class ResultData:
         pv_infos = []
         profiles = set()
         for full_name, obj in pv_systems.items():
-            profile_name = obj.GetParameter("yearly").lower()
+            profile_name = obj.GetParameter("yearly", use_cache=True).lower()
             if profile_name != "":
                 profiles.add(profile_name)
             pv_infos.append({
                 "irradiance": obj.GetParameter("irradiance"),
                 "name": full_name,
-                "pmpp": obj.GetParameter("pmpp"),
+                "pmpp": obj.GetParameter("pmpp", use_cache=True),
                 "load_shape_profile": profile_name,
             })
 
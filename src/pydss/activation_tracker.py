@@ -0,0 +1,119 @@
+"""Tracks the OpenDSS objects that pydss objects make active."""
+
+from loguru import logger
+
+
+class ActivationTracker:
+    """Tracks which pydss object is the active OpenDSS element or bus.
+
+    OpenDSS reads values from its active element or bus. Before each read, the
+    pydss objects ask OpenDSS for the name of the active object and compare it
+    with their own, which is a round trip through the OpenDSS API.
+
+    Within a track() block, the tracker remembers the object that it activated
+    last in each slot (element or bus), and repeated accesses of that object skip
+    the name queries. Code outside of the pydss objects, such as controllers,
+    metrics and solves, changes the active element without the tracker knowing, so
+    the tracker only trusts its tokens inside track() blocks around code that
+    accesses OpenDSS through pydss objects. Outside of them, every access queries
+    OpenDSS.
+
+    """
+
+    def __init__(self):
+        self._active = {}
+        self._depth = 0
+        self._num_checks = 0
+        self._num_activations = 0
+        self._num_skipped = 0
+
+    def track(self):
+        """Trust the activation tokens for the duration of a with block. Blocks can be nested."""
+        return self
+
+    def __enter__(self):
+        self._depth += 1
+        return self
+
+    def __exit__(self, exc, value, tb):
+        self._depth -= 1
+        if self._depth == 0:
+            self._active.clear()
+
+    def activate(self, obj):
+        """Make obj the active OpenDSS object unless it already is.
+
+        Parameters
+        ----------
+        obj : dssObjectBase
+
+        Returns
+        -------
+        bool
+            False if OpenDSS could not activate the object
+
+        """
+        slot = obj.ACTIVATION_SLOT
+        if slot is None:
+            return True
+        if self._depth > 0:
+            if self._active.get(slot) is obj:
+                self._num_skipped += 1
+                return True
+        else:
+            self._num_checks += 1
+            if obj.IsActiveObject():
+                return True
+
+        self._num_activations += 1
+        if not obj.SetActiveObject():
+            self._active.pop(slot, None)
+            return False
+        if self._depth > 0:
+            self._active[slot] = obj
+        return True
+
+    def invalidate(self):
+        """Forget the active objects. Call this after activating objects without the tracker
+        inside a track() block."""
+        self._active.clear()
+
+    def clear(self):
+        """Clear the stats."""
+        self._num_checks = 0
+        self._num_activations = 0
+        self._num_skipped = 0
+
+    def get_stats(self):
+        """Return the number of name checks, activations and skipped activations.
+
+        Returns
+        -------
+        dict
+
+        """
+        return {
+            "checks": self._num_checks,
+            "activations": self._num_activations,
+            "skipped": self._num_skipped,
+        }
+
+    def log_stats(self, clear=False):
+        """Log a summary of the stats.
+
+        Parameters
+        ----------
+        clear : bool
+            If True, clear the stats.
+
+        """
+        x = self.get_stats()
+        logger.info(
+            f"ActivationTracker summary: activations={x['activations']} "
+            f"name_checks={x['checks']} skipped={x['skipped']}"
+        )
+        if clear:
+            self.clear()
+
+
+activation_tracker = ActivationTracker()
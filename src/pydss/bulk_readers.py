@@ -0,0 +1,310 @@
+"""Readers that collect one property for many elements with a single OpenDSS call."""
+
+import abc
+
+from loguru import logger
+import numpy as np
+import opendssdirect as dss
+from opendssdirect import DSSException
+
+
+# Classes that OpenDSS includes in the PDElements collection.
+PD_ELEMENT_CLASSES = ("Line", "Transformer", "Capacitor", "Reactor", "AutoTrans")
+
+
+class BulkReaderBase(abc.ABC):
+    """Base class for bulk readers.
+
+    Subclasses read a property for every element of a collection in one call
+    and then gather the values for the tracked elements with one fancy-index.
+
+    """
+
+    def __init__(self, indices, element_starts, expected_size):
+        self._indices = indices
+        self._element_starts = element_starts
+        self._expected_size = expected_size
+
+    @property
+    def element_starts(self):
+        """Return the index of each element's first value in the array returned by read.
+
+        Returns
+        -------
+        np.ndarray
+
+        """
+        return self._element_starts
+
+    @property
+    def num_values(self):
+        """Return the number of values returned by read.
+
+        Returns
+        -------
+        int
+
+        """
+        return len(self._indices)
+
+    def read(self):
+        """Return the values for all tracked elements in the tracked order.
+
+        Returns
+        -------
+        np.ndarray | None
+            Returns None if the collection no longer matches the layout
+            computed at construction time, such as when an element is disabled.
+
+        """
+        values = self.read_all()
+        if values.size != self._expected_size:
+            logger.debug("Bulk read size changed: expected=%s actual=%s", self._expected_size, values.size)
+            return None
+        return values[self._indices]
+
+    @abc.abstractmethod
+    def read_all(self):
+        """Return the values for every element in the collection.
+
+        Returns
+        -------
+        np.ndarray
+
+        """
+
+
+class PDElementBulkReader(BulkReaderBase):
+    """Reads CktElement arrays for lines, transformers, etc. through PDElements."""
+
+    # Property name to (function, is_complex)
+    FUNCTIONS = {
+        "Currents": (dss.PDElements.AllCurrents, True),
+        "CurrentsMagAng": (dss.PDElements.AllCurrentsMagAng, False),
+        "Powers": (dss.PDElements.AllPowers, True),
+    }
+
+    def __init__(self, prop_name, names):
+        func, is_complex = self.FUNCTIONS[prop_name]
+        self._func = func
+        self._is_complex = is_complex
+        name_to_index, num_terminals, num_conductors = _get_pd_element_layout()
+        # Each element returns one complex pair or one mag/angle pair per conductor per terminal.
+        sizes = num_terminals * num_conductors
+        if not is_complex:
+            sizes *= 2
+        offsets = np.concatenate(([0], np.cumsum(sizes)))
+        indices = []
+        element_starts = []
+        start = 0
+        for index in _get_indices(name_to_index, names):
+            indices.append(np.arange(offsets[index], offsets[index + 1]))
+            element_starts.append(start)
+            start += sizes[index]
+
+        indices = np.concatenate(indices) if indices else np.array([], dtype=int)
+        super().__init__(indices, np.array(element_starts, dtype=int), int(offsets[-1]))
+
+    def read_all(self):
+        values = np.array(self._func(), dtype=float)
+        if self._is_complex:
+            values = values.view(np.complex128)
+        return values
+
+
+class PDElementLoadingReader(BulkReaderBase):
+    """Reads the loading percent of PD elements.
+
+    The value is the maximum terminal-1 phase current divided by NormAmps,
+    which is the %normal column of the OpenDSS capacity export.
+
+    """
+
+    def __init__(self, names):
+        name_to_index, _, _ = _get_pd_element_layout()
+        indices = np.array(_get_indices(name_to_index, names), dtype=int)
+        super().__init__(indices, np.arange(len(indices)), len(name_to_index))
+
+    def read_all(self):
+        return np.array(dss.PDElements.AllPctNorm(False), dtype=float)
+
+
+class PDElementTerminalPowerReader(BulkReaderBase):
+    """Reads the real power (kW) into terminal 1 of PD elements.
+
+    The value is the sum over the terminal's conductors, which is the P(kW)
+    column of the OpenDSS powers export.
+
+    """
+
+    def __init__(self, names):
+        name_to_index, num_terminals, num_conductors = _get_pd_element_layout()
+        offsets = np.concatenate(([0], np.cumsum(num_terminals * num_conductors)))
+        element_indices = _get_indices(name_to_index, names)
+        self._conductor_starts = np.concatenate(
+            ([0], np.cumsum(num_conductors[element_indices])[:-1])
+        ).astype(int)
+        indices = [np.arange(offsets[i], offsets[i] + num_conductors[i]) for i in element_indices]
+        indices = np.concatenate(indices) if indices else np.array([], dtype=int)
+        super().__init__(indices, np.arange(len(element_indices)), int(offsets[-1]))
+
+    @property
+    def num_values(self):
+        return len(self._element_starts)
+
+    def read(self):
+        values = super().read()
+        if values is None or values.size == 0:
+            return values
+        return np.add.reduceat(values.real, self._conductor_starts)
+
+    def read_all(self):
+        return np.array(dss.PDElements.AllPowers(), dtype=float).view(np.complex128)
+
+
+class CktElementTerminalPowerReader(BulkReaderBase):
+    """Reads the real power (kW) into terminal 1 of any circuit elements.
+
+    OpenDSS does not have a bulk interface for PC elements, such as loads and
+    PV systems, so this reads one element at a time. That is still much
+    faster than writing and parsing the powers export file.
+
+    """
+
+    def __init__(self, names):
+        all_names = {x.lower() for x in dss.Circuit.AllElementNames()}
+        for name in names:
+            if name.lower() not in all_names:
+                raise KeyError(name)
+        self._names = names
+        self._num_conductors = []
+        for name in names:
+            dss.Circuit.SetActiveElement(name)
+            self._num_conductors.append(dss.CktElement.NumConductors())
+        indices = np.arange(len(names))
+        super().__init__(indices, indices, len(names))
+
+    def read_all(self):
+        values = np.empty(len(self._names))
+        for i, name in enumerate(self._names):
+            dss.Circuit.SetActiveElement(name)
+            powers = dss.CktElement.Powers()
+            values[i] = sum(powers[0:2 * self._num_conductors[i]:2])
+        return values
+
+
+class BusBulkReader(BulkReaderBase):
+    """Reads bus properties through the Circuit interface."""
+
+    FUNCTIONS = {
+        "Distance": dss.Circuit.AllBusDistances,
+    }
+
+    def __init__(self, prop_name, names):
+        self._func = self.FUNCTIONS[prop_name]
+        all_names = dss.Circuit.AllBusNames()
+        name_to_index = {x.lower(): i for i, x in enumerate(all_names)}
+        indices = np.array([name_to_index[x.lower()] for x in names], dtype=int)
+        super().__init__(indices, np.arange(len(indices)), len(all_names))
+
+    def read_all(self):
+        return np.array(self._func(), dtype=float)
+
+
+def _get_pd_element_layout():
+    """Return the name-to-index mapping and terminal/conductor counts of all PD elements."""
+    name_to_index = {x.lower(): i for i, x in enumerate(dss.PDElements.AllNames())}
+    num_terminals = np.array(dss.PDElements.AllNumTerminals(), dtype=int)
+    num_conductors = np.array(dss.PDElements.AllNumConductors(), dtype=int)
+    return name_to_index, num_terminals, num_conductors
+
+
+def _get_indices(name_to_index, names):
+    indices = []
+    for name in names:
+        index = name_to_index.get(name.lower())
+        if index is None:
+            raise KeyError(name)
+        indices.append(index)
+    return indices
+
+
+def make_bulk_reader(dss_objs, prop_name):
+    """Return a bulk reader for the property of the elements, if one is available.
+
+    Parameters
+    ----------
+    dss_objs : list
+        list of dssObjectBase in the order in which values must be returned
+    prop_name : str
+
+    Returns
+    -------
+    BulkReaderBase | None
+
+    """
+    if not dss_objs:
+        return None
+
+    classes = {x._Class for x in dss_objs}
+    names = [x.FullName for x in dss_objs]
+    try:
+        if classes.issubset(PD_ELEMENT_CLASSES) and prop_name in PDElementBulkReader.FUNCTIONS:
+            return PDElementBulkReader(prop_name, names)
+        if classes == {"Bus"} and prop_name in BusBulkReader.FUNCTIONS:
+            return BusBulkReader(prop_name, names)
+    except KeyError as exc:
+        logger.debug("Cannot use bulk reads for %s: %s is not present", prop_name, exc)
+
+    return None
+
+
+def make_loading_reader(dss_objs):
+    """Return a reader for the loading percent of the elements, if one is available.
+
+    Parameters
+    ----------
+    dss_objs : list
+        list of dssObjectBase in the order in which values must be returned
+
+    Returns
+    -------
+    BulkReaderBase | None
+
+    """
+    if not dss_objs or not {x._Class for x in dss_objs}.issubset(PD_ELEMENT_CLASSES):
+        return None
+
+    try:
+        return PDElementLoadingReader([x.FullName for x in dss_objs])
+    except (KeyError, DSSException) as exc:
+        logger.debug("Cannot read loadings in process: %s", exc)
+
+    return None
+
+
+def make_terminal_power_reader(dss_objs):
+    """Return a reader for the terminal-1 real power of the elements.
+
+    Parameters
+    ----------
+    dss_objs : list
+        list of dssObjectBase in the order in which values must be returned
+
+    Returns
+    -------
+    BulkReaderBase | None
+
+    """
+    if not dss_objs:
+        return None
+
+    names = [x.FullName for x in dss_objs]
+    try:
+        if {x._Class for x in dss_objs}.issubset(PD_ELEMENT_CLASSES):
+            return PDElementTerminalPowerReader(names)
+        return CktElementTerminalPowerReader(names)
+    except (KeyError, DSSException) as exc:
+        logger.debug("Cannot read powers in process: %s", exc)
+
+    return None
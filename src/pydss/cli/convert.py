@@ -6,6 +6,7 @@ import click
 
 from pydss.config_data import convert_config_data_to_toml
 from pydss.export_list_reader import ExportListReader
+from pydss.ProfileManager.hooks.npy import convert_h5_store
 from pydss.utils.utils import dump_data
 
 
@@ -51,5 +52,15 @@ def simulation_file(filenames, name=None):
         print(f"Converted {filename} to {new_filename}")
 
 
+@click.argument("output_dir")
+@click.argument("filename")
+@click.command()
+def h5_profiles(filename, output_dir):
+    """Convert an h5 profile store to a memory-mapped profile store."""
+    convert_h5_store(filename, output_dir)
+    print(f"Converted {filename} to {output_dir}")
+
+
 convert.add_command(excel_to_toml)
 convert.add_command(simulation_file)
+convert.add_command(h5_profiles)
@@ -56,9 +56,18 @@ from pydss.pydss_project import PyDssProject
     show_default=True,
     help="Dry run for getting estimated space."
 )
+@click.option(
+    "-n", "--num-workers",
+    type=int,
+    default=None,
+    show_default=True,
+    help="Run scenarios in parallel in this many processes. Each process has its own OpenDSS "
+         "instance and data store; the stores are merged when all scenarios finish."
+)
 @click.command()
 
-def run(project_path, options=None, tar_project=False, zip_project=False, verbose=False, simulations_file=None, dry_run=False):
+def run(project_path, options=None, tar_project=False, zip_project=False, verbose=False, simulations_file=None, dry_run=False,
+        num_workers=None):
     """Run a pydss simulation."""
     project_path = Path(project_path)
     settings = PyDssProject.load_simulation_settings(project_path, simulations_file)
@@ -94,7 +103,7 @@ def run(project_path, options=None, tar_project=False, zip_project=False, verbos
             sys.exit(1)
 
     project = PyDssProject.load_project(project_path, options=options, simulation_file=simulations_file)
-    project.run(tar_project=tar_project, zip_project=zip_project, dry_run=dry_run)
+    project.run(tar_project=tar_project, zip_project=zip_project, dry_run=dry_run, num_workers=num_workers)
 
     if dry_run:
         maxlen = max([len(k) for k in project.estimated_space.keys()])
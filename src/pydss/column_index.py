@@ -0,0 +1,360 @@
+"""Index of the element names and columns of a scenario's result datasets.
+
+Readers of a data store need the names, columns, and column ranges of every
+element property dataset. ResultData writes this index to the store when it
+closes so that PyDssScenarioResults can load all of it with one read instead
+of decoding the metadata datasets of each property, and so that option
+filters can select columns with dictionary lookups instead of parsing
+column names.
+
+"""
+
+import json
+import re
+
+from loguru import logger
+import numpy as np
+
+from pydss.common import DatasetPropertyType
+from pydss.data_store import is_group
+from pydss.dataset_buffer import DatasetBuffer
+from pydss.exceptions import InvalidParameter
+from pydss.value_storage import ValueStorageBase, get_dataset_property_type
+
+
+COLUMN_INDEX_NAME = "ColumnIndex"
+COLUMN_INDEX_VERSION = 1
+
+# Only these datasets are exposed by PyDssScenarioResults.
+INDEXED_PROPERTY_TYPES = (
+    DatasetPropertyType.PER_TIME_POINT,
+    DatasetPropertyType.FILTERED,
+    DatasetPropertyType.VALUE,
+)
+
+
+class PropertyColumnIndex:
+    """Names and columns of one element property dataset."""
+
+    def __init__(self, dataset_property_type, columns, names, column_ranges, option_values=None):
+        self._dataset_property_type = dataset_property_type
+        self._columns = columns
+        self._names = names
+        self._column_ranges = column_ranges
+        self._option_values = option_values
+        self._column_indices = None
+        self._columns_by_option_value = {}
+
+    @classmethod
+    def from_dataset(cls, dataset):
+        """Create the index from the metadata datasets of a property dataset.
+
+        Parameters
+        ----------
+        dataset : h5py.Dataset
+
+        Returns
+        -------
+        PropertyColumnIndex
+
+        """
+        return cls(
+            get_dataset_property_type(dataset),
+            DatasetBuffer.get_columns(dataset),
+            DatasetBuffer.get_names(dataset),
+            DatasetBuffer.get_column_ranges(dataset).tolist(),
+        )
+
+    @classmethod
+    def from_dict(cls, data):
+        """Create the index from the output of to_dict."""
+        return cls(
+            DatasetPropertyType(data["type"]),
+            data["columns"],
+            data["names"],
+            data["column_ranges"],
+            option_values=data["option_values"],
+        )
+
+    def to_dict(self):
+        """Return a JSON-serializable representation of the index."""
+        return {
+            "type": self._dataset_property_type.value,
+            "columns": self._columns,
+            "names": self._names,
+            "column_ranges": self._column_ranges,
+            "option_values": self.option_values,
+        }
+
+    @property
+    def column_ranges(self):
+        """Return the column range of each element as [start, length]. Filtered
+        datasets have one range shared by all elements.
+
+        Returns
+        -------
+        list
+
+        """
+        return self._column_ranges
+
+    @property
+    def columns(self):
+        """Return the columns of the dataset.
+
+        Returns
+        -------
+        list
+
+        """
+        return self._columns
+
+    @property
+    def dataset_property_type(self):
+        """Return the property type of the dataset.
+
+        Returns
+        -------
+        DatasetPropertyType
+
+        """
+        return self._dataset_property_type
+
+    @property
+    def names(self):
+        """Return the element names in the dataset.
+
+        Returns
+        -------
+        list
+
+        """
+        return self._names
+
+    @property
+    def option_values(self):
+        """Return the option values of each column, parsed from the column names.
+
+        Returns
+        -------
+        list
+            list of lists of str
+
+        """
+        if self._option_values is None:
+            self._option_values = self._parse_option_values()
+        return self._option_values
+
+    def get_column_indices(self, columns):
+        """Return the indices of the columns.
+
+        Parameters
+        ----------
+        columns : list
+
+        Returns
+        -------
+        list
+
+        """
+        if self._column_indices is None:
+            self._column_indices = {x: i for i, x in enumerate(self._columns)}
+        return [self._column_indices[x] for x in columns]
+
+    def select_columns(self, options, start=0, length=None, **kwargs):
+        """Return the indices of the columns in [start, start + length) whose
+        option values match kwargs.
+
+        Parameters
+        ----------
+        options : list
+            Names of the options in the order in which they appear in the columns.
+        start : int
+        length : int | None
+            Defaults to the end of the columns.
+        kwargs : dict
+            Filter on options; values can be strings or regular expressions.
+
+        Returns
+        -------
+        np.ndarray
+            Sorted column indices
+
+        """
+        field_indices = {option: i for i, option in enumerate(options)}
+        selected = None
+        for key, val in kwargs.items():
+            if val is None:
+                continue
+            columns_by_value = self._get_columns_by_option_value(field_indices[key])
+            if isinstance(val, str):
+                matches = columns_by_value.get(val, np.array([], dtype=int))
+            elif isinstance(val, re.Pattern):
+                matches = [x for option_value, x in columns_by_value.items()
+                           if val.search(option_value) is not None]
+                matches = np.sort(np.concatenate(matches)) if matches else np.array([], dtype=int)
+            else:
+                raise InvalidParameter(f"unhandled option value '{val}'")
+            selected = matches if selected is None else \
+                np.intersect1d(selected, matches, assume_unique=True)
+
+        end = len(self._columns) if length is None else start + length
+        if selected is None:
+            return np.arange(start, end)
+        first, last = np.searchsorted(selected, [start, end])
+        return selected[first:last]
+
+    def _get_columns_by_option_value(self, field_index):
+        columns_by_value = self._columns_by_option_value.get(field_index)
+        if columns_by_value is None:
+            tmp = {}
+            for i, values in enumerate(self.option_values):
+                if field_index < len(values):
+                    tmp.setdefault(values[field_index], []).append(i)
+            columns_by_value = {k: np.array(v, dtype=int) for k, v in tmp.items()}
+            self._columns_by_option_value[field_index] = columns_by_value
+        return columns_by_value
+
+    def _parse_option_values(self):
+        option_values = [[] for _ in self._columns]
+        if self._dataset_property_type == DatasetPropertyType.FILTERED:
+            # All elements share the columns, which use a placeholder name.
+            for i, column in enumerate(self._columns):
+                option_values[i] = _strip_units(column).split(ValueStorageBase.DELIMITER)[1:]
+            return option_values
+
+        for name, (start, length) in zip(self._names, self._column_ranges):
+            for i in range(start, start + length):
+                column = _strip_units(self._columns[i])
+                option_values[i] = ValueStorageBase.get_fields(column, name)[1:]
+        return option_values
+
+
+class ColumnIndex:
+    """Index of the element property datasets of one scenario."""
+
+    def __init__(self, element_classes, properties):
+        self._element_classes = element_classes
+        self._properties = properties
+
+    @classmethod
+    def from_group(cls, group):
+        """Create the index by reading the metadata datasets of each property.
+
+        Parameters
+        ----------
+        group : h5py.Group
+            Group of the scenario, such as Exports/scenario1
+
+        Returns
+        -------
+        ColumnIndex
+
+        """
+        element_classes = [x for x in group if is_group(group[x])]
+        properties = {}
+        for elem_class in element_classes:
+            class_group = group[elem_class]
+            if "ElementProperties" not in class_group:
+                continue
+            properties[elem_class] = {}
+            for prop, dataset in class_group["ElementProperties"].items():
+                if get_dataset_property_type(dataset) in INDEXED_PROPERTY_TYPES:
+                    properties[elem_class][prop] = PropertyColumnIndex.from_dataset(dataset)
+        return cls(element_classes, properties)
+
+    @classmethod
+    def read(cls, group):
+        """Read the index that was written to the scenario group.
+
+        Parameters
+        ----------
+        group : h5py.Group
+
+        Returns
+        -------
+        ColumnIndex | None
+            Returns None if the store does not have an index with the current version.
+
+        """
+        if COLUMN_INDEX_NAME not in group:
+            return None
+        dataset = group[COLUMN_INDEX_NAME]
+        version = dataset.attrs.get("version")
+        if version != COLUMN_INDEX_VERSION:
+            logger.debug("Ignore %s with version=%s", dataset.name, version)
+            return None
+
+        data = json.loads(dataset[:].tobytes())
+        properties = {
+            elem_class: {
+                prop: PropertyColumnIndex.from_dict(x) for prop, x in props.items()
+            }
+            for elem_class, props in data["element_properties"].items()
+        }
+        return cls(data["element_classes"], properties)
+
+    def write(self, group):
+        """Write the index to the scenario group.
+
+        Parameters
+        ----------
+        group : h5py.Group
+
+        """
+        data = {
+            "element_classes": self._element_classes,
+            "element_properties": {
+                elem_class: {prop: x.to_dict() for prop, x in props.items()}
+                for elem_class, props in self._properties.items()
+            },
+        }
+        text = json.dumps(data).encode("utf-8")
+        dataset = group.file.create_dataset(
+            name=f"{group.name}/{COLUMN_INDEX_NAME}",
+            data=np.frombuffer(text, dtype=np.uint8),
+        )
+        dataset.attrs["type"] = DatasetPropertyType.METADATA.value
+        dataset.attrs["version"] = COLUMN_INDEX_VERSION
+        logger.debug("Wrote %s", dataset.name)
+
+    @property
+    def element_classes(self):
+        """Return the element classes in the scenario.
+
+        Returns
+        -------
+        list
+
+        """
+        return self._element_classes
+
+    def get(self, elem_class, prop):
+        """Return the index of one property.
+
+        Returns
+        -------
+        PropertyColumnIndex
+
+        """
+        return self._properties[elem_class][prop]
+
+    def has_element_properties(self, elem_class):
+        """Return True if the element class has element property datasets."""
+        return elem_class in self._properties
+
+    def iter_properties(self, elem_class):
+        """Return an iterator over the properties of the element class.
+
+        Yields
+        ------
+        tuple
+            str, PropertyColumnIndex
+
+        """
+        return iter(self._properties.get(elem_class, {}).items())
+
+
+def _strip_units(column):
+    index = column.find(" [")
+    return column if index == -1 else column[:index]
@@ -30,11 +30,13 @@ class ControllerType(enum.Enum):
     MOTOR_STALL = "MotorStall"
     MOTOR_STALL_SIMPLE = "MotorStallSimple"
     PV_CONTROLLER = "PvController"
+    PV_CONTROLLER_FLEET = "PvControllerFleet"
     PV_DYNAMIC = "PvDynamic"
     PV_FREQUENCY_RIDETHROUGH = "PvFrequencyRideThru"
     PV_VOLTAGE_RIDETHROUGH = "PvVoltageRideThru"
     SOCKET_CONTROLLER = "SocketController"
     STORAGE_CONTROLLER = "StorageController"
+    STORAGE_CONTROLLER_FLEET = "StorageControllerFleet"
     THERMOSTATIC_LOAD_CONTROLLER = "ThermostaticLoad"
     XMFR_CONTROLLER = "xmfrController"
     DYNAMIC_VOLTAGE_SUPPORT = "DynamicVoltageSupport"
@@ -211,12 +213,41 @@ class DatasetPropertyType(enum.Enum):
     METADATA = "metadata"  # metadata for another dataset
     TIME_STEP = "time_step"  # data are time indices, tied to FILTERED
     VALUE = "value"  # Only a single value is written for each element
+
+
+class DataStoreFormat(enum.Enum):
+    """Supported formats for the exported data store"""
+    HDF5 = "hdf5"
+    PARQUET = "parquet"  # requires pyarrow
+
+
 class FileFormat(enum.Enum):
     """Supported file formats"""
     CSV = "csv"
     HDF5 = "h5"
 
 
+class ProfileStoreFormat(enum.Enum):
+    """Supported formats for the Profile Manager source data"""
+    HDF5 = "h5"
+    NPY = "npy"  # memory-mapped array, see pydss.ProfileManager.hooks.npy
+
+
+class HdfChunkPolicy(enum.Enum):
+    """Supported chunk layouts for datasets in the HDF5 data store"""
+    TIME_STEP = "time_step"  # each chunk holds all columns for a range of time points
+    BALANCED = "balanced"  # chunks are split across columns as well as time points
+
+
+class HdfCompression(enum.Enum):
+    """Supported compression codecs for the HDF5 data store"""
+    NONE = "none"
+    LZF = "lzf"
+    GZIP = "gzip"
+    BLOSC = "blosc"  # requires hdf5plugin
+    ZSTD = "zstd"  # requires hdf5plugin
+
+
 class LimitsFilter(enum.Enum):
     INSIDE = "inside"
     OUTSIDE = "outside"
@@ -0,0 +1,105 @@
+"""Dispatch list that runs pydss controllers without walking the OpenDSS element classes."""
+
+from pydss.pyControllers.pyControllerAbstract import BatchControllerAbstract
+
+
+class ControllerDispatchList:
+    """Runs the Update method of controllers in a precomputed order.
+
+    The controllers are grouped by the class of their controlled elements, in the
+    order that OpenDSS lists the classes, and are sorted by element index within
+    each class. This is the order in which a walk over the classes with
+    ActiveClass.First/Next would reach them.
+
+    If skip_converged is set, later iterations of a control loop only update the
+    controllers that have not converged. When all of those converge, the next
+    iteration updates every controller again, so a loop only converges after a
+    pass in which every controller converged.
+
+    Batch controllers run at the position of their first element and are skipped
+    or rerun as a unit.
+
+    Parameters
+    ----------
+    controllers : dict
+        Maps controller name to controller
+    dss_instance
+        OpenDSS instance with the compiled circuit
+
+    """
+
+    def __init__(self, controllers, dss_instance):
+        self._dss_instance = dss_instance
+        element_index = {
+            name: i for i, name in enumerate(dss_instance.Circuit.AllElementNames())
+        }
+        class_index = {}
+        for name in element_index:
+            class_index.setdefault(name.split(".", 1)[0], len(class_index))
+
+        def get_order(controller):
+            name = controller.ControlledElement()
+            index = element_index.get(name, len(element_index))
+            return class_index.get(name.split(".", 1)[0], len(class_index)), index
+
+        self._controllers = sorted(controllers.values(), key=get_order)
+        # Batch controllers activate their own elements.
+        self._element_names = [
+            None if isinstance(x, BatchControllerAbstract) else x.ControlledElement()
+            for x in self._controllers
+        ]
+        self._pending = list(range(len(self._controllers)))
+
+    def __len__(self):
+        return len(self._controllers)
+
+    def update(self, priority, time, iteration, update_results, error_tolerance, skip_converged=False):
+        """Update the controllers for one iteration of a control loop.
+
+        Parameters
+        ----------
+        priority : int
+        time
+            Passed to the controllers
+        iteration : int
+            Iteration of the control loop; every controller runs at iteration 0.
+        update_results : bool
+        error_tolerance : float
+        skip_converged : bool
+            If True, skip the controllers that converged in earlier iterations.
+
+        Returns
+        -------
+        tuple
+            bool, float, list: whether the controllers converged, the maximum error,
+            and (controller, error) for each controller that ran
+
+        """
+        if iteration == 0 or not skip_converged:
+            indices = range(len(self._controllers))
+        else:
+            indices = self._pending
+
+        max_error = 0
+        errors = []
+        pending = []
+        for i in indices:
+            controller = self._controllers[i]
+            if self._element_names[i] is not None:
+                # Controllers expect their element to be the active element.
+                self._dss_instance.Circuit.SetActiveElement(self._element_names[i])
+            error = controller.Update(priority, time, update_results)
+            max_error = error if error > max_error else max_error
+            errors.append((controller, error))
+            if error >= error_tolerance:
+                pending.append(i)
+
+        has_converged = max_error < error_tolerance
+        if skip_converged:
+            if has_converged and len(indices) < len(self._controllers):
+                # Updates from the other controllers may have moved converged
+                # controllers away from their targets; check all of them.
+                has_converged = False
+                pending = list(range(len(self._controllers)))
+            self._pending = pending
+        return has_converged, max_error, errors
@@ -9,6 +9,7 @@ from pydantic import BaseModel, Field
 from pydantic import ConfigDict
 import opendssdirect as dss
 
+from pydss.controller_dispatch import ControllerDispatchList
 from pydss.exceptions import InvalidConfiguration, OpenDssConvergenceError
 from pydss.pyControllers.Controllers.PvController import PvController
 from pydss.utils.timing_utils import TimerStatsCollector, Timer
@@ -270,12 +271,18 @@ class CircuitElementController:
 class ControllerManager:
     """Provides ability to run control algorithms on circuit elements."""
 
-    def __init__(self, controllers: dict, solver: solver_base, max_control_iterations: int, error_tolerance: float):
+    def __init__(self, controllers: dict, solver: solver_base, max_control_iterations: int, error_tolerance: float,
+                 skip_converged_controllers: bool = False):
         self._controllers = controllers
         self._max_control_iterations = max_control_iterations
         self._error_tolerance = error_tolerance
+        self._skip_converged_controllers = skip_converged_controllers
         self._solver = solver
         self._stats = TimerStatsCollector()
+        self._dispatch = ControllerDispatchList(
+            {name: x for elements in controllers.values() for name, x in elements.items()},
+            dss,
+        )
 
     @classmethod
     def create(cls, controllers: list, settings: ProjectModel):
@@ -305,6 +312,7 @@ class ControllerManager:
             solver,
             settings.max_control_iterations,
             settings.error_tolerance,
+            skip_converged_controllers=settings.skip_converged_controllers,
         )
 
     def run_controls(self):
@@ -332,31 +340,28 @@ class ControllerManager:
         return has_converged
 
     def _update_controllers(self, priority, iteration):
-        maxError = 0
-
-        for element_class, elements in self._controllers.items():
-            elm = element_class.First()
-            while elm:
-                element_name = dss.CktElement.Name()
-                controller_name = 'Controller.' + element_name
-                if controller_name in elements:
-                    controller = elements[controller_name]
-                    error = controller.Update(priority, iteration, False)
-                    maxError = error if error > maxError else maxError
-                    if iteration == self._max_control_iterations - 1:
-                        if error > self._error_tolerance:
-                            errorTag = {
-                                "Report": "Convergence",
-                                #"Scenario": self._settings.active_scenario,
-                                "Time": self._solver.GetTotalSeconds(),
-                                "DateTime": str(self._solver.GetDateTime()),
-                                "Controller": controller.Name(),
-                                "Controlled element": controller.ControlledElement(),
-                                "Error": error,
-                                "Control algorithm": controller.debugInfo()[priority],
-                            }
-                            json_object = json.dumps(errorTag)
-                            # TODO: Make reports logger
-                            logger.warning(json_object)
-                elm = element_class.Next()
-        return maxError < self._error_tolerance
+        has_converged, maxError, errors = self._dispatch.update(
+            priority,
+            iteration,
+            iteration,
+            False,
+            self._error_tolerance,
+            skip_converged=self._skip_converged_controllers,
+        )
+        if iteration == self._max_control_iterations - 1:
+            for controller, error in errors:
+                if error > self._error_tolerance:
+                    errorTag = {
+                        "Report": "Convergence",
+                        #"Scenario": self._settings.active_scenario,
+                        "Time": self._solver.GetTotalSeconds(),
+                        "DateTime": str(self._solver.GetDateTime()),
+                        "Controller": controller.Name(),
+                        "Controlled element": controller.ControlledElement(),
+                        "Error": error,
+                        "Control algorithm": controller.debugInfo()[priority],
+                    }
+                    json_object = json.dumps(errorTag)
+                    # TODO: Make reports logger
+                    logger.warning(json_object)
+        return has_converged
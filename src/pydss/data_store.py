@@ -0,0 +1,553 @@
+"""Backends for the pydss data store.
+
+The default backend is an HDF5 file opened with h5py. The Parquet backend
+stores each dataset in its own Parquet file in a directory tree that mirrors
+the HDF5 group hierarchy, so data is partitioned by scenario, element class,
+and property. It implements the subset of the h5py File, Group, and Dataset
+interfaces that pydss uses, which lets the writers and PyDssResults work
+with either backend.
+
+"""
+
+import json
+import os
+import shutil
+from pathlib import Path
+
+import h5py
+import numpy as np
+from loguru import logger
+
+try:
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+except ImportError:
+    pa = None
+    pq = None
+
+from pydss.common import DataStoreFormat, HdfCompression
+from pydss.exceptions import InvalidConfiguration, InvalidParameter
+
+
+# Parquet does not support lzf or blosc. Use the closest codecs.
+PARQUET_CODECS = {
+    HdfCompression.NONE: None,
+    HdfCompression.LZF: "snappy",
+    HdfCompression.GZIP: "gzip",
+    HdfCompression.BLOSC: "lz4",
+    HdfCompression.ZSTD: "zstd",
+}
+
+
+def open_data_store(filename, mode, store_format=DataStoreFormat.HDF5, in_memory=False,
+                    chunk_cache_bytes=None):
+    """Open a data store.
+
+    Parameters
+    ----------
+    filename : str
+    mode : str
+        r, w, or a; same meaning as h5py.File
+    store_format : DataStoreFormat
+    in_memory : bool
+        If true, use the h5py core driver. Not supported by the Parquet backend,
+        which logs a warning and ignores it.
+    chunk_cache_bytes : int | None
+        Size of the HDF5 chunk cache for each open dataset; defaults to the
+        h5py default. Ignored by the Parquet backend, which does not cache.
+
+    Returns
+    -------
+    h5py.File | ParquetStore
+
+    """
+    if store_format == DataStoreFormat.HDF5:
+        return h5py.File(
+            filename,
+            mode,
+            driver="core" if in_memory else None,
+            rdcc_nbytes=chunk_cache_bytes,
+        )
+    if store_format == DataStoreFormat.PARQUET:
+        if in_memory:
+            logger.warning("The parquet data store does not support in-memory mode. Ignoring it.")
+        return ParquetStore(filename, mode)
+    raise InvalidParameter(f"unsupported data store format: {store_format}")
+
+
+def remove_data_store(filename):
+    """Delete a data store if it exists.
+
+    Parameters
+    ----------
+    filename : str
+
+    """
+    if os.path.isdir(filename):
+        shutil.rmtree(filename)
+    elif os.path.exists(filename):
+        os.remove(filename)
+
+
+def merge_data_stores(filename, src_filenames, store_format=DataStoreFormat.HDF5):
+    """Move the scenarios in other data stores into a data store. The other
+    stores are deleted.
+
+    Parameters
+    ----------
+    filename : str
+        Destination store; created if it does not exist.
+    src_filenames : list
+        Stores written with the same format, each with the scenarios
+        in Exports/<scenario>
+    store_format : DataStoreFormat
+
+    Raises
+    ------
+    InvalidParameter
+        Raised if a scenario exists in more than one store.
+
+    """
+    with open_data_store(filename, "a", store_format) as store:
+        merge_into_data_store(store, src_filenames)
+
+
+def merge_into_data_store(store, src_filenames):
+    """Move the scenarios in other data stores into an open data store. The
+    other stores are deleted.
+
+    Parameters
+    ----------
+    store : h5py.File | ParquetStore
+        Destination store, opened for writing
+    src_filenames : list
+        Stores written with the same format as store, each with the
+        scenarios in Exports/<scenario>
+
+    Raises
+    ------
+    InvalidParameter
+        Raised if a scenario exists in more than one store.
+
+    """
+    if isinstance(store, h5py.File):
+        exports = store.require_group("Exports")
+        for src_filename in src_filenames:
+            with h5py.File(src_filename, "r") as src:
+                for key, val in src.attrs.items():
+                    store.attrs[key] = val
+                for name in src.get("Exports", []):
+                    if name in exports:
+                        raise InvalidParameter(f"scenario {name} is stored more than once")
+                    src.copy(src[f"Exports/{name}"], exports, name=name)
+    elif isinstance(store, ParquetStore):
+        # The datasets are already separate files, so moving directories is enough.
+        dst_exports = store.root / "Exports"
+        dst_exports.mkdir(exist_ok=True)
+        for src_filename in src_filenames:
+            src_root = Path(src_filename)
+            src_attrs_file = src_root / ParquetStore.ATTRS_FILENAME
+            if src_attrs_file.exists():
+                store.attrs.update(json.loads(src_attrs_file.read_text()))
+            src_exports = src_root / "Exports"
+            for path in sorted(src_exports.iterdir()) if src_exports.is_dir() else []:
+                dst_path = dst_exports / path.name
+                if dst_path.exists():
+                    raise InvalidParameter(f"scenario {path.name} is stored more than once")
+                shutil.move(str(path), str(dst_path))
+                store._add_datasets(dst_path)
+    else:
+        raise InvalidParameter(f"unsupported data store: {type(store)}")
+
+    for src_filename in src_filenames:
+        remove_data_store(src_filename)
+
+
+def is_group(obj):
+    """Return True if the data store object is a group.
+
+    Parameters
+    ----------
+    obj : h5py.Group | h5py.Dataset | ParquetGroup | ParquetDataset
+
+    Returns
+    -------
+    bool
+
+    """
+    return isinstance(obj, (h5py.Group, ParquetGroup))
+
+
+class ParquetGroup:
+    """Group of datasets in a ParquetStore."""
+
+    def __init__(self, store, path):
+        self._store = store
+        self._path = path
+
+    def __contains__(self, name):
+        return self._store._exists(self._join(name))
+
+    def __getitem__(self, name):
+        return self._store._get(self._join(name))
+
+    def __iter__(self):
+        return iter(self._store._list_children(self._path))
+
+    def get(self, name, default=None):
+        """Return the group or dataset with name, if it exists."""
+        try:
+            return self[name]
+        except KeyError:
+            return default
+
+    def items(self):
+        """Return (name, group or dataset) pairs for the members of the group."""
+        return [(x, self[x]) for x in self]
+
+    def keys(self):
+        """Return the names of the members of the group."""
+        return list(self)
+
+    @property
+    def file(self):
+        """Return the store that contains the group."""
+        return self._store
+
+    @property
+    def name(self):
+        """Return the absolute path of the group."""
+        return "/" + self._path
+
+    def _join(self, name):
+        name = name.strip("/")
+        return f"{self._path}/{name}" if self._path else name
+
+
+class ParquetDataset:
+    """Two-dimensional dataset stored in one Parquet file.
+
+    Rows must be written in order. Each write becomes one row group, so a
+    DatasetBuffer flush is one row group. Complex columns are stored as
+    pairs of float columns named <column>.real and <column>.imag.
+
+    """
+
+    def __init__(self, store, path, dtype, shape, attrs=None, compression=None,
+                 compression_level=None):
+        self._store = store
+        self._path = path
+        self._filename = store.root / (path + ".parquet")
+        self._sidecar = store.root / (path + ".json")
+        self.dtype = np.dtype(dtype)
+        self.shape = tuple(shape)
+        self.attrs = attrs if attrs is not None else {}
+        self._compression = compression
+        self._compression_level = compression_level
+        self._writer = None
+        self._columns = None
+        self._num_rows = 0
+        self._is_new = attrs is None
+
+    @classmethod
+    def load(cls, store, path):
+        """Load an existing dataset from the store."""
+        data = json.loads((store.root / (path + ".json")).read_text())
+        return cls(store, path, data["dtype"], data["shape"], attrs=data["attrs"])
+
+    def __len__(self):
+        return self.shape[0]
+
+    def __getitem__(self, key):
+        if self._writer is not None:
+            raise InvalidParameter(f"cannot read {self.name} while it is being written")
+        if not isinstance(key, tuple):
+            key = (key,)
+        if len(self.shape) == 1:
+            return self._read(key[0], 0)
+        return self._read(key[0], key[1] if len(key) > 1 else slice(None))
+
+    def __setitem__(self, key, value):
+        if not isinstance(key, slice) or key.start not in (None, self._num_rows):
+            raise InvalidParameter(
+                f"{self.name} only supports appending rows: num_rows={self._num_rows} key={key}"
+            )
+        value = np.asarray(value, dtype=self.dtype)
+        if len(self.shape) == 1:
+            value = value.reshape(len(value), 1)
+        if len(value) == 0:
+            return
+        table = self._to_table(value)
+        if self._writer is None:
+            kwargs = {}
+            if self._compression in ("gzip", "zstd"):
+                kwargs["compression_level"] = self._compression_level
+            self._filename.parent.mkdir(parents=True, exist_ok=True)
+            self._writer = pq.ParquetWriter(
+                self._filename, table.schema, compression=self._compression or "none", **kwargs
+            )
+        self._writer.write_table(table, row_group_size=len(value))
+        self._num_rows += len(value)
+
+    @property
+    def file(self):
+        """Return the store that contains the dataset."""
+        return self._store
+
+    @property
+    def name(self):
+        """Return the absolute path of the dataset."""
+        return "/" + self._path
+
+    def close(self):
+        """Finish the Parquet file and record the dataset metadata."""
+        if not self._is_new:
+            return
+        if self._writer is not None:
+            self._close_writer()
+        elif not self._filename.exists():
+            # Readers expect a file even if nothing was written.
+            self._filename.parent.mkdir(parents=True, exist_ok=True)
+            num_columns = self.shape[1] if len(self.shape) > 1 else 1
+            empty = np.empty((0, num_columns), dtype=self.dtype)
+            pq.write_table(self._to_table(empty), self._filename)
+        data = {
+            "dtype": self.dtype.str,
+            "shape": list(self.shape),
+            "attrs": {k: _to_json_value(v) for k, v in self.attrs.items()},
+        }
+        self._sidecar.write_text(json.dumps(data))
+
+    def flush(self):
+        """No-op. Row groups are complete on disk when the file is closed."""
+
+    def _close_writer(self):
+        self._writer.close()
+        self._writer = None
+
+    def resize(self, shape):
+        """Change the shape of the dataset."""
+        self.shape = tuple(shape)
+
+    def _column_names(self, num_columns):
+        path = self.attrs.get("column_dataset_path")
+        if path is not None and path in self._store:
+            names = [x.decode("utf8") for x in self._store[path][:]]
+            if len(names) == num_columns and len(set(names)) == num_columns:
+                return names
+        return [str(i) for i in range(num_columns)]
+
+    def _read(self, row_key, col_key):
+        """Read only the row groups and columns selected by the keys, which
+        have the same semantics as NumPy basic and integer-array indexing."""
+        parquet_file = pq.ParquetFile(self._filename)
+        metadata = parquet_file.metadata
+        all_names = parquet_file.schema_arrow.names
+        width = 2 if np.issubdtype(self.dtype, np.complexfloating) else 1
+        col_indices = np.arange(len(all_names) // width)[col_key]
+        names = [all_names[i * width + j] for i in np.atleast_1d(col_indices) for j in range(width)]
+
+        row_indices = np.arange(metadata.num_rows)[row_key]
+        if np.size(row_indices) == 0:
+            row_groups = []
+            first_row = 0
+        else:
+            first_row = int(np.min(row_indices))
+            last_row = int(np.max(row_indices))
+            row_groups = []
+            offset = 0
+            for i in range(metadata.num_row_groups):
+                num_rows = metadata.row_group(i).num_rows
+                if offset + num_rows > first_row and offset <= last_row:
+                    if not row_groups:
+                        first_row = offset
+                    row_groups.append(i)
+                offset += num_rows
+
+        table = parquet_file.read_row_groups(row_groups, columns=names, use_threads=True)
+        data = self._to_array(table, len(names) // width)
+        data = data[row_indices - first_row]
+        if np.ndim(col_indices) == 0:
+            data = data[..., 0]
+        # Return a scalar instead of a 0-d array, like h5py.
+        return data[()] if data.ndim == 0 else data
+
+    def _to_array(self, table, num_columns):
+        if num_columns == 0 or table.num_rows == 0:
+            return np.empty((table.num_rows, num_columns), dtype=self.dtype)
+        if self.dtype.kind == "S":
+            columns = [np.array(x.to_pylist(), dtype=self.dtype) for x in table.columns]
+            return np.column_stack(columns)
+
+        data = np.column_stack([x.to_numpy() for x in table.columns])
+        if np.issubdtype(self.dtype, np.complexfloating):
+            data = np.ascontiguousarray(data, dtype=np.float64).view(np.complex128)
+        return data.astype(self.dtype, copy=False)
+
+    def _to_table(self, value):
+        if self._columns is None:
+            self._columns = self._column_names(value.shape[1])
+        names = self._columns
+        arrays = []
+        fields = []
+        for i, name in enumerate(names):
+            column = value[:, i]
+            if np.issubdtype(self.dtype, np.complexfloating):
+                arrays += [pa.array(column.real), pa.array(column.imag)]
+                fields += [name + ".real", name + ".imag"]
+            elif self.dtype.kind == "S":
+                arrays.append(pa.array(column.tolist(), type=pa.binary()))
+                fields.append(name)
+            else:
+                arrays.append(pa.array(column))
+                fields.append(name)
+        return pa.Table.from_arrays(arrays, names=fields)
+
+
+class ParquetStore(ParquetGroup):
+    """Data store that writes datasets to Parquet files in a directory.
+
+    Dataset Exports/<scenario>/<class>/ElementProperties/<property> is stored
+    in <filename>/Exports/<scenario>/<class>/ElementProperties/<property>.parquet,
+    which tools like pyarrow.dataset, DuckDB, and Spark can read directly.
+    Attributes and shapes are stored in a .json file next to each dataset.
+
+    """
+
+    ATTRS_FILENAME = "_attrs.json"
+
+    def __init__(self, filename, mode="r"):
+        if pa is None:
+            raise InvalidConfiguration(
+                "The parquet data store requires pyarrow. Install it with 'pip install pyarrow'."
+            )
+        super().__init__(self, "")
+        self._root = Path(filename)
+        self.mode = mode
+        if mode == "w":
+            remove_data_store(filename)
+        if mode in ("w", "a"):
+            self._root.mkdir(parents=True, exist_ok=True)
+        elif mode != "r":
+            raise InvalidParameter(f"unsupported mode: {mode}")
+        if not self._root.is_dir():
+            raise InvalidConfiguration(f"data store does not exist: {filename}")
+
+        attrs_file = self._root / self.ATTRS_FILENAME
+        self.attrs = json.loads(attrs_file.read_text()) if attrs_file.exists() else {}
+        self._datasets = {}
+        self._add_datasets(self._root)
+        self._is_open = True
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        self.close()
+
+    @property
+    def root(self):
+        """Return the directory containing the store."""
+        return self._root
+
+    def close(self):
+        """Finish all datasets. The store cannot be written after this is called."""
+        if not self._is_open:
+            return
+        if self.mode != "r":
+            for dataset in self._datasets.values():
+                if dataset is not None:
+                    dataset.close()
+            attrs = {k: _to_json_value(v) for k, v in self.attrs.items()}
+            (self._root / self.ATTRS_FILENAME).write_text(json.dumps(attrs))
+        self._is_open = False
+
+    def flush(self):
+        """No-op. Data is complete on disk when the store is closed."""
+
+    @staticmethod
+    def compression_kwargs(compression, level):
+        """Return the create_dataset keyword arguments for a compression codec.
+
+        Parameters
+        ----------
+        compression : HdfCompression
+        level : int
+
+        Returns
+        -------
+        dict
+
+        """
+        return {"compression": PARQUET_CODECS[compression], "compression_level": level}
+
+    def create_dataset(self, name, shape=None, data=None, dtype=None, compression=None,
+                       compression_level=None, **kwargs):
+        """Create a dataset. Accepts the h5py arguments that pydss passes and ignores
+        the ones that only apply to HDF5, like chunks and maxshape.
+
+        Returns
+        -------
+        ParquetDataset
+
+        """
+        if self.mode == "r":
+            raise InvalidParameter(f"cannot create {name} in a read-only store")
+        path = name.strip("/")
+        if path in self._datasets:
+            raise InvalidParameter(f"dataset {name} already exists")
+        if data is not None:
+            data = np.asarray(data, dtype=dtype)
+            shape = data.shape
+            dtype = data.dtype
+        dataset = ParquetDataset(
+            self, path, dtype, shape, compression=compression, compression_level=compression_level
+        )
+        self._datasets[path] = dataset
+        if data is not None:
+            dataset[0:len(data)] = data
+            if dataset._writer is not None:
+                # These are small metadata datasets that are read while other
+                # datasets are written, so finish the file now.
+                dataset._close_writer()
+        return dataset
+
+    def _add_datasets(self, directory):
+        for sidecar in directory.rglob("*.json"):
+            if sidecar.name != self.ATTRS_FILENAME:
+                path = sidecar.relative_to(self._root).with_suffix("").as_posix()
+                self._datasets.setdefault(path, None)  # loaded on first access
+
+    def _exists(self, path):
+        try:
+            self._get(path)
+            return True
+        except KeyError:
+            return False
+
+    def _get(self, path):
+        path = path.strip("/")
+        if path in self._datasets:
+            dataset = self._datasets[path]
+            if dataset is None:
+                dataset = ParquetDataset.load(self, path)
+                self._datasets[path] = dataset
+            return dataset
+        if path == "" or any(x.startswith(path + "/") for x in self._datasets):
+            return ParquetGroup(self, path)
+        raise KeyError(path)
+
+    def _list_children(self, path):
+        prefix = path + "/" if path else ""
+        children = {x[len(prefix):].split("/")[0] for x in self._datasets if x.startswith(prefix)}
+        return sorted(children)
+
+
+def _to_json_value(value):
+    if isinstance(value, np.generic):
+        return value.item()
+    if isinstance(value, np.ndarray):
+        return value.tolist()
+    if isinstance(value, bytes):
+        return value.decode("utf8")
+    return value
@@ -1,12 +1,23 @@
 """Contains DatasetBuffer"""
 
+from collections import namedtuple
+import math
+import queue
+import threading
+
 from loguru import logger
 import pandas as pd
 import numpy as np
 
-from pydss.exceptions import InvalidConfiguration
+try:
+    # Registers the blosc and zstd filters with h5py for writes and reads.
+    import hdf5plugin
+except ImportError:
+    hdf5plugin = None
+
+from pydss.exceptions import DataStoreWriteError, InvalidConfiguration
 from pydss.utils.utils import make_timestamps
-from pydss.common import DatasetPropertyType
+from pydss.common import DatasetPropertyType, HdfChunkPolicy, HdfCompression
 
 
 
@@ -23,11 +34,148 @@ GiB = MiB * MiB
 # entire chunk to be read.
 DEFAULT_MAX_CHUNK_BYTES = 1 * MiB
 
+DatasetOptions = namedtuple("DatasetOptions", ["compression", "compression_level", "chunk_policy"])
+DEFAULT_DATASET_OPTIONS = DatasetOptions(HdfCompression.GZIP, 4, HdfChunkPolicy.TIME_STEP)
+
+
+def get_dataset_options(exports):
+    """Return the DatasetOptions defined in the exports settings.
+
+    Parameters
+    ----------
+    exports : ExportsModel
+
+    Returns
+    -------
+    DatasetOptions
+
+    """
+    return DatasetOptions(
+        exports.hdf_compression,
+        exports.hdf_compression_level,
+        exports.hdf_chunk_policy,
+    )
+
+
+_warned_missing_hdf5plugin = False
+
+
+def make_compression_kwargs(compression, level):
+    """Return the h5py create_dataset keyword arguments for a compression codec.
+
+    Parameters
+    ----------
+    compression : HdfCompression
+    level : int
+
+    Returns
+    -------
+    dict
+
+    """
+    if compression in (HdfCompression.BLOSC, HdfCompression.ZSTD) and hdf5plugin is None:
+        global _warned_missing_hdf5plugin
+        if not _warned_missing_hdf5plugin:
+            logger.warning("hdf5plugin is not installed. Using gzip instead of %s.", compression.value)
+            _warned_missing_hdf5plugin = True
+        compression = HdfCompression.GZIP
+        level = min(level, 9)
+
+    if compression == HdfCompression.NONE:
+        return {}
+    if compression == HdfCompression.LZF:
+        return {"compression": "lzf", "shuffle": True}
+    if compression == HdfCompression.GZIP:
+        return {"compression": "gzip", "compression_opts": level, "shuffle": True}
+    if compression == HdfCompression.BLOSC:
+        return dict(hdf5plugin.Blosc(cname="lz4", clevel=level, shuffle=hdf5plugin.Blosc.SHUFFLE))
+    if compression == HdfCompression.ZSTD:
+        return dict(hdf5plugin.Zstd(clevel=level))
+    raise InvalidConfiguration(f"unsupported compression: {compression}")
+
+
+class BackgroundDatasetWriter:
+    """Writes chunks for instances of DatasetBuffer on a background thread.
+
+    Buffers submit filled chunks through a bounded queue, so compression and
+    disk writes overlap with the simulation. The simulation thread blocks when
+    the queue is full. h5py serializes calls into the HDF5 library, so the
+    simulation thread can keep creating and filling other datasets.
+
+    Exceptions raised on the thread are re-raised as DataStoreWriteError on
+    the next submit, flush, or shutdown.
+
+    The thread starts on the first submit after construction or shutdown, so
+    buffers can outlive one simulation run.
+
+    """
+
+    def __init__(self, max_queue_size=4):
+        self._queue = queue.Queue(maxsize=max_queue_size)
+        self._error = None
+        self._thread = None
+
+    def _run(self):
+        while True:
+            task = self._queue.get()
+            try:
+                if task is None:
+                    return
+                func, args = task
+                try:
+                    func(*args)
+                except Exception as exc:
+                    # Keep running tasks so that buffers waiting on them are released.
+                    if self._error is None:
+                        logger.exception("Failed to write to the data store")
+                        self._error = exc
+            finally:
+                self._queue.task_done()
+
+    def _check_error(self):
+        if self._error is not None:
+            raise DataStoreWriteError(f"Failed to write to the data store: {self._error}") from self._error
+
+    def flush(self):
+        """Wait for all submitted tasks to complete."""
+        self._queue.join()
+        self._check_error()
+
+    def shutdown(self):
+        """Complete all submitted tasks and stop the thread."""
+        if self._thread is not None:
+            self._queue.put(None)
+            self._thread.join()
+            self._thread = None
+        self._check_error()
+
+    def submit(self, func, *args):
+        """Run func(*args) on the writer thread.
+
+        Parameters
+        ----------
+        func : callable
+        args : tuple
+
+        """
+        self._check_error()
+        if self._thread is None:
+            self._thread = threading.Thread(target=self._run, name="DatasetWriter", daemon=True)
+            self._thread.start()
+        self._queue.put((func, args))
+
+
 class DatasetBuffer:
     """Provides a write buffer to an HDF dataset to increase performance.
     Users must call flush_data before the object goes out of scope to ensure
     that all data is flushed.
 
+    If a BackgroundDatasetWriter is passed, full chunks are written on its
+    thread while this object fills a second buffer.
+
+    The buffer always holds full rows. With HdfChunkPolicy.BALANCED each
+    flush covers several chunks across the columns.
+
     """
     # TODO add support for context manager, though pydss wouldn't be able to
     # take advantage in its current implementation.
@@ -35,42 +183,48 @@ class DatasetBuffer:
     def __init__(
             self, hdf_store, path, max_size, dtype, columns, scaleoffset=None,
             max_chunk_bytes=None, attributes=None, names=None,
-            column_ranges_per_name=None, data=None
+            column_ranges_per_name=None, data=None, writer=None,
+            dataset_options=None,
         ):
         if max_chunk_bytes is None:
             max_chunk_bytes = DEFAULT_MAX_CHUNK_BYTES
+        if dataset_options is None:
+            dataset_options = DEFAULT_DATASET_OPTIONS
         self._buf_index = 0
+        self._writer = writer
         self._hdf_store = hdf_store
         self._max_size = max_size
         num_columns = len(columns)
         if data is None:
-            self.chunk_count = self.compute_chunk_count(
+            self.chunk_count, num_chunk_columns = self.compute_chunk_shape(
                 num_columns,
                 max_size,
                 dtype,
                 max_chunk_bytes,
+                dataset_options.chunk_policy,
             )
             shape = (self._max_size, num_columns)
-            chunks = (self.chunk_count, num_columns)
+            chunks = (self.chunk_count, num_chunk_columns)
+            buf_shape = (self.chunk_count, num_columns)
         else:
             self.chunk_count = None
             shape = None
             chunks = None
+            buf_shape = None
 
         dim = len(shape)
-        print(path)
+        # Stores other than h5py define their own compression arguments.
+        compression_kwargs = getattr(self._hdf_store, "compression_kwargs", make_compression_kwargs)
         self._dataset = self._hdf_store.create_dataset(
             name=path,
             shape=shape,
             data=data,
             chunks=chunks,
             dtype=dtype,
-            compression="gzip",
-            compression_opts=4,
-            shuffle=True,
             maxshape=[None for _ in range(dim)],
             # Does not preserve NaN, so don't use it.
             #scaleoffset=scaleoffset,
+            **compression_kwargs(dataset_options.compression, dataset_options.compression_level),
         )
 
         # Columns, names, and column_ranges_per_name can't be stored as
@@ -109,7 +263,11 @@ class DatasetBuffer:
 
         self._dataset.attrs["length"] = 0
         self._dataset_index = 0
-        self._buf = np.empty(chunks, dtype=dtype)
+        self._buf = np.empty(buf_shape, dtype=dtype)
+        if self._writer is not None:
+            # Buffers that are not being filled or written.
+            self._free_bufs = queue.Queue()
+            self._free_bufs.put(np.empty(buf_shape, dtype=dtype))
 
         if attributes is not None:
             for attr, val in attributes.items():
@@ -123,24 +281,40 @@ class DatasetBuffer:
             f"DatasetBuffer destructed with data in memory: {self._dataset.name}"
 
     def flush_data(self):
-        """Flush the data in the temporary buffer to storage."""
+        """Flush the data in the temporary buffer to storage.
+
+        With a background writer the data is queued; it is in storage after
+        the writer is flushed or shut down.
+
+        """
         length = self._buf_index
         if length == 0:
             return
 
-        new_index = self._dataset_index + length
-        
-        if new_index > self._dataset.shape[0]:
-            new_dimensions = (new_index, self._dataset.shape[1])
-            self._dataset.resize(new_dimensions)
-            logger.warning(f"result index {new_index} exceed dataset dimension {self._dataset.shape[0]} for dataset {self._dataset.name}. Resizig dataset to {new_dimensions}")
-  
-        self._dataset[self._dataset_index:new_index] = self._buf[0:length]
-        
+        if self._writer is None:
+            self._write_chunk(self._buf, length, self._dataset_index)
+        else:
+            self._writer.submit(self._write_chunk, self._buf, length, self._dataset_index)
+            # Blocks until the writer is done with the previous chunk.
+            self._buf = self._free_bufs.get()
+
         self._buf_index = 0
-        self._dataset_index = new_index
-        self._dataset.attrs["length"] = new_index
-        self._dataset.flush()
+        self._dataset_index += length
+
+    def _write_chunk(self, buf, length, index):
+        try:
+            new_index = index + length
+            if new_index > self._dataset.shape[0]:
+                new_dimensions = (new_index, self._dataset.shape[1])
+                self._dataset.resize(new_dimensions)
+                logger.warning(f"result index {new_index} exceed dataset dimension {self._dataset.shape[0]} for dataset {self._dataset.name}. Resizig dataset to {new_dimensions}")
+
+            self._dataset[index:new_index] = buf[0:length]
+            self._dataset.attrs["length"] = new_index
+            self._dataset.flush()
+        finally:
+            if self._writer is not None:
+                self._free_bufs.put(buf)
 
     def max_num_bytes(self):
         """Return the maximum number of bytes the container could hold.
@@ -163,6 +337,9 @@ class DatasetBuffer:
 
     def write_data(self, values):
         """Write the data to the dataset."""
+        if self._writer is not None:
+            # Queued chunks must be written first.
+            self._writer.flush()
         new_index = self._dataset_index + len(values)
         self._dataset[self._dataset_index:new_index] = values
         self._dataset_index = new_index
@@ -188,6 +365,38 @@ class DatasetBuffer:
 
         return chunk_count
 
+    @staticmethod
+    def compute_chunk_shape(
+            num_columns,
+            max_size,
+            dtype,
+            max_chunk_bytes=DEFAULT_MAX_CHUNK_BYTES,
+            chunk_policy=HdfChunkPolicy.TIME_STEP,
+        ):
+        """Return the number of rows and columns in each chunk.
+
+        Returns
+        -------
+        tuple
+            (num_rows, num_columns)
+
+        """
+        if chunk_policy == HdfChunkPolicy.TIME_STEP:
+            chunk_count = DatasetBuffer.compute_chunk_count(num_columns, max_size, dtype, max_chunk_bytes)
+            return chunk_count, num_columns
+
+        max_items = max(max_chunk_bytes // np.dtype(dtype).itemsize, 1)
+        if num_columns * max_size <= max_items:
+            return max_size, num_columns
+
+        # Make chunks about as tall as they are wide so that reading one column
+        # or one row touches a similar number of chunks. Rows wider than
+        # max_chunk_bytes are allowed because they span multiple chunks.
+        num_chunk_columns = min(num_columns, max(math.isqrt(max_items), 1))
+        num_rows = min(max_items // num_chunk_columns, max_size)
+        num_chunk_columns = min(num_columns, max_items // num_rows)
+        return num_rows, num_chunk_columns
+
     @staticmethod
     def get_column_ranges(dataset):
         """Return the column ranges per name for the dataset.
@@ -237,14 +446,27 @@ class DatasetBuffer:
         return [x.decode("utf8") for x in name_dataset[:]]
 
     @staticmethod
-    def to_dataframe(dataset, column_range=None):
+    def to_dataframe(dataset, column_range=None, start=None, end=None, column_indices=None,
+                     columns=None):
         """Create a pandas DataFrame from a dataset created with this class.
 
+        Only the requested rows and columns are read from the dataset.
+
         Parameters
         ----------
         dataset : h5py.Dataset
         column_range : None | list
             first element is column start, second element is length
+        start : None | int
+            First row to read; defaults to 0.
+        end : None | int
+            Row after the last row to read; defaults to the length of the dataset.
+        column_indices : None | list
+            Indices of the columns to read, in the order in which they are
+            returned; overrides column_range.
+        columns : None | list
+            All columns of the dataset, if the caller already has them;
+            otherwise, they are read from the store.
 
         Returns
         -------
@@ -252,16 +474,30 @@ class DatasetBuffer:
 
         """
         length = dataset.attrs["length"]
-        columns = DatasetBuffer.get_columns(dataset)
-        if column_range is None:
-            return pd.DataFrame(dataset[:length], columns=columns)
-
-        start = column_range[0]
-        end = start + column_range[1]
-        return pd.DataFrame(
-            dataset[:length, start:end],
-            columns=columns[start:end],
-        )
+        start = 0 if start is None else start
+        end = length if end is None else min(end, length)
+        if columns is None:
+            columns = DatasetBuffer.get_columns(dataset)
+        if column_indices is None:
+            if column_range is None:
+                return pd.DataFrame(dataset[start:end], columns=columns)
+            column_indices = range(column_range[0], column_range[0] + column_range[1])
+
+        column_indices = np.asarray(column_indices, dtype=int)
+        names = [columns[i] for i in column_indices]
+        if column_indices.size == 0:
+            return pd.DataFrame(np.empty((max(end - start, 0), 0)), columns=names)
+
+        # h5py requires increasing indices. Read each column once and then
+        # reorder.
+        unique_indices, inverse = np.unique(column_indices, return_inverse=True)
+        if unique_indices[-1] - unique_indices[0] + 1 == unique_indices.size:
+            data = dataset[start:end, unique_indices[0]:unique_indices[-1] + 1]
+        else:
+            data = dataset[start:end, unique_indices.tolist()]
+        if not np.array_equal(unique_indices, column_indices):
+            data = data[:, inverse]
+        return pd.DataFrame(data, columns=names)
 
     @staticmethod
     def to_datetime(dataset):
@@ -43,31 +43,58 @@ class dssBus(dssObjectBase):
 
     }
     VARIABLE_OUTPUTS_COMPLEX = ()
+    ACTIVATION_SLOT = "bus"
 
-    def __init__(self, dssInstance=None):
+    def __init__(self, dssInstance=None, info=None):
+        """Create the bus from the active OpenDSS bus.
+
+        Parameters
+        ----------
+        dssInstance
+        info : dict | None
+            Topology of the bus from read_info. Read from the active bus if None.
+
+        """
         if dssInstance is None:
             dssInstance = dss
-        name = dssInstance.Bus.Name()
+        if info is None:
+            info = self.read_info(dssInstance)
+        self._Info = info
+        name = info["name"]
         super(dssBus, self).__init__(dssInstance, name, name)
         self._Index = None
         self.XY = None
         self._Class = 'Bus'
         #  self._Nodes is nested in a list to be consistent with dssElement._Nodes
-        self._Nodes = [dssInstance.Bus.Nodes()]
+        self._Nodes = [info["nodes"]]
         self._NumTerminals = 1
-        self._NumConductors = len(dssInstance.Bus.Nodes())
-        self.Distance = dssInstance.Bus.Distance()
-        BusVarDict = dssInstance.Bus.__dict__
-        for key in BusVarDict.keys():
-            try:
-                self._Variables[key] = getattr(dssInstance.Bus, key)
-            except:
-                self._Variables[key] = None
-        if self.GetVariable('X') is not None:
-            self.XY = [self.GetVariable('X'), self.GetVariable('Y')]
+        self._NumConductors = len(info["nodes"])
+        self.Distance = info["distance"]
+        # getattr on a module returns the values in its __dict__.
+        self._Variables.update(dssInstance.Bus.__dict__)
+        if info["x"] is not None:
+            self.XY = [info["x"], info["y"]]
         else:
             self.XY = [0, 0]
 
+    @staticmethod
+    def read_info(dssInstance):
+        """Read the topology of the active bus from OpenDSS.
+
+        Returns
+        -------
+        dict
+            JSON-serializable values needed to create the bus
+
+        """
+        return {
+            "name": dssInstance.Bus.Name(),
+            "nodes": dssInstance.Bus.Nodes(),
+            "distance": dssInstance.Bus.Distance(),
+            "x": dssInstance.Bus.X(),
+            "y": dssInstance.Bus.Y(),
+        }
+
     @property
     def NumConductors(self):
         return self._NumConductors
@@ -80,6 +107,9 @@ class dssBus(dssObjectBase):
     def Phases(self):
         return self._Nodes[:]
 
+    def IsActiveObject(self):
+        return self._dssInstance.Bus.Name() == self._Name
+
     def SetActiveObject(self):
         try:
             if self._dssInstance.Bus.Name() != self._Name:
@@ -14,6 +14,7 @@ class dssCircuit(dssObjectBase):
         "SubstationLosses",
         "TotalPower",
     )
+    ACTIVATION_SLOT = None
 
     def __init__(self, dssInstance=None):
         if dssInstance is None:
@@ -1,7 +1,9 @@
 import ast
 
 from opendssdirect import DSSException
+import numpy as np
 
+from pydss.activation_tracker import activation_tracker
 from pydss.dssBus import dssBus
 from pydss.dssObjectBase import dssObjectBase
 from pydss.exceptions import InvalidParameter
@@ -51,26 +53,45 @@ class dssElement(dssObjectBase):
 
     _MAX_CONDUCTORS = 4
 
-    def __init__(self, dssInstance):
-        fullName = dssInstance.Element.Name()
-        if dssInstance.CktElement.Name() != fullName:
-            raise Exception(f"name mismatch {dssInstance.CktElement.Name()} {fullName}")
-
+    # Incremented by InvalidateParameterCaches. Cached parameters read under an older
+    # generation are discarded.
+    _ParameterCacheGeneration = 0
+
+    def __init__(self, dssInstance, info=None, bus_info=None):
+        """Create the element from the active OpenDSS element.
+
+        Parameters
+        ----------
+        dssInstance
+        info : dict | None
+            Topology of the element from read_info. Read from the active element if None.
+        bus_info : dict | None
+            Maps bus name to the info of the bus from dssBus.read_info. Read from
+            OpenDSS if None.
+
+        """
+        if info is None:
+            info = self.read_info(dssInstance)
+        self._Info = info
+        fullName = info["full_name"]
         self._Class, name = fullName.split('.', 1)
         super(dssElement, self).__init__(dssInstance, name, fullName)
-        self._Enabled = dssInstance.CktElement.Enabled()
+        self._ParameterCache = {}
+        self._CacheGeneration = dssElement._ParameterCacheGeneration
+        self._IsCircuitElement = False
+        self._Enabled = info["enabled"]
         if not self._Enabled:
             return
 
         self._Parameters = {}
-        self._NumTerminals = dssInstance.CktElement.NumTerminals()
-        self._NumConductors = dssInstance.CktElement.NumConductors()
+        self._NumTerminals = info["num_terminals"]
+        self._NumConductors = info["num_conductors"]
 
         assert self._NumConductors <= self._MAX_CONDUCTORS, str(self._NumConductors)
-        self._NumPhases = dssInstance.CktElement.NumPhases()
+        self._NumPhases = info["num_phases"]
 
         n = self._NumConductors
-        nodes = dssInstance.CktElement.NodeOrder()
+        nodes = info["node_order"]
         self._Nodes = [nodes[i * n:(i + 1) * n] for i in range((len(nodes) + n - 1) // n)]
 
         assert len(nodes) == self._NumTerminals * self._NumConductors, \
@@ -78,32 +99,71 @@ class dssElement(dssObjectBase):
 
         self._dssInstance = dssInstance
 
-        PropertiesNames = self._dssInstance.Element.AllPropertyNames()
-        AS = range(len(PropertiesNames))
-        for i, PptName in zip(AS, PropertiesNames):
+        for i, PptName in enumerate(info["property_names"]):
             self._Parameters[PptName] = str(i)
 
         CktElmVarDict = dssInstance.CktElement.__dict__
+        for VarName in info["variable_names"]:
+            CktElmVarDict[VarName] = None
+
+        # getattr on a module returns the values in its __dict__.
+        self._Variables.update(CktElmVarDict)
+        self.Bus = info["bus_names"]
+        self.BusCount = len(self.Bus)
+        self._BusInfo = bus_info
+        self._sBus = None
+
+    @classmethod
+    def read_info(cls, dssInstance):
+        """Read the topology of the active element from OpenDSS.
+
+        Returns
+        -------
+        dict
+            JSON-serializable values needed to create the element
+
+        """
+        fullName = dssInstance.Element.Name()
+        if dssInstance.CktElement.Name() != fullName:
+            raise Exception(f"name mismatch {dssInstance.CktElement.Name()} {fullName}")
+
+        info = {"full_name": fullName, "enabled": dssInstance.CktElement.Enabled()}
+        if not info["enabled"]:
+            return info
+
+        info["num_terminals"] = dssInstance.CktElement.NumTerminals()
+        info["num_conductors"] = dssInstance.CktElement.NumConductors()
+        info["num_phases"] = dssInstance.CktElement.NumPhases()
+        info["node_order"] = dssInstance.CktElement.NodeOrder()
+        info["property_names"] = dssInstance.Element.AllPropertyNames()
         try:
-            for VarName in dssInstance.CktElement.AllVariableNames():
-                CktElmVarDict[VarName] = None
+            info["variable_names"] = dssInstance.CktElement.AllVariableNames()
         except DSSException as e:
             # Prior to OpenDSSDirect.py v0.8.0 this returned an empty list for non-PC elements.
             # v0.8.0 and later raises an exception. Ignore the error.
             if e.args[1] != "The active circuit element is not a PC Element":
                 raise
+            info["variable_names"] = []
 
-        for key in CktElmVarDict.keys():
-            try:
-                self._Variables[key] = getattr(dssInstance.CktElement, key)
-            except:
-                self._Variables[key] = None
-        self.Bus = dssInstance.CktElement.BusNames()
-        self.BusCount = len(self.Bus)
-        self.sBus = []
-        for BusName in self.Bus:
-            self._dssInstance.Circuit.SetActiveBus(BusName)
-            self.sBus.append(dssBus(self._dssInstance))
+        info["bus_names"] = dssInstance.CktElement.BusNames()
+        info["buses"] = []
+        for BusName in info["bus_names"]:
+            dssInstance.Circuit.SetActiveBus(BusName)
+            info["buses"].append(dssInstance.Bus.Name())
+        return info
+
+    @property
+    def sBus(self):
+        """Return the dssBus objects of the element's buses. They are created on first access."""
+        if self._sBus is None:
+            self._sBus = []
+            for BusName in self._Info["buses"]:
+                if self._BusInfo is None or BusName not in self._BusInfo:
+                    self._dssInstance.Circuit.SetActiveBus(BusName)
+                    self._sBus.append(dssBus(self._dssInstance))
+                else:
+                    self._sBus.append(dssBus(self._dssInstance, self._BusInfo[BusName]))
+        return self._sBus
 
     def GetInfo(self):
         return self._Class, self._Name
@@ -135,33 +195,79 @@ class dssElement(dssObjectBase):
             return 0, None
 
     def GetValue(self, VarName, convert=False):
-        if self._dssInstance.Element.Name() != self._FullName:
-            self.SetActiveObject()
-        if VarName in self._Variables:
-            VarValue = self.GetVariable(VarName, convert=convert)
-        elif VarName in self._Parameters:
-            VarValue = self.GetParameter(VarName)
-            if convert:
-                VarValue = ValueByNumber(self._FullName, VarName, VarValue)
-        else:
-            return None
+        with activation_tracker.track():
+            activation_tracker.activate(self)
+            if VarName in self._Variables:
+                VarValue = self.GetVariable(VarName, convert=convert)
+            elif VarName in self._Parameters:
+                VarValue = self.GetParameter(VarName)
+                if convert:
+                    VarValue = ValueByNumber(self._FullName, VarName, VarValue)
+            else:
+                return None
         return VarValue
 
     def SetActiveObject(self):
-        self._dssInstance.Circuit.SetActiveElement(self._FullName)
-        if self._dssInstance.CktElement.Name() != self._dssInstance.Element.Name():
-            raise InvalidParameter('Object is not a circuit element')
+        index = self._dssInstance.Circuit.SetActiveElement(self._FullName)
+        if not self._IsCircuitElement:
+            # This does not change, so only check it on the first activation.
+            if self._dssInstance.CktElement.Name() != self._dssInstance.Element.Name():
+                raise InvalidParameter('Object is not a circuit element')
+            self._IsCircuitElement = index >= 0
+        return index >= 0
 
     def SetParameter(self, Param, Value):
         reply = self._dssInstance.utils.run_command(self._FullName + '.' + Param + ' = ' + str(Value))
+        # OpenDSS derives some properties from others, so drop all cached values.
+        self.InvalidateParameterCache()
         if reply != "":
             raise Exception(f"SetParameter failed: {reply}")
         return self.GetParameter(Param)
 
-    def GetParameter(self, Param):
-        if self._dssInstance.Element.Name() != self._FullName:
-            self._dssInstance.Circuit.SetActiveElement(self._FullName)
-        if self._dssInstance.Element.Name() == self._FullName:
+    def GetParameter(self, Param, use_cache=False):
+        """Return the value of an OpenDSS property of the element.
+
+        Parameters
+        ----------
+        Param : str
+        use_cache : bool
+            If True, return the value cached by an earlier call and cache the value
+            if it is read. Only use this for properties that are not changed by
+            solving the circuit, such as ratings. SetParameter, set_parameters and
+            InvalidateParameterCaches invalidate the cache.
+
+        Returns
+        -------
+        float | list | str | None
+            None if the element cannot be activated
+
+        """
+        if not use_cache:
+            return self._ReadParameter(Param)
+
+        if self._CacheGeneration != dssElement._ParameterCacheGeneration:
+            self._ParameterCache.clear()
+            self._CacheGeneration = dssElement._ParameterCacheGeneration
+        key = Param.lower()
+        value = self._ParameterCache.get(key)
+        if value is None:
+            value = self._ReadParameter(Param)
+            if value is not None:
+                self._ParameterCache[key] = value
+        return value
+
+    def InvalidateParameterCache(self):
+        """Drop the cached parameter values of the element."""
+        self._ParameterCache.clear()
+
+    @classmethod
+    def InvalidateParameterCaches(cls):
+        """Drop the cached parameter values of all elements. Call this after changing
+        properties with OpenDSS commands that do not go through the elements."""
+        dssElement._ParameterCacheGeneration += 1
+
+    def _ReadParameter(self, Param):
+        if activation_tracker.activate(self):
             # This always returns a string.
             # The real value could be a number, a list of numbers, or a string.
             x = self._dssInstance.Properties.Value(Param)
@@ -203,3 +309,49 @@ class dssElement(dssObjectBase):
     @property
     def Terminals(self):
         return list(range(1, self._NumTerminals + 1))
+
+
+def set_parameters(elements, param, values):
+    """Set a property of many elements with one block of OpenDSS commands.
+    Unlike dssElement.SetParameter, this does not read the values back.
+    It invalidates the parameter caches of the elements.
+
+    Parameters
+    ----------
+    elements : list
+        dssElement instances
+    param : str
+    values : list | np.ndarray | str | float
+        One value per element. A scalar sets the same value on every element.
+
+    Raises
+    ------
+    InvalidParameter
+        Raised if the number of values does not match the number of elements
+        or if OpenDSS rejects a value.
+
+    """
+    if not elements:
+        return
+    if np.isscalar(values):
+        values = [values] * len(elements)
+    elif len(values) != len(elements):
+        raise InvalidParameter(
+            f"number of values ({len(values)}) does not match the number of elements "
+            f"({len(elements)})"
+        )
+
+    commands = "\n".join(
+        f"{element.FullName}.{param} = {value}" for element, value in zip(elements, values)
+    )
+    dss_instance = elements[0]._dssInstance
+    try:
+        # DSS C-API runs the whole block with one call. The engine stops at
+        # the first error.
+        dss_instance.dss_lib.Text_CommandBlock(commands.encode(dss_instance.Text.codec))
+        dss_instance.Text.CheckForError()
+    except DSSException as e:
+        raise InvalidParameter(f"failed to set {param}: {e}") from e
+    finally:
+        for element in elements:
+            element.InvalidateParameterCache()
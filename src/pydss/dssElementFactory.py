@@ -4,11 +4,19 @@ from pydss.dssTransformer import dssTransformer
 from pydss.dssElement import dssElement
 
 
-def create_dss_element(element_class, element_name, dss_instance=None):
-    """Instantiate the correct class for the given element_class and element_name."""
+def get_dss_element_class(element_class):
+    """Return the class that pydss uses for elements of the given element_class."""
+    if element_class == "Transformer":
+        return dssTransformer
+    return dssElement
+
+
+def create_dss_element(element_class, element_name, dss_instance=None, info=None, bus_info=None):
+    """Instantiate the correct class for the given element_class and element_name.
+
+    info and bus_info are passed to the class; refer to dssElement.
+
+    """
     if dss_instance is None:
         dss_instance = dss
-    if element_class == "Transformer":
-        return dssTransformer(dss_instance)
-    else:
-        return dssElement(dss_instance)
+    return get_dss_element_class(element_class)(dss_instance, info=info, bus_info=bus_info)
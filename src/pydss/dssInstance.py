@@ -1,3 +1,4 @@
+from pydss.activation_tracker import activation_tracker
 from pydss.common import SimulationType
 from pydss.simulation_input_models import SimulationSettingsModel
 from pydss.pyContrReader import read_controller_settings_from_registry
@@ -13,19 +14,29 @@ from pydss.pyPostprocessor import pyPostprocess
 import pydss.pyControllers as pyControllers
 from pydss import helics_interface as HI
 from pydss.ResultData import ResultData
+from pydss.data_store import merge_into_data_store, open_data_store
+from pydss.pydss_fs_interface import STORE_FILENAMES
 from pydss.dssCircuit import dssCircuit
+from pydss.dssElement import dssElement
 from pydss.common import SnapshotTimePointSelectionMode, DATE_FORMAT
 from pydss.dssBus import dssBus
+from pydss.controller_dispatch import ControllerDispatchList
+from pydss.object_registry import LazyObjectDict
 from pydss import SolveMode
 from pydss.simulation_input_models import SimulationSettingsModel
 from pydss.utils.simulation_utils import SimulationFilteredTimeRange
 from pydss.utils.timing_utils import Timer, timer_stats_collector, track_timing
 from pydss.get_snapshot_timepoints import get_snapshot_timepoint
+from pydss.topology_cache import compute_model_hash, load_topology, read_topology, save_topology
 
 import opendssdirect as dss
 import numpy as np
 from loguru import logger
+from concurrent.futures import ProcessPoolExecutor
+import multiprocessing
 import json
+import shutil
+import tempfile
 import time
 import os
 from collections import defaultdict
@@ -49,6 +60,7 @@ class OpenDSS:
         self._maxConvergenceErrorCount = None
         self._maxConvergenceError = 0.0
         self._controller_iteration_counts = {}
+        self.profileStore = None
         self._simulation_range = SimulationFilteredTimeRange.from_settings(settings)
 
         root_path = settings.project.project_path
@@ -102,8 +114,16 @@ class OpenDSS:
         self._dssCommand = run_command
         self._dssSolution = self._dssInstance.Solution
         self._dssSolver = SolveMode.GetSolver(settings=settings, dssInstance=self._dssInstance)
-        self._dssBuses = self.CreateBusObjects()
-        self._dssObjects, self._dssObjectsByClass = self.CreateDssObjects(self._dssBuses)
+        topology = None
+        if settings.project.use_topology_cache:
+            topology_file = self._dssPath['Log'] / f"{self._dssPath['dssFilePath'].stem}_topology.json"
+            model_hash = compute_model_hash(self._dssPath['dssFilePath'])
+            topology = load_topology(topology_file, model_hash, self._dssInstance)
+            if topology is None:
+                topology = read_topology(self._dssInstance)
+                save_topology(topology_file, model_hash, topology)
+        self._dssBuses = self.CreateBusObjects(topology)
+        self._dssObjects, self._dssObjectsByClass = self.CreateDssObjects(self._dssBuses, topology)
         self._dssSolver.reSolve()
 
         if settings.profiles.use_profile_manager:
@@ -157,6 +177,13 @@ class OpenDSS:
         self._pyControls = {}
         self._pyControls_types = {}
         for ControllerType, ElementsDict in ControllerDict.items():
+            if pyControllers.pyController.IsBatchController(ControllerType):
+                # One controller updates all elements of the type.
+                Controller = pyControllers.pyController.CreateBatch(ControllerType, ElementsDict, self._dssObjects,
+                                                                    self._dssInstance, self._dssSolver)
+                self._pyControls['Controller.' + ControllerType] = Controller
+                logger.info(f'Created pyController -> Controller.{ControllerType} for {len(ElementsDict)} elements')
+                continue
             for ElmName, SettingsDict in ElementsDict.items():
                 Controller = pyControllers.pyController.Create(ElmName, ControllerType, SettingsDict, self._dssObjects,
                                                   self._dssInstance, self._dssSolver)
@@ -167,56 +194,71 @@ class OpenDSS:
                     if controller_name not in self._pyControls_types:
                         self._pyControls_types[controller_name] = class_name
                     logger.info('Created pyController -> Controller.' + ElmName)
+        self._controller_dispatch = ControllerDispatchList(self._pyControls, self._dssInstance)
         return
 
     def _update_controllers(self, Priority, Time, Iteration, UpdateResults):
-        errors = []
-        maxError = 0
-        _pyControls_types = set(self._pyControls_types.values())
-
-        for class_name in _pyControls_types:
-            self._dssInstance.Basic.SetActiveClass(class_name)
-            elm = self._dssInstance.ActiveClass.First()
-            while elm:
-                element_name = self._dssInstance.CktElement.Name()
-                controller_name = 'Controller.' + element_name
-                if controller_name in self._pyControls:
-                    controller = self._pyControls[controller_name]
-                    error = controller.Update(Priority, Time, UpdateResults)
-                    maxError = error if error > maxError else maxError
-                elm = self._dssInstance.ActiveClass.Next()
-        return maxError < self._settings.project.error_tolerance, maxError
+        has_converged, maxError, _ = self._controller_dispatch.update(
+            Priority,
+            Time,
+            Iteration,
+            UpdateResults,
+            self._settings.project.error_tolerance,
+            skip_converged=self._settings.project.skip_converged_controllers,
+        )
+        return has_converged, maxError
 
     @staticmethod
-    def CreateBusObjects():
-        dssBuses = {}
+    def CreateBusObjects(topology=None):
+        """Create the bus objects on first access. topology is the return value of
+        pydss.topology_cache.load_topology; if None, read the buses from OpenDSS."""
         BusNames = dss.Circuit.AllBusNames()
         dss.run_command('New  Fault.DEFAULT Bus1={} enabled=no r=0.01'.format(BusNames[0]))
-        for BusName in BusNames:
-            dss.Circuit.SetActiveBus(BusName)
-            dssBuses[BusName] = dssBus()
-        return dssBuses
 
-    @staticmethod
-    def CreateDssObjects(dssBuses):
-        dssObjects = {}
-        dssObjectsByClass = defaultdict(dict)
+        def create(BusName):
+            if topology is None:
+                dss.Circuit.SetActiveBus(BusName)
+                return dssBus()
+            return dssBus(dss, topology["buses"][BusName])
+
+        return LazyObjectDict(BusNames, create)
 
+    @staticmethod
+    def CreateDssObjects(dssBuses, topology=None):
+        """Create the element objects on first access. topology is the return value of
+        pydss.topology_cache.load_topology; if None, read the elements from OpenDSS."""
         InvalidSelection = ['Settings', 'ActiveClass', 'dss', 'utils', 'PDElements', 'XYCurves', 'Bus', 'Properties']
         # TODO: this causes a segmentation fault. Aadil says it may not be needed.
         #self._dssObjectsByClass={'LoadShape': self._get_relavent_object_dict('LoadShape')}
 
-        for ElmName in dss.Circuit.AllElementNames():
-            Class, Name =  ElmName.split('.', 1)
-            ClassName = Class + 's'
+        def create(ElmName):
+            Class, Name = ElmName.split('.', 1)
+            info = None if topology is None else topology["elements"].get(ElmName)
+            if info is not None:
+                return create_dss_element(Class, Name, info=info, bus_info=topology["buses"])
+
+            # Elements can be created while a caller iterates over an OpenDSS
+            # class, so restore the active element.
+            ActiveElement = dss.Element.Name()
             dss.Circuit.SetActiveElement(ElmName)
-            dssObjectsByClass[ClassName][ElmName] = create_dss_element(Class, Name)
-            dssObjects[ElmName] = dssObjectsByClass[ClassName][ElmName]
+            obj = create_dss_element(Class, Name)
+            if ActiveElement:
+                dss.Circuit.SetActiveElement(ActiveElement)
+            return obj
+
+        ElementNames = dss.Circuit.AllElementNames()
+        NamesByClass = defaultdict(list)
+        for ElmName in ElementNames:
+            NamesByClass[ElmName.split('.', 1)[0] + 's'].append(ElmName)
 
-        for ObjName in dssObjects.keys():
-            ClassName = ObjName.split('.')[0] + 's'
-            if ObjName not in dssObjectsByClass[Class]:
-                dssObjectsByClass[Class][ObjName] = dssObjects[ObjName]
+        dssObjects = LazyObjectDict(ElementNames, create)
+        dssObjectsByClass = defaultdict(dict)
+        for ClassName, Names in NamesByClass.items():
+            dssObjectsByClass[ClassName] = LazyObjectDict(Names, dssObjects.__getitem__)
+        if ElementNames:
+            # The class of the last element, without the plural s, holds every element.
+            Class = ElementNames[-1].split('.', 1)[0]
+            dssObjectsByClass[Class] = LazyObjectDict(ElementNames, dssObjects.__getitem__)
 
         dssObjects['Circuit.' + dss.Circuit.Name()] = dssCircuit()
         dssObjectsByClass['Circuits'] = {
@@ -441,6 +483,7 @@ class OpenDSS:
             self.ResultContainer.ExportResults()
 
         timer_stats_collector.log_stats(clear=True)
+        activation_tracker.log_stats(clear=True)
         if self._controller_iteration_counts:
             data = {
                 "Report": "ControllerIterationCounts",
@@ -462,18 +505,83 @@ class OpenDSS:
                 logger.warn("postprocessor %s reported a convergence error at step %s", name, step)
                 self._HandleConvergenceErrorChecks(step, error)
 
+        # Postprocessors can change any property with OpenDSS commands.
+        dssElement.InvalidateParameterCaches()
         return step, has_converged
 
     def RunMCsimulation(self, project, scenario, samples):
+        """Run Monte Carlo scenarios, each in Exports/<scenario>_MC<number>.
+
+        If the Monte Carlo settings define more than one worker, the scenarios
+        are divided among this process and worker processes. Each worker
+        compiles the circuit once and writes its own data store, which this
+        process merges into project.hdf_store.
+
+        """
+        from pydss.Extensions.MonteCarlo import get_seed
+        seed = get_seed(self._settings)
+        num_workers = min(self._settings.monte_carlo.num_workers, samples)
+        scenario_numbers = [list(range(i, samples, num_workers)) for i in range(num_workers)]
+        if num_workers == 1:
+            self.RunMCScenarios(project, scenario, scenario_numbers[0], seed)
+            return
+
+        store_format = self._settings.exports.data_store_format
+        store_dir = tempfile.mkdtemp(dir=self._dssPath["Export"], prefix="monte_carlo_stores_")
+        filenames = [
+            os.path.join(store_dir, f"worker{i}_{STORE_FILENAMES[store_format]}")
+            for i in range(1, num_workers)
+        ]
+        # OpenDSS keeps its state in the process, so the workers must not
+        # inherit it from this process.
+        context = multiprocessing.get_context("spawn")
+        logger.info("Run %s Monte Carlo scenarios with %s processes", samples, num_workers)
+        try:
+            with ProcessPoolExecutor(max_workers=num_workers - 1, mp_context=context) as executor:
+                futures = [
+                    executor.submit(
+                        run_monte_carlo_scenarios, project, scenario, filename, numbers, seed
+                    )
+                    for filename, numbers in zip(filenames, scenario_numbers[1:])
+                ]
+                self.RunMCScenarios(project, scenario, scenario_numbers[0], seed)
+                for future in futures:
+                    future.result()
+            merge_into_data_store(project.hdf_store, filenames)
+        finally:
+            shutil.rmtree(store_dir, ignore_errors=True)
+
+    def RunMCScenarios(self, project, scenario, scenario_numbers, seed):
+        """Run the Monte Carlo scenarios with the given numbers in this process.
+
+        Parameters
+        ----------
+        project : PyDssProject
+        scenario : PyDssScenario
+        scenario_numbers : list
+        seed : int
+
+        """
         from pydss.Extensions.MonteCarlo import MonteCarloSim
-        MC = MonteCarloSim(self._settings, self._dssPath, self._dssObjects, self._dssObjectsByClass)
-        for i in range(samples):
-            MC.Create_Scenario()
+        MC = MonteCarloSim(self._settings, self._dssPath, self._dssObjects, self._dssObjectsByClass,
+                           seed=seed)
+        for i in scenario_numbers:
+            MC.Create_Scenario(i)
+            self._dssSolver.restart()
+            # Solve at the start time, as after compiling, so that the first
+            # step does not start from the final state of the previous scenario.
+            self._dssSolver.reSolve()
             for is_complete, _, _, _ in self.RunSimulation(project, scenario, i):
                 if is_complete:
                     break
         return
 
+    def Close(self):
+        """Release the resources of the simulation, such as profile readers."""
+        if self.profileStore is not None:
+            self.profileStore.close()
+            self.profileStore = None
+
     def _GetActiveScenario(self):
         active_scenario = self._settings.project.active_scenario
         for scenario in self._settings.project.scenarios:
@@ -527,3 +635,31 @@ class OpenDSS:
     #                 filehandler.close()
     #                 L.removeHandler(filehandler)
     #     return
+
+
+def run_monte_carlo_scenarios(project, scenario, store_filename, scenario_numbers, seed):
+    """Compile the circuit and run Monte Carlo scenarios into a new data store.
+    Runs in a worker process of OpenDSS.RunMCsimulation.
+
+    Parameters
+    ----------
+    project : PyDssProject
+    scenario : PyDssScenario
+    store_filename : str
+    scenario_numbers : list
+    seed : int
+
+    """
+    settings = project.simulation_config
+    store_format = settings.exports.data_store_format
+    in_memory = settings.exports.export_data_in_memory
+    with open_data_store(store_filename, "w", store_format, in_memory) as hdf_store:
+        project.hdf_store = hdf_store
+        opendss = None
+        try:
+            opendss = OpenDSS(settings)
+            opendss.RunMCScenarios(project, scenario, scenario_numbers, seed)
+        finally:
+            if opendss is not None:
+                opendss.Close()
+            project.hdf_store = None
@@ -1,6 +1,7 @@
 
 import abc
  
+from pydss.activation_tracker import activation_tracker
 from pydss.exceptions import InvalidParameter
 from pydss.value_storage import ValueByLabel, ValueByList, ValueByNumber
 import numpy as np
@@ -10,6 +11,8 @@ class dssObjectBase(abc.ABC):
     VARIABLE_OUTPUTS_BY_LABEL = {}
     VARIABLE_OUTPUTS_BY_LIST = ()
     VARIABLE_OUTPUTS_COMPLEX = ()
+    # OpenDSS keeps one active object per slot. None means that reads do not need an active object.
+    ACTIVATION_SLOT = "element"
 
     def __init__(self, dssInstance, name, fullName):
         self._Name = name
@@ -18,6 +21,9 @@ class dssObjectBase(abc.ABC):
         self._dssInstance = dssInstance
         self._Enabled = True
         self._CachedValueStorage = {}
+        # Objects are created from the active OpenDSS object, which may not have been
+        # activated through the tracker.
+        activation_tracker.invalidate()
 
     @property
     def dss(self):
@@ -31,6 +37,10 @@ class dssObjectBase(abc.ABC):
     def SetActiveObject(self):
         """Set the active DSS object."""
 
+    def IsActiveObject(self):
+        """Return True if the object is the active DSS object."""
+        return self._dssInstance.Element.Name() == self._FullName
+
     def _get_labels(self, VarName):
         pass
 
@@ -53,18 +63,18 @@ class dssObjectBase(abc.ABC):
         return self._Name
 
     def GetValue(self, VarName, convert=False):
-        self.SetActiveObject()
-        if VarName in self._Variables:
-            VarValue = self.GetVariable(VarName, convert=convert)
-        else:
-            VarValue = np.NaN
+        with activation_tracker.track():
+            activation_tracker.activate(self)
+            if VarName in self._Variables:
+                VarValue = self.GetVariable(VarName, convert=convert)
+            else:
+                VarValue = np.NaN
         return VarValue
 
     def GetVariable(self, VarName, convert=False):
         if VarName not in self._Variables:
             raise InvalidParameter(f'{VarName} is an invalid variable name for element {self._FullName}')
-        if self._dssInstance.Element.Name() != self._FullName:
-            self.SetActiveObject()
+        activation_tracker.activate(self)
         func = self._Variables[VarName]
         if func is None:
             raise InvalidParameter(f"get function for {self._FullName} / {VarName} is None")
@@ -119,8 +129,7 @@ class dssObjectBase(abc.ABC):
         return self._Name
 
     def SetVariable(self, VarName, Value):
-        if self._dssInstance.Element.Name() != self._FullName:
-            self.SetActiveObject()
+        activation_tracker.activate(self)
         if VarName not in self._Variables:
             raise InvalidParameter(f"invalid variable name {VarName}")
 
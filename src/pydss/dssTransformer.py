@@ -1,4 +1,5 @@
 
+from pydss.activation_tracker import activation_tracker
 from pydss.dssElement import dssElement
 from pydss.value_storage import ValueByNumber
 from pydss.value_storage import ValueByList
@@ -50,11 +51,17 @@ class dssTransformer(dssElement):
         'taps'
     ]
 
-    def __init__(self, dssInstance):
-        super(dssTransformer, self).__init__(dssInstance)
-        self._NumWindings = dssInstance.Transformers.NumWindings()
+    def __init__(self, dssInstance, info=None, bus_info=None):
+        super(dssTransformer, self).__init__(dssInstance, info=info, bus_info=bus_info)
+        self._NumWindings = self._Info["num_windings"]
         self._dssInstance = dssInstance
 
+    @classmethod
+    def read_info(cls, dssInstance):
+        info = super(dssTransformer, cls).read_info(dssInstance)
+        info["num_windings"] = dssInstance.Transformers.NumWindings()
+        return info
+
     @property
     def NumWindings(self):
         return self._NumWindings
@@ -64,19 +71,20 @@ class dssTransformer(dssElement):
         return [values[i * nLists:(i + 1) * nLists] for i in range((len(values) + nLists - 1) // nLists)]
 
     def GetValue(self, VarName, convert=False):
-        if VarName in self._Variables:
-            VarValue = self.GetVariable(VarName, convert=convert)
-        elif VarName in self._Parameters:
-            VarValue = self.GetParameter(VarName)
-            if convert:
-                if VarName in self.VARIABLE_OUTPUTS_BY_LIST:
-                    VarValue = VarValue[:self.NumWindings]
-                    VarValue = ValueByList(
-                        self._FullName, VarName, VarValue, ['wdg{}'.format(i+1) for i in range(self.NumWindings)]
-                    )
-                else:
-                    VarValue = ValueByNumber(self._FullName, VarName, VarValue)
+        with activation_tracker.track():
+            if VarName in self._Variables:
+                VarValue = self.GetVariable(VarName, convert=convert)
+            elif VarName in self._Parameters:
+                VarValue = self.GetParameter(VarName)
+                if convert:
+                    if VarName in self.VARIABLE_OUTPUTS_BY_LIST:
+                        VarValue = VarValue[:self.NumWindings]
+                        VarValue = ValueByList(
+                            self._FullName, VarName, VarValue, ['wdg{}'.format(i+1) for i in range(self.NumWindings)]
+                        )
+                    else:
+                        VarValue = ValueByNumber(self._FullName, VarName, VarValue)
 
-        else:
-            return None
+            else:
+                return None
         return VarValue
@@ -9,6 +9,10 @@ class InvalidParameter(Exception):
     """Raised when bad user input is detected."""
 
 
+class DataStoreWriteError(Exception):
+    """Raised when writing results to the data store fails."""
+
+
 class OpenDssConvergenceError(Exception):
     """Raised when OpenDSS fails to converge on a solution."""
 
@@ -6,6 +6,7 @@ import os
 import re
 
 from loguru import logger
+import numpy as np
 
 
 from pydss.common import DataConversion, LimitsFilter, StoreValuesType, \
@@ -310,6 +311,25 @@ class ExportListProperty:
             return self._is_outside_limits(value)
         return self._is_inside_limits(value)
 
+    def should_store_values(self, values):
+        """Return a boolean array that is True where the values meet the input criteria.
+
+        Parameters
+        ----------
+        values : np.ndarray
+
+        Returns
+        -------
+        np.ndarray
+
+        """
+        if self._limits is None:
+            return np.ones(len(values), dtype=bool)
+
+        if self._limits_filter == LimitsFilter.OUTSIDE:
+            return (values < self._limits.min) | (values > self._limits.max)
+        return (values >= self._limits.min) & (values <= self._limits.max)
+
     def should_store_time_step(self):
         """Return True if the time step should be stored with the value."""
         return self.limits is not None
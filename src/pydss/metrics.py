@@ -8,14 +8,17 @@ from datetime import timedelta
 from pathlib import Path
 
 from loguru import logger
+import numpy as np
 import pandas as pd
 import opendssdirect as dss
 
+from pydss.bulk_readers import make_bulk_reader, make_loading_reader, make_terminal_power_reader
 from pydss.common import DataConversion, StoreValuesType
+from pydss.dataset_buffer import get_dataset_options
 from pydss.exceptions import InvalidConfiguration, InvalidParameter
 from pydss.reports.reports import ReportBase
 from pydss.storage_filters import STORAGE_TYPE_MAP, StorageFilterBase
-from pydss.value_storage import ValueByNumber, ValueStorageBase
+from pydss.value_storage import ValueArray, ValueByNumber, ValueStorageBase
 from pydss.node_voltage_metrics import NodeVoltageMetrics
 from pydss.simulation_input_models import SimulationSettingsModel
 from pydss.thermal_metrics import ThermalMetrics
@@ -29,7 +32,9 @@ class MetricBase(abc.ABC):
         self._base_path = None
         self._hdf_store = None
         self._max_chunk_bytes = settings.exports.hdf_max_chunk_bytes
+        self._dataset_options = get_dataset_options(settings.exports)
         self._num_steps = None
+        self._writer = None
         self._properties = {}  # StoreValuesType to ExportListProperty
         self._dss_objs = dss_objs
         self._name_to_dss_obj = {x.Name: x for x in dss_objs}
@@ -71,11 +76,22 @@ class MetricBase(abc.ABC):
         for container in self.iter_containers():
             container.flush_data()
 
-    def initialize_data_store(self, hdf_store, base_path, num_steps):
-        """Initialize data store values."""
+    def initialize_data_store(self, hdf_store, base_path, num_steps, writer=None):
+        """Initialize data store values.
+
+        Parameters
+        ----------
+        hdf_store : h5py.File
+        base_path : str
+        num_steps : int
+        writer : BackgroundDatasetWriter | None
+            If set, containers write their data on the writer's thread.
+
+        """
         self._hdf_store = hdf_store
         self._base_path = base_path
         self._num_steps = num_steps
+        self._writer = writer
 
     @staticmethod
     def is_circuit_wide():
@@ -113,7 +129,8 @@ class MetricBase(abc.ABC):
         cls = STORAGE_TYPE_MAP[prop.store_values_type]
         values = [ValueByNumber(x.FullName, self.label(), 0.0) for x in self._dss_objs]
         container = cls(
-            self._hdf_store, path, prop, 1, self._max_chunk_bytes, values, elem_names
+            self._hdf_store, path, prop, 1, self._max_chunk_bytes, values, elem_names,
+            writer=self._writer, dataset_options=self._dataset_options,
         )
         return container
 
@@ -139,6 +156,8 @@ class MetricBase(abc.ABC):
             max_chunk_bytes,
             values,
             elem_names,
+            writer=self._writer,
+            dataset_options=self._dataset_options,
             **kwargs,
         )
         return container
@@ -193,6 +212,8 @@ class ChangeCountMetricBase(MetricBase, abc.ABC):
             self._max_chunk_bytes,
             values,
             [x.FullName for x in self._dss_objs],
+            writer=self._writer,
+            dataset_options=self._dataset_options,
         )
         self._container.append(values)
         self._container.flush_data()
@@ -259,7 +280,8 @@ class MultiValueTypeMetricBase(MetricBase, abc.ABC):
                 vals,
             )
 
-    def append_values(self, time_step, store_nan=False):
+    def _collect_values(self, time_step):
+        """Return the value of each element at the current time step in name order."""
         if not self._name_order:
             self._name_order[:] = [x.FullName for x in self._iter_dss_objs()]
     
@@ -278,7 +300,10 @@ class MultiValueTypeMetricBase(MetricBase, abc.ABC):
             values = [self._get_value(x, time_step) for x in self._dss_objs]
 
         assert len(values) == len(self._dss_objs)
+        return values
 
+    def append_values(self, time_step, store_nan=False):
+        values = self._collect_values(time_step)
         if not self._containers:
             self._initialize_containers(values)
 
@@ -310,12 +335,32 @@ class MultiValueTypeMetricBase(MetricBase, abc.ABC):
 
 
 class OpenDssPropertyMetric(MultiValueTypeMetricBase):
-    """Stores metrics for any OpenDSS element property."""
+    """Stores metrics for any OpenDSS element property.
+
+    After the first time step the metric switches to a bulk reader if one is
+    available for the element classes and property. The bulk reader collects
+    the values for all elements in one OpenDSS call and passes one array per
+    time step to the storage containers.
+
+    """
+
+    def __init__(self, prop, dss_objs, settings):
+        super().__init__(prop, dss_objs, settings)
+        self._try_bulk_reads = settings.exports.use_bulk_reads
+        self._bulk_reader = None
+        self._bulk_arrays = {}  # StoreValuesType to ValueArray
 
     def _get_value(self, dss_obj, _time_step):
         return dss_obj.UpdateValue(self._name)
 
     def append_values(self, time_step, store_nan=False):
+        if self._bulk_reader is not None:
+            values = self._bulk_reader.read()
+            if values is not None:
+                return self._append_bulk_values(values, time_step, store_nan)
+            logger.info("Disabling bulk reads for %s", self.label())
+            self._bulk_reader = None
+
         curr_data = {}
         values = super().append_values(time_step, store_nan=store_nan)
         for _, value in zip(self._dss_objs, values):
@@ -325,8 +370,55 @@ class OpenDssPropertyMetric(MultiValueTypeMetricBase):
             else:
                 curr_data[value.make_columns()[0]] = value.value
 
+        if self._try_bulk_reads and not store_nan:
+            self._try_bulk_reads = False
+            self._bulk_reader = self._make_bulk_reader(time_step)
+
         return curr_data
 
+    def _append_bulk_values(self, values, time_step, store_nan):
+        if store_nan:
+            values = np.full_like(values, np.nan)
+
+        for value_type, container in self._containers.items():
+            prop = self._properties[value_type]
+            array = self._bulk_arrays[value_type]
+            array.set_data(convert_array(values, self._bulk_reader.element_starts, prop.data_conversion))
+            container.append_values(array, time_step)
+
+        return dict(zip(array.columns, array.data.tolist()))
+
+    def _make_bulk_reader(self, time_step):
+        """Return a bulk reader if one exists and produces the same values as
+        the per-element path.
+        """
+        full_name_to_dss_obj = {x.FullName: x for x in self._dss_objs}
+        dss_objs = [full_name_to_dss_obj[x] for x in self._name_order]
+        reader = make_bulk_reader(dss_objs, self._name)
+        if reader is None:
+            return None
+
+        # Read the same solution both ways and only use the bulk reader if it matches.
+        values = self._collect_values(time_step)
+        bulk_values = reader.read()
+        if bulk_values is None:
+            return None
+        for value_type in self._containers:
+            prop = self._properties[value_type]
+            expected = ValueArray([
+                convert_data(x, prop.name, y, prop.data_conversion)
+                for x, y in zip(self._name_order, values)
+            ])
+            actual = convert_array(bulk_values, reader.element_starts, prop.data_conversion)
+            if not np.array_equal(expected.data, actual, equal_nan=True):
+                logger.debug("Bulk values do not match element values for %s", self.label())
+                self._bulk_arrays.clear()
+                return None
+            self._bulk_arrays[value_type] = expected
+
+        logger.debug("Using bulk reads for %s", self.label())
+        return reader
+
 
 # These next two might work but are untested.
 
@@ -683,24 +775,17 @@ class NodeVoltageMetric(MetricBase):
                 self._secondary_indices.append(i)
 
     def append_values(self, time_step, store_nan=False):
-        voltages = dss.Circuit.AllBusMagPu()
-        if self._voltages is None:
+        self._voltages = np.array(dss.Circuit.AllBusMagPu(), dtype=float)
+        if self._node_names is None:
             # TODO: limit to objects that have been added
             self._node_names = dss.Circuit.AllNodeNames()
             self._identify_primary_v_secondary()
-            self._voltages = [
-                ValueByNumber(x, "Voltage", y)
-                for x, y in zip(self._node_names, voltages)
-            ]
             self._voltage_metrics.set_node_info(
                 self._primary_node_names,
                 self._primary_indices,
                 self._secondary_node_names,
                 self._secondary_indices,
             )
-        else:
-            for i, voltage in enumerate(voltages):
-                self._voltages[i].set_value_from_raw(voltage)
 
         if not store_nan:
             self._voltage_metrics.update(time_step, self._voltages)
@@ -816,6 +901,9 @@ class OpenDssExportMetric(MetricBase):
                 self._values.append(ValueByNumber("Total", self.label(), 0.0))
                 break
             self._values.append(ValueByNumber(dss_obj.FullName, self.label(), 0.0))
+        self._value_array = ValueArray(self._values)
+        self._try_reader = settings.exports.use_bulk_reads
+        self._reader = None
 
     def __del__(self):
         shutil.rmtree(self._tmp_dir)
@@ -828,10 +916,49 @@ class OpenDssExportMetric(MetricBase):
         return result
 
     def append_values(self, time_step, store_nan=False):
-        filename = self._run_command()
-        self.parse_file(filename)
+        if self._reader is not None and not store_nan:
+            values = self._reader.read()
+            if values is None:
+                logger.info("Disabling in-process values for %s; reverting to export files", self.label())
+                self._reader = None
+            else:
+                self._value_array.set_data(self.convert_reader_values(values))
+
+        if self._reader is None:
+            filename = self._run_command()
+            self.parse_file(filename)
+            self._value_array.set_values(self._values)
+            if self._try_reader and not store_nan:
+                self._try_reader = False
+                self._reader = self._make_reader()
+
         self._append_func(time_step, store_nan=store_nan)
 
+    def _make_reader(self):
+        """Return a reader that computes the values in process if one exists and
+        it matches the values in the export file that was just parsed.
+        """
+        # The names only include the first element when summing elements.
+        reader = self.make_reader(self._dss_objs[:len(self._names)])
+        if reader is None:
+            return None
+
+        values = reader.read()
+        if values is None:
+            return None
+        values = self.convert_reader_values(values)
+        # The export files are written with limited precision.
+        if not np.allclose(values, self._value_array.data, rtol=0, atol=self.export_file_precision(), equal_nan=True):
+            logger.warning(
+                "In-process values for %s do not match the OpenDSS export file; using export files",
+                self.label(),
+            )
+            return None
+
+        logger.debug("Computing values for %s in process", self.label())
+        self._value_array.set_data(values)
+        return reader
+
     def _append_values(self, time_step, store_nan=False):
         if not self._containers:
             for prop in self._properties.values():
@@ -853,17 +980,16 @@ class OpenDssExportMetric(MetricBase):
                 )
 
         if store_nan:
-            for i in range(len(self._values)):
-                self._values[i].set_nan()
+            self._value_array.set_nan()
 
         for sv_type, prop in self._properties.items():
-            self._containers[sv_type].append_values(self._values, time_step)
+            self._containers[sv_type].append_values(self._value_array, time_step)
 
     def _append_summed_values(self, time_step, store_nan=False):
         if store_nan:
             return
 
-        self._values[0].set_value(sum([x.value for x in self._values]))
+        self._value_array.set_data(self._value_array.data.sum())
 
         prop = next(iter(self._properties.values()))
         if not self._containers:
@@ -882,7 +1008,7 @@ class OpenDssExportMetric(MetricBase):
                 self._values,
             )
 
-        self._containers[prop.store_values_type].append_values(self._values, time_step)
+        self._containers[prop.store_values_type].append_values(self._value_array, time_step)
 
     def _check_output(self):
         filename = self._run_command()
@@ -942,6 +1068,30 @@ class OpenDssExportMetric(MetricBase):
     def export_command(self):
         """Return the command to run in OpenDSS."""
 
+    @staticmethod
+    def export_file_precision():
+        """Return the absolute precision of the values in the export file."""
+        return 0.0
+
+    @staticmethod
+    def convert_reader_values(values):
+        """Convert values returned by the reader to the values in the export file."""
+        return values
+
+    def make_reader(self, dss_objs):
+        """Return a reader that computes the exported values in process.
+
+        Parameters
+        ----------
+        dss_objs : list
+
+        Returns
+        -------
+        BulkReaderBase | None
+
+        """
+        return None
+
     @staticmethod
     @abc.abstractmethod
     def label():
@@ -985,6 +1135,13 @@ class ExportLoadingsMetric(OpenDssExportMetric):
         filename = Path(self._tmp_dir) / "opendss_loading.csv"
         return f"export capacity {filename}"
 
+    @staticmethod
+    def export_file_precision():
+        return 0.01
+
+    def make_reader(self, dss_objs):
+        return make_loading_reader(dss_objs)
+
     @staticmethod
     def label():
         return "Loading"
@@ -1026,6 +1183,17 @@ class ExportPowersMetric(OpenDssExportMetric):
         filename = Path(self._tmp_dir) / "opendss_powers.csv"
         return f"export powers {filename}"
 
+    @staticmethod
+    def export_file_precision():
+        return 0.1
+
+    @staticmethod
+    def convert_reader_values(values):
+        return np.abs(values)
+
+    def make_reader(self, dss_objs):
+        return make_terminal_power_reader(dss_objs)
+
     @staticmethod
     def expected_column_headers():
         return {0: "Element", 1: "Terminal", 2: "P(kW)"}
@@ -1101,13 +1269,14 @@ class OverloadsMetricInMemory(OpenDssExportMetric):
             self._thermal_metrics.transformer_names = transformer_names
             self._discovered_elements = True
 
+        loadings = self._value_array.data
         if self._transformer_index is None:
             # There are no transformers.
-            line_loadings = self._values[:]
-            transformer_loadings = []
+            line_loadings = loadings
+            transformer_loadings = loadings[:0]
         else:
-            line_loadings = self._values[:self._transformer_index]
-            transformer_loadings = self._values[self._transformer_index:]
+            line_loadings = loadings[:self._transformer_index]
+            transformer_loadings = loadings[self._transformer_index:]
 
         if not store_nan:
             self._thermal_metrics.update(time_step, line_loadings, transformer_loadings)
@@ -1150,6 +1319,13 @@ class OverloadsMetricInMemory(OpenDssExportMetric):
         filename = Path(self._tmp_dir) / "opendss_capacity.csv"
         return f"export capacity {filename}"
 
+    @staticmethod
+    def export_file_precision():
+        return 0.01
+
+    def make_reader(self, dss_objs):
+        return make_loading_reader(dss_objs)
+
     @staticmethod
     def _get_name_from_line(fields):
         return fields[0].strip()
@@ -1200,6 +1376,42 @@ def convert_data(name, prop_name, value, conversion):
     return converted
 
 
+def convert_array(values, element_starts, conversion):
+    """Apply a data conversion to the values of all elements.
+
+    Parameters
+    ----------
+    values : np.ndarray
+        Values for all elements, concatenated
+    element_starts : np.ndarray
+        Index of each element's first value in values
+    conversion : DataConversion
+
+    Returns
+    -------
+    np.ndarray
+
+    """
+    if conversion == DataConversion.ABS:
+        return _abs(values)
+    if conversion == DataConversion.SUM:
+        return np.add.reduceat(values, element_starts)
+    if conversion == DataConversion.ABS_SUM:
+        return _abs(np.add.reduceat(values, element_starts))
+    if conversion == DataConversion.SUM_REAL:
+        return np.add.reduceat(values.real, element_starts)
+    if conversion == DataConversion.SUM_ABS_REAL:
+        return np.add.reduceat(np.abs(values.real), element_starts)
+    return values
+
+
+def _abs(values):
+    # np.abs on complex numbers can differ from Python's abs in the last bit; hypot matches.
+    if np.iscomplexobj(values):
+        return np.hypot(values.real, values.imag)
+    return np.abs(values)
+
+
 # Bus and Circuit are excluded.
 _OPEN_DSS_CLASS_FOR_ITERATION = {
     "Capacitor": dss.Capacitors,
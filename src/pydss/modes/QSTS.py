@@ -14,15 +14,7 @@ class QSTS(solver_base):
         self._dssSolution.Number(1)
         self._dssSolution.StepSize(self._sStepRes)
         self._dssSolution.MaxControlIterations(settings.max_control_iterations)
-
-        start_time_hours = self._Hour + self._Second / 3600.0
-        load_shape_resolutions_secs = get_load_shape_resolution_secs()
-        if load_shape_resolutions_secs == self._sStepRes:
-            # I don't know why this is needed in this case.
-            # The first data point gets skipped without it.
-            # FIXME
-            start_time_hours += self._sStepRes / 3600.0
-        self._dssSolution.DblHour(start_time_hours)
+        self.reset()
         return
 
     def SolveFor(self, mStartTime, mTimeStep):
@@ -61,4 +53,11 @@ class QSTS(solver_base):
             self._dssSolution.MaxControlIterations(self._settings.project.max_control_iterations)
 
     def reset(self):
-        pass
+        start_time_hours = self._Hour + self._Second / 3600.0
+        load_shape_resolutions_secs = get_load_shape_resolution_secs()
+        if load_shape_resolutions_secs == self._sStepRes:
+            # I don't know why this is needed in this case.
+            # The first data point gets skipped without it.
+            # FIXME
+            start_time_hours += self._sStepRes / 3600.0
+        self._dssSolution.DblHour(start_time_hours)
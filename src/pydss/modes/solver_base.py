@@ -50,6 +50,15 @@ class solver_base(abc.ABC):
         Steps = math.ceil(Seconds / self._sStepRes)
         return Steps, self._StartTime, self._EndTime
 
+    def restart(self):
+        """Move the simulation time back to the start time so that the
+        simulation can be run again without recompiling the circuit."""
+        self._Time = self._StartTime
+        time_offset = self._StartTime - self._Loadshape_init_time
+        self._Hour = time_offset.days * 24
+        self._Second = float(time_offset.seconds)
+        self.reset()
+
     def GetTotalSeconds(self):
         return (self._Time - self._StartTime).total_seconds()
 
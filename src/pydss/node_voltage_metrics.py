@@ -3,10 +3,11 @@ from datetime import datetime, timedelta
 from pathlib import Path
 
 from loguru import logger
+import numpy as np
 from pydantic import BaseModel, Field
 from pydantic import ConfigDict
 
-from pydss.utils.simulation_utils import CircularBufferHelper
+from pydss.utils.simulation_utils import CircularBufferArrayHelper
 
 class VoltageMetricsBaseModel(BaseModel):
     model_config = ConfigDict(title="VoltageMetricsBaseModel", str_strip_whitespace=True, validate_assignment=True, validate_default=True, extra="forbid", use_enum_values=False)
@@ -317,11 +318,11 @@ class NodeVoltageMetricsByType:
         self._node_names = None
         self._node_indices = None
         self._metric_1_time_steps = []
-        self._metric_2_violation_counts = []
+        self._metric_2_violation_counts = np.zeros(0, dtype=int)
         self._metric_3_time_steps = []
         self._metric_4_violations = []
-        self._metric_5_min_violations = []
-        self._metric_5_max_violations = []
+        self._metric_5_min_violations = np.zeros(0)
+        self._metric_5_max_violations = np.zeros(0)
         self._num_metric_6_time_points_outside_range_b = 0
         self._bufs = None
         self._num_time_points = 0
@@ -330,8 +331,8 @@ class NodeVoltageMetricsByType:
     def create_summary(metric_1, metric_2, metric_3, metric_5, metric_6, node_names,
                        num_time_points, resolution, range_a_limits, range_b_limits,
                        moving_window_minutes):
-        if not node_names:
-            # There may not be any secondary nodes.
+        if not node_names or not metric_5.min_voltages:
+            # There may not be any secondary nodes, or update may not have run.
             return None
 
         max_pnvdoaa = max((x.duration for x in metric_2.values())).total_seconds()
@@ -388,7 +389,7 @@ class NodeVoltageMetricsByType:
                 duration=x * self._resolution,
                 duration_percentage=x / self._num_time_points * 100,
             )
-            for i, x in enumerate(self._metric_2_violation_counts)
+            for i, x in enumerate(self._metric_2_violation_counts.tolist())
         }
         metric_3 = VoltageMetric3(
             time_points=self._metric_3_time_steps,
@@ -400,11 +401,11 @@ class NodeVoltageMetricsByType:
         metric_5 = VoltageMetric5(
             min_voltages={
                 self._node_names[i]: x
-                for i, x in enumerate(self._metric_5_min_violations)
+                for i, x in enumerate(self._metric_5_min_violations.tolist())
             },
             max_voltages={
                 self._node_names[i]: x
-                for i, x in enumerate(self._metric_5_max_violations)
+                for i, x in enumerate(self._metric_5_max_violations.tolist())
             },
         )
         metric_6 = VoltageMetric6(
@@ -447,36 +448,28 @@ class NodeVoltageMetricsByType:
 
     def update(self, time_step, voltages):
         cur_time = self._start_time + self._resolution * time_step
-        if self._bufs is None:
-            self._bufs = [CircularBufferHelper(self._window_size) for _ in range(len(self._node_names))]
-            self._metric_2_violation_counts = [0] * len(self._node_names)
-            self._metric_5_min_violations = [None] * len(self._node_names)
-            self._metric_5_max_violations = [None] * len(self._node_names)
-
-        count_outside_range_a = 0
-        any_outside_range_b = False
-        any_moving_avg_violates_range_a = False
+        is_first_update = self._bufs is None
+        if is_first_update:
+            self._bufs = CircularBufferArrayHelper(len(self._node_indices), self._window_size)
+            self._metric_2_violation_counts = np.zeros(len(self._node_indices), dtype=int)
+
         # The voltages passed include all nodes. self._node_indices has the ones
         # being tracked here.
-        for i, node_index in enumerate(self._node_indices):
-            voltage = voltages[node_index]
-            buf = self._bufs[i]
-            buf.append(voltage.value)
-            if not any_moving_avg_violates_range_a and self._is_outside_range_a(buf.average()):
-                any_moving_avg_violates_range_a = True
-
-            if self._is_outside_range_a(voltage.value):
-                count_outside_range_a += 1
-                self._metric_2_violation_counts[i] += 1
-            if self._is_outside_range_b(voltage.value):
-                any_outside_range_b = True
-            if self._metric_5_min_violations[i] is None:
-                self._metric_5_min_violations[i] = voltage.value
-                self._metric_5_max_violations[i] = voltage.value
-            elif voltage.value < self._metric_5_min_violations[i]:
-                self._metric_5_min_violations[i] = voltage.value
-            elif voltage.value > self._metric_5_max_violations[i]:
-                self._metric_5_max_violations[i] = voltage.value
+        node_voltages = voltages[self._node_indices]
+        self._bufs.append(node_voltages)
+        any_moving_avg_violates_range_a = self._is_outside_range_a(self._bufs.average()).any()
+
+        outside_range_a = self._is_outside_range_a(node_voltages)
+        count_outside_range_a = int(np.count_nonzero(outside_range_a))
+        self._metric_2_violation_counts += outside_range_a
+        any_outside_range_b = self._is_outside_range_b(node_voltages).any()
+        if is_first_update:
+            self._metric_5_min_violations = node_voltages.copy()
+            self._metric_5_max_violations = node_voltages.copy()
+        else:
+            # Comparisons with NaN are False, so NaN never replaces a value.
+            np.copyto(self._metric_5_min_violations, node_voltages, where=node_voltages < self._metric_5_min_violations)
+            np.copyto(self._metric_5_max_violations, node_voltages, where=node_voltages > self._metric_5_max_violations)
 
         if count_outside_range_a > 0:
             if not any_outside_range_b:
@@ -491,18 +484,18 @@ class NodeVoltageMetricsByType:
         if any_outside_range_b:
             self._num_metric_6_time_points_outside_range_b += 1
 
-    def _is_outside_range_a(self, value):
-        return value < self._range_a_limits.min or value > self._range_a_limits.max
+    def _is_outside_range_a(self, values):
+        return (values < self._range_a_limits.min) | (values > self._range_a_limits.max)
 
-    def _is_outside_range_b(self, value):
-        return value < self._range_b_limits.min or value > self._range_b_limits.max
+    def _is_outside_range_b(self, values):
+        return (values < self._range_b_limits.min) | (values > self._range_b_limits.max)
 
     def increment_steps(self):
         self._num_time_points += 1
 
     def set_node_info(self, node_names, node_indices):
         self._node_names = node_names
-        self._node_indices = node_indices
+        self._node_indices = np.array(node_indices, dtype=int)
 
 
 class NodeVoltageMetrics:
@@ -568,8 +561,8 @@ class NodeVoltageMetrics:
         Parameters
         ----------
         time_step : int
-        voltages : list
-            list of ValueStorageBase
+        voltages : np.ndarray
+            per-unit voltage magnitudes for all nodes, ordered like Circuit.AllNodeNames
 
         """
         for metric in self._metrics.values():
@@ -0,0 +1,57 @@
+"""Mappings of pydss objects that create the objects on first access."""
+
+from collections.abc import MutableMapping
+
+
+_NOT_CREATED = object()
+
+
+class LazyObjectDict(MutableMapping):
+    """Maps names to pydss objects and creates each object the first time that
+    it is accessed.
+
+    Iterating over the keys or checking membership does not create objects.
+    Iterating over values or items creates all of them.
+
+    Parameters
+    ----------
+    names : iterable
+        Names of the objects
+    create : callable
+        Called with a name to create the object
+
+    """
+
+    def __init__(self, names, create):
+        self._objects = dict.fromkeys(names, _NOT_CREATED)
+        self._create = create
+
+    def __getitem__(self, name):
+        obj = self._objects[name]
+        if obj is _NOT_CREATED:
+            obj = self._create(name)
+            self._objects[name] = obj
+        return obj
+
+    def __setitem__(self, name, obj):
+        self._objects[name] = obj
+
+    def __delitem__(self, name):
+        del self._objects[name]
+
+    def __contains__(self, name):
+        return name in self._objects
+
+    def __iter__(self):
+        return iter(self._objects)
+
+    def __len__(self):
+        return len(self._objects)
+
+    def __repr__(self):
+        return f"{type(self).__name__}({len(self)} objects, {self.num_created} created)"
+
+    @property
+    def num_created(self):
+        """Return the number of objects that have been created."""
+        return sum(1 for x in self._objects.values() if x is not _NOT_CREATED)
@@ -61,10 +61,10 @@ class PvController(ControllerAbstract):
         self._dss_solver = dss_solver
         self._settings = PvControllerModel(**settings)
 
-        self._base_kv = float(pv_obj.GetParameter('kv'))
-        self._s_rated = float(pv_obj.GetParameter('kVA'))
-        self._p_rated = float(pv_obj.GetParameter('Pmpp'))
-        self._q_rated = float(pv_obj.GetParameter('kvarMax'))
+        self._base_kv = float(pv_obj.GetParameter('kv', use_cache=True))
+        self._s_rated = float(pv_obj.GetParameter('kVA', use_cache=True))
+        self._p_rated = float(pv_obj.GetParameter('Pmpp', use_cache=True))
+        self._q_rated = float(pv_obj.GetParameter('kvarMax', use_cache=True))
         self._cutin = float(pv_obj.SetParameter('%cutin', 0)) / 100
         self._cutout = float(pv_obj.SetParameter('%cutout', 0)) / 100
         self._damp_coef = self._settings.damp_coef
@@ -0,0 +1,368 @@
+from collections import defaultdict
+
+import numpy as np
+
+from pydss.dssElement import dssElement
+from pydss.exceptions import InvalidConfiguration
+from pydss.pyControllers.enumerations import SmartControls, ControlPriority, VoltWattCurtailmentStrategy, VoltageCalcModes
+from pydss.pyControllers.pyControllerAbstract import BatchControllerAbstract
+from pydss.pyControllers.models import PvControllerModel
+
+
+# kvar correction that PvController applies to two-phase PV systems
+TWO_PHASE_KVAR_FACTOR = 1.3905768334328491495461135972974
+
+
+class PvControllerFleet(BatchControllerAbstract):
+    """Vectorized implementation of the smart control modes of :class:`PvController` for a fleet of PV systems.
+
+    Each PV system has its own :class:`pydss.pyControllers.models.PvControllerModel` settings, as with
+    PvController. Each Update reads the node voltages of the circuit in one call and the powers of the
+    PV systems in one pass, evaluates the control curves of all PV systems with numpy, and writes the
+    new set points with one batch of property edits.
+
+    Supports the None, cpf, VVar and vwatt control modes. The vpf and trip modes solve the circuit for
+    each PV system and are only supported by PvController.
+
+        :param settings_by_element: Maps PVSystem element name to the settings for its controller
+        :type settings_by_element: dict
+        :param dss_instance: An :class:`opendssdirect` instance
+        :type dss_instance: :class:`opendssdirect`
+        :param element_object_list: Dictionary of all dssElement, dssBus and dssCircuit objects
+        :type element_object_list: dict
+        :param dss_solver: An instance of one of the classed defined in :mod:`pydss.SolveMode`.
+        :type dss_solver: :mod:`pydss.SolveMode`
+        :raises: InvalidConfiguration if an element is not a PVSystem or uses an unsupported control mode
+
+    """
+
+    SUPPORTED_CONTROLS = (
+        SmartControls.NONE,
+        SmartControls.CONSTANT_POWER_FACTOR,
+        SmartControls.VOLT_VAR,
+        SmartControls.VOLT_WATT,
+    )
+
+    def __init__(self, settings_by_element, dss_instance, element_object_list, dss_solver):
+        """Constructor method
+        """
+        super(PvControllerFleet, self).__init__(settings_by_element, dss_instance, element_object_list, dss_solver)
+        self._dss_instance = dss_instance
+        self._dss_solver = dss_solver
+        self._name = 'pyCont_PvControllerFleet'
+        self._element_names = list(settings_by_element)
+        self._settings = [PvControllerModel(**x) for x in settings_by_element.values()]
+        for name, settings in zip(self._element_names, self._settings):
+            if not name.lower().startswith('pvsystem.'):
+                raise InvalidConfiguration(f'PvControllerFleet works only with OpenDSS PVSystem elements: {name}')
+            for i in range(1, 4):
+                control = getattr(settings, 'control' + str(i))
+                if control not in self.SUPPORTED_CONTROLS:
+                    raise InvalidConfiguration(
+                        f'PvControllerFleet does not support control mode {control.value} ({name}). '
+                        'Use PvController.'
+                    )
+
+        self.time_change = False
+        self.time = (-1, 0)
+        self.itr = 0
+        num_pvs = len(self._element_names)
+        self._errors = np.zeros(num_pvs)
+        self.old_q_pv = np.zeros(num_pvs)
+        self.old_p_calc = np.zeros(num_pvs)
+        self.p_mppt = np.full(num_pvs, 100.0)
+        self.pf = np.ones(num_pvs)
+        self._p_disconnected = np.zeros(num_pvs, dtype=bool)
+        self._edits = []
+
+        # Indices of the PV systems that run each control mode, for each priority
+        self._controls = []
+        for i in range(1, 4):
+            indices_by_control = defaultdict(list)
+            for j, settings in enumerate(self._settings):
+                indices_by_control[getattr(settings, 'control' + str(i))].append(j)
+            self._controls.append({k: np.array(v, dtype=int) for k, v in indices_by_control.items()})
+        self.control_dict = {
+            SmartControls.NONE : lambda indices: np.zeros(len(indices)),
+            SmartControls.CONSTANT_POWER_FACTOR : self.constant_powerfactor_control,
+            SmartControls.VOLT_VAR : self.volt_var_control,
+            SmartControls.VOLT_WATT : self.volt_watt_control,
+        }
+
+        for field in ('pf', 'u_min', 'u_db_min', 'u_db_max', 'u_max', 'u_min_c', 'u_max_c', 'damp_coef'):
+            setattr(self, '_' + field, np.array([getattr(x, field) for x in self._settings], dtype=float))
+        self._p_min_vw = np.array([x.p_min_vw for x in self._settings]) / 100
+        self._priority = [x.priority for x in self._settings]
+        self._available_power = np.array(
+            [x.vw_type == VoltWattCurtailmentStrategy.AVAILABLE_POWER for x in self._settings]
+        )
+        self._voltage_calc_mode = [x.voltage_calc_mode for x in self._settings]
+        self._read_ratings()
+        self._read_node_indices()
+        self.q_lim_pu = np.minimum(
+            np.minimum(self._q_rated / self._s_rated, [x.q_lim_pu for x in self._settings]), 1.0
+        )
+        return
+
+    def _read_ratings(self):
+        pv_indices = {}
+        pv_systems = self._dss_instance.PVsystems
+        flag = pv_systems.First()
+        while flag > 0:
+            pv_indices['pvsystem.' + pv_systems.Name().lower()] = pv_systems.Idx()
+            flag = pv_systems.Next()
+
+        num_pvs = len(self._element_names)
+        self._pv_indices = np.zeros(num_pvs, dtype=int)
+        self._s_rated = np.zeros(num_pvs)
+        self._p_rated = np.zeros(num_pvs)
+        self._q_rated = np.zeros(num_pvs)
+        self._kvar_factor = np.ones(num_pvs)
+        for i, (name, settings) in enumerate(zip(self._element_names, self._settings)):
+            index = pv_indices.get(name.lower())
+            if index is None:
+                raise InvalidConfiguration(f'{name} is not in the circuit')
+            self._pv_indices[i] = index
+            pv_systems.Idx(index)
+            properties = self._dss_instance.Properties
+            self._s_rated[i] = float(properties.Value('kVA'))
+            self._p_rated[i] = float(properties.Value('Pmpp'))
+            self._q_rated[i] = float(properties.Value('kvarMax'))
+            if self._dss_instance.CktElement.NumPhases() == 2:
+                self._kvar_factor[i] = TWO_PHASE_KVAR_FACTOR
+            self._run_command(name + '.%cutin=0')
+            self._run_command(name + '.%cutout=0')
+            if settings.priority == ControlPriority.VAR:
+                self._run_command(name + '.Wattpriority=False')
+            elif settings.priority == ControlPriority.WATT:
+                self._run_command(name + '.Wattpriority=True')
+
+        # PvController reads the cut-in and cut-out values after setting them to 0.
+        self._cutin = np.zeros(num_pvs)
+        self._cutout = np.zeros(num_pvs)
+
+    def _read_node_indices(self):
+        """Map each PV system to the indices of its nodes and the nodes of its bus in the array
+        returned by Circuit.AllBusMagPu."""
+        node_indices = {}
+        bus_node_indices = defaultdict(list)
+        for i, node_name in enumerate(self._dss_instance.Circuit.AllNodeNames()):
+            node_indices[node_name] = i
+            bus_node_indices[node_name.rsplit('.', 1)[0]].append(i)
+
+        element_nodes = []
+        bus_nodes = []
+        for index in self._pv_indices:
+            self._dss_instance.PVsystems.Idx(int(index))
+            element = self._dss_instance.CktElement
+            bus = element.BusNames()[0].split('.')[0].lower()
+            nodes = element.NodeOrder()[:element.NumConductors()]
+            element_nodes.append([node_indices[f'{bus}.{x}'] for x in nodes if x != 0])
+            bus_nodes.append(bus_node_indices[bus])
+
+        self._element_nodes, self._element_nodes_mask = self._make_index_matrix(element_nodes)
+        self._bus_nodes, self._bus_nodes_mask = self._make_index_matrix(bus_nodes)
+
+    def _run_command(self, command):
+        reply = self._dss_instance.utils.run_command(command)
+        # The edits bypass the element objects, which may have cached the old values.
+        dssElement.InvalidateParameterCaches()
+        if reply != "":
+            raise Exception(f"SetParameter failed: {reply}")
+
+    def _set_parameter(self, i, param, value):
+        """Queue a property edit for PV system i. Update applies the edits in one batch."""
+        # Property edits switch the var mode of the PV system, which the PVsystems.kvar and
+        # PVsystems.pf setters do not.
+        self._edits.append(self._element_names[i] + '.' + param + ' = ' + str(value))
+
+    def Name(self):
+        return self._name
+
+    def ControlledElements(self):
+        return self._element_names
+
+    def DeviceErrors(self):
+        return dict(zip(self._element_names, self._errors.tolist()))
+
+    def debugInfo(self):
+        return [sorted(x.value for x in controls) for controls in self._controls]
+
+    def Update(self, priority, time, update):
+        self.time_change = self.time != (priority, time)
+        self.time = (priority, time)
+        self._read_powers()
+        p_pv = -self._p_sum / self._p_rated
+
+        if self.time_change:
+            self.itr = 0
+        else:
+            self.itr += 1
+
+        errors = np.zeros(len(self._element_names))
+        self._edits = []
+        disconnected = self._p_disconnected
+        reconnected = disconnected & (p_pv >= self._cutin)
+        tripped = ~disconnected & (p_pv < self._cutout)
+        self._p_disconnected = (disconnected & ~reconnected) | tripped
+        for i in np.flatnonzero(tripped):
+            self._set_parameter(i, 'pf', 1)
+
+        enabled = ~self._p_disconnected
+        for control, indices in self._controls[priority].items():
+            indices = indices[enabled[indices]]
+            if len(indices) > 0:
+                errors[indices] = self.control_dict[control](indices)
+
+        if self._edits:
+            self._run_command('\n'.join(self._edits))
+        self._errors = errors
+        return float(errors.max()) if len(errors) > 0 else 0
+
+    def _read_powers(self):
+        """Read the active and reactive power of every PV system."""
+        num_pvs = len(self._element_names)
+        self._p_sum = np.zeros(num_pvs)
+        self._q_sum = np.zeros(num_pvs)
+        pv_systems = self._dss_instance.PVsystems
+        element = self._dss_instance.CktElement
+        for i, index in enumerate(self._pv_indices.tolist()):
+            pv_systems.Idx(index)
+            powers = element.Powers()
+            self._p_sum[i] = sum(powers[::2])
+            self._q_sum[i] = sum(powers[1::2])
+
+    def _read_voltages(self, indices, nodes, mask):
+        """Return the per-unit node voltages of the PV systems as a matrix and a mask of the valid
+        entries."""
+        voltages = np.asarray(self._dss_instance.Circuit.AllBusMagPu())
+        return voltages[nodes[indices]], mask[indices]
+
+    def volt_watt_control(self, indices):
+        """Volt / Watt  control implementation
+        """
+        u_min_c = self._u_min_c[indices]
+        u_max_c = self._u_max_c[indices]
+        p_min = self._p_min_vw[indices]
+        damp_coef = self._damp_coef[indices]
+
+        voltages, mask = self._read_voltages(indices, self._bus_nodes, self._bus_nodes_mask)
+        u_in = np.where(mask, voltages, -np.inf).max(axis=1)
+        p_pv = -self._p_sum[indices] / self._s_rated[indices]
+        q_pv = -self._q_sum[indices] / self._s_rated[indices]
+
+        p_lim = np.where(self._available_power[indices], np.sqrt(np.maximum(1 - q_pv ** 2, 0)), 1)
+        m = (1 - p_min) / (u_min_c - u_max_c)
+        c = ((p_min * u_min_c) - u_max_c) / (u_min_c - u_max_c)
+        p_calc = np.where(
+            u_in < u_min_c,
+            p_lim,
+            np.where((u_in < u_max_c) & (u_in > u_min_c), np.minimum(m * u_in + c, p_lim), p_min),
+        )
+
+        p_mppt = self.p_mppt[indices]
+        curtail = (p_pv > p_calc) | ((p_pv > 0) & (p_mppt < 100))
+        # adding heavy ball term to improve convergence
+        dp = np.where(
+            curtail,
+            (p_pv - p_calc) * 0.5 / damp_coef + (self.old_p_calc[indices] - p_pv) * 0.1 / damp_coef,
+            0,
+        )
+        for j in np.flatnonzero(curtail):
+            i = indices[j]
+            p_new = p_pv[j] - dp[j]
+            self.p_mppt[i] = min(p_mppt[j] * p_new / p_pv[j], 100)
+            self._set_parameter(i, '%Pmpp', self.p_mppt[i])
+            pf = np.cos(np.arctan(q_pv[j] / p_new))
+            self.pf[i] = -pf if q_pv[j] < 0 else pf
+            self._set_parameter(i, 'pf', self.pf[i])
+
+        self.old_p_calc[indices] = p_pv
+        return np.abs(dp)
+
+    def constant_powerfactor_control(self, indices):
+        """Constant power factor implementation
+        """
+        pv_systems = self._dss_instance.PVsystems
+        errors = np.zeros(len(indices))
+        for j, i in enumerate(indices):
+            pf_set = self._pf[i]
+            pv_systems.Idx(int(self._pv_indices[i]))
+            pf_act = pv_systems.pf()
+            if self._priority[i] == ControlPriority.PF:
+                self._set_parameter(i, '%Pmpp', pf_set * 100)
+            else:
+                p_lim = 0 if self._priority[i] == ControlPriority.VAR else 1
+                self.p_mppt[i] = 100 if self.time_change else p_lim * self._s_rated[i]
+            errors[j] = abs(pf_set + pf_act)
+            self._set_parameter(i, 'pf', -pf_set)
+        return errors
+
+    def volt_var_control(self, indices):
+        """Volt / var control implementation
+        """
+        voltages, mask = self._read_voltages(indices, self._element_nodes, self._element_nodes_mask)
+        # PvController ignores nodes without voltage.
+        mask = mask & (voltages != 0)
+        num_valid = mask.sum(axis=1)
+        # Move the valid voltages of each PV system to the front of its row.
+        order = np.argsort(~mask, axis=1, kind='stable')
+        voltages = np.take_along_axis(voltages, order, axis=1)
+        mask = np.take_along_axis(mask, order, axis=1)
+
+        calc_mode = np.array([self._voltage_calc_mode[i].value for i in indices])
+        with np.errstate(invalid='ignore', divide='ignore'):
+            u_max = np.where(mask, voltages, -np.inf).max(axis=1, initial=-np.inf)
+            u_in = np.select(
+                [
+                    calc_mode == VoltageCalcModes.AVG.value,
+                    calc_mode == VoltageCalcModes.MIN.value,
+                ],
+                [
+                    np.where(mask, voltages, 0).sum(axis=1) / num_valid,
+                    np.where(mask, voltages, np.inf).min(axis=1, initial=np.inf),
+                ],
+                u_max,
+            )
+            for column, phase in enumerate((VoltageCalcModes.A, VoltageCalcModes.B, VoltageCalcModes.C)):
+                if column >= voltages.shape[1]:
+                    break
+                selected = (calc_mode == phase.value) & (num_valid > column)
+                u_in[selected] = voltages[selected, column]
+
+        s_rated = self._s_rated[indices]
+        p_calc = np.abs(self._p_sum[indices]) / s_rated
+        q_pv = -self._q_sum[indices] / s_rated
+        q_lim_pu = self.q_lim_pu[indices]
+        u_min = self._u_min[indices]
+        u_db_min = self._u_db_min[indices]
+        u_db_max = self._u_db_max[indices]
+        u_max = self._u_max[indices]
+        damp_coef = self._damp_coef[indices]
+
+        with np.errstate(invalid='ignore', divide='ignore'):
+            m1 = q_lim_pu / (u_min - u_db_min)
+            c1 = q_lim_pu * u_db_min / (u_db_min - u_min)
+            m2 = q_lim_pu / (u_db_max - u_max)
+            c2 = q_lim_pu * u_db_max / (u_max - u_db_max)
+            q_calc = np.select(
+                [
+                    u_in <= u_min,
+                    u_in <= u_db_min,
+                    u_in <= u_db_max,
+                    u_in <= u_max,
+                    u_in > u_max,
+                ],
+                [q_lim_pu, u_in * m1 + c1, 0, u_in * m2 + c2, -q_lim_pu],
+                0,
+            )
+
+        old_q_pv = self.old_q_pv[indices]
+        q_calc = q_pv + (q_calc - q_pv) * 0.5 / damp_coef + (q_pv - old_q_pv) * 0.1 / damp_coef
+        kvar = q_calc * s_rated * self._kvar_factor[indices]
+        for j in np.flatnonzero(p_calc > 0):
+            self._set_parameter(indices[j], 'kvar', kvar[j])
+
+        error = np.abs(q_pv - old_q_pv)
+        self.old_q_pv[indices] = q_pv
+        return error
@@ -3,6 +3,31 @@ import calendar
 import math
 import ast
 
+def IsTouPeriod(touTarrif, CurrDateTime):
+    """Return True if CurrDateTime is in one of the time of use periods of the parsed tariff structure."""
+    DayOfYear = CurrDateTime.timetuple().tm_yday
+    weekno = CurrDateTime.weekday()
+    currentDay = calendar.day_name[weekno]
+
+    for period, touDetails in touTarrif.items():
+        if touDetails['ED'] < touDetails['SD']:
+            TOUday = [i for j in (range(1, touDetails['ED']), range(touDetails['SD'], 365)) for i in j]
+        else:
+            TOUday = range(touDetails['SD'], touDetails['ED'] + 1)
+        if DayOfYear in TOUday:
+            if currentDay in touDetails['TOW']:
+                for st, et in zip(touDetails['ST'], touDetails['ET']):
+                    if et < st:
+                        TOUtime = [i for j in (range(1, et), range(st, 25)) for i in j]
+                    else:
+                        TOUtime = range(st, et)
+                    if CurrDateTime.hour in TOUtime:
+                        return True
+            else:
+                pass
+    return False
+
+
 class StorageController(ControllerAbstract):
     """Numerous control implementation for a storage system from both behind-the-meter and front-of- meter applications. Subclass of the :class:`pydss.pyControllers.pyControllerAbstract.ControllerAbstract` abstract class.
 
@@ -60,8 +85,8 @@ class StorageController(ControllerAbstract):
         self.__dssSolver = dssSolver
         self.__Settings = Settings
 
-        self.__Srated = float(StorageObj.GetParameter('kVA'))
-        self.__Prated = float(StorageObj.GetParameter('kWrated'))
+        self.__Srated = float(StorageObj.GetParameter('kVA', use_cache=True))
+        self.__Prated = float(StorageObj.GetParameter('kWrated', use_cache=True))
         self.__Pbatt = float(StorageObj.GetParameter('kW'))
         self.__dampCoef = Settings['DampCoef']
         self.update = [self.ControlDict[Settings['Control' + str(i)]] for i in [1, 2, 3]]
@@ -90,28 +115,7 @@ class StorageController(ControllerAbstract):
 
     def __parseRatePlan(self, tarrif):
         self.touTarrif = ast.literal_eval(tarrif)
-        CurrDateTime = self.__dssSolver.GetDateTime()
-        DayOfYear = CurrDateTime.timetuple().tm_yday
-        weekno = CurrDateTime.weekday()
-        currentDay = calendar.day_name[weekno]
-
-        for period, touDetails in self.touTarrif.items():
-            if touDetails['ED'] < touDetails['SD']:
-                TOUday = [i for j in (range(1, touDetails['ED']), range(touDetails['SD'], 365)) for i in j]
-            else:
-                TOUday = range(touDetails['SD'], touDetails['ED'] + 1)
-            if DayOfYear in TOUday:
-                if currentDay in touDetails['TOW']:
-                    for st, et in zip(touDetails['ST'], touDetails['ET']):
-                        if et < st:
-                            TOUtime = [i for j in (range(1, et), range(st, 25)) for i in j]
-                        else:
-                            TOUtime = range(st, et)
-                        if CurrDateTime.hour in TOUtime:
-                            return True
-                else:
-                    pass
-        return False
+        return IsTouPeriod(self.touTarrif, self.__dssSolver.GetDateTime())
 
     def TimeOfUse(self):
         """ Implementation of a time of use controller for behind the meter applications
@@ -241,9 +245,9 @@ class StorageController(ControllerAbstract):
         Plb = self.__Settings['BaseLoadLim']
         sTime = self.__Settings['ExpWindowStart']
         eTime = self.__Settings['ExpWindowEnd']
-        KWHrated = float(self.__ControlledElm.GetParameter('kWhrated'))
-        perIdle = float(self.__ControlledElm.GetParameter('%IdlingkW'))
-        effDchg = float(self.__ControlledElm.GetParameter('%EffDischarge'))
+        KWHrated = float(self.__ControlledElm.GetParameter('kWhrated', use_cache=True))
+        perIdle = float(self.__ControlledElm.GetParameter('%IdlingkW', use_cache=True))
+        effDchg = float(self.__ControlledElm.GetParameter('%EffDischarge', use_cache=True))
 
         Minutes = int(self.__dssInstance.Solution.Seconds() / 60)
         Hour = self.__dssInstance.Solution.Hour() % 24
@@ -309,7 +313,7 @@ class StorageController(ControllerAbstract):
         """
         Pub = self.__Settings['PS_ub']
         Plb = self.__Settings['PS_lb']
-        IdlingkWPercent = float(self.__ControlledElm.GetParameter('%IdlingkW'))
+        IdlingkWPercent = float(self.__ControlledElm.GetParameter('%IdlingkW', use_cache=True))
         IdlingkW = -IdlingkWPercent/100*self.__Prated
         if self.__Settings['PowerMeaElem'] == 'Total':
             Sin = self.__dssInstance.Circuit.TotalPower()
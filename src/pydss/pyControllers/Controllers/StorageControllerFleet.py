@@ -0,0 +1,507 @@
+from collections import defaultdict
+import ast
+
+import numpy as np
+
+from pydss.dssElement import dssElement
+from pydss.exceptions import InvalidConfiguration
+from pydss.pyControllers.Controllers.StorageController import IsTouPeriod
+from pydss.pyControllers.pyControllerAbstract import BatchControllerAbstract
+
+
+class StorageControllerFleet(BatchControllerAbstract):
+    """Vectorized implementation of the control modes of :class:`StorageController` for a fleet of storage
+    systems.
+
+    Each storage system has its own settings, as with StorageController. Each Update reads the measured
+    powers once per measurement element, evaluates the control modes of all storage systems with numpy,
+    and writes the new states and set points with one batch of property edits.
+
+    Supports the None, RT, TT, SH, TOU, NETT, PS and VVar control modes. CF and DemChg keep a history of
+    measurements for each storage system, and CPF and VPF solve the circuit for each storage system; they
+    are only supported by StorageController.
+
+        :param settings_by_element: Maps Storage element name to the settings for its controller
+        :type settings_by_element: dict
+        :param dss_instance: An :class:`opendssdirect` instance
+        :type dss_instance: :class:`opendssdirect`
+        :param element_object_list: Dictionary of all dssElement, dssBus and dssCircuit objects
+        :type element_object_list: dict
+        :param dss_solver: An instance of one of the classed defined in :mod:`pydss.SolveMode`.
+        :type dss_solver: :mod:`pydss.SolveMode`
+        :raises: InvalidConfiguration if an element is not a Storage element or uses an unsupported control mode
+
+    """
+
+    # Settings that each control mode reads, in addition to alpha, beta and DampCoef
+    SETTINGS_BY_CONTROL = {
+        'None': (),
+        'RT': ('%kWOut',),
+        'TT': ('HrCharge', 'HrDischarge', '%rateCharge', '%rateDischarge'),
+        'SH': ('Schedule', 'Days'),
+        'TOU': ('touLoadLim', '%touCharge', 'touTarrifStructure', 'PowerMeaElem'),
+        'NETT': ('BaseLoadLim', 'ExpWindowStart', 'ExpWindowEnd', 'PowerMeaElem'),
+        'PS': ('PS_ub', 'PS_lb', 'PowerMeaElem'),
+        'VVar': ('uMin', 'uMax', 'uDbMin', 'uDbMax', 'QlimPU', 'PFlim', 'Enable PF limit'),
+    }
+    NUMERIC_SETTINGS = (
+        'alpha', 'beta', 'DampCoef', '%kWOut', '%rateCharge', '%rateDischarge', 'Days', 'touLoadLim',
+        '%touCharge', 'BaseLoadLim', 'PS_ub', 'PS_lb', 'uMin', 'uMax', 'uDbMin', 'uDbMax', 'QlimPU', 'PFlim',
+    )
+
+    def __init__(self, settings_by_element, dss_instance, element_object_list, dss_solver):
+        """Constructor method
+        """
+        super(StorageControllerFleet, self).__init__(settings_by_element, dss_instance, element_object_list, dss_solver)
+        self._dss_instance = dss_instance
+        self._dss_solver = dss_solver
+        self._element_object_list = element_object_list
+        self._name = 'pyCont_StorageControllerFleet'
+        self._element_names = list(settings_by_element)
+        self._settings = list(settings_by_element.values())
+        for name, settings in zip(self._element_names, self._settings):
+            if not name.lower().startswith('storage.'):
+                raise InvalidConfiguration(f'StorageControllerFleet works only with OpenDSS Storage elements: {name}')
+            for i in range(1, 4):
+                control = settings['Control' + str(i)]
+                if control not in self.SETTINGS_BY_CONTROL:
+                    raise InvalidConfiguration(
+                        f'StorageControllerFleet does not support control mode {control} ({name}). '
+                        'Use StorageController.'
+                    )
+
+        self.Time = (-1, 0)
+        num_devices = len(self._element_names)
+        self._errors = np.zeros(num_devices)
+        self.Pbatt = np.zeros(num_devices)
+        self.PbattOld = np.zeros(num_devices)
+        self.oldQcalc = np.zeros(num_devices)
+        self.ExportOld = np.zeros(num_devices, dtype=bool)
+        self._edits = []
+        self._powers = {}
+
+        # Indices of the storage systems that run each control mode, for each priority
+        self._controls = []
+        users = defaultdict(set)
+        for i in range(1, 4):
+            indices_by_control = defaultdict(list)
+            for j, settings in enumerate(self._settings):
+                control = settings['Control' + str(i)]
+                indices_by_control[control].append(j)
+                users[control].add(j)
+            self._controls.append({k: np.array(v, dtype=int) for k, v in indices_by_control.items()})
+        self.ControlDict = {
+            'None': lambda indices: np.zeros(len(indices)),
+            'RT': self.RealTimeControl,
+            'TT': self.TimeTriggeredControl,
+            'SH': self.ScheduledControl,
+            'TOU': self.TimeOfUse,
+            'NETT': self.NonExportTimeTriggered,
+            'PS': self.PeakShavingControl,
+            'VVar': self.VoltVarControl,
+        }
+
+        # Settings by name, with an entry for each storage system. Storage systems that do not run a
+        # control mode need not define its settings.
+        self._values = {}
+        for key in ('alpha', 'beta', 'DampCoef'):
+            self._values[key] = [x[key] for x in self._settings]
+        for control, keys in self.SETTINGS_BY_CONTROL.items():
+            for key in keys:
+                values = self._values.setdefault(key, [None] * num_devices)
+                for i in users[control]:
+                    values[i] = self._settings[i][key]
+        for key in self.NUMERIC_SETTINGS:
+            self._values[key] = np.array([0 if x is None else x for x in self._values[key]], dtype=float)
+
+        self._read_ratings()
+        self._read_bus_nodes()
+        self._prepare_time_settings(users)
+        return
+
+    def _read_ratings(self):
+        storage_indices = {}
+        storages = self._dss_instance.Storages
+        flag = storages.First()
+        while flag > 0:
+            storage_indices['storage.' + storages.Name().lower()] = storages.Idx()
+            flag = storages.Next()
+
+        num_devices = len(self._element_names)
+        self._storage_indices = np.zeros(num_devices, dtype=int)
+        self._s_rated = np.zeros(num_devices)
+        self._p_rated = np.zeros(num_devices)
+        self._kwh_rated = np.zeros(num_devices)
+        self._idling = np.zeros(num_devices)
+        self._eff_discharge = np.zeros(num_devices)
+        for i, name in enumerate(self._element_names):
+            index = storage_indices.get(name.lower())
+            if index is None:
+                raise InvalidConfiguration(f'{name} is not in the circuit')
+            self._storage_indices[i] = index
+            storages.Idx(index)
+            properties = self._dss_instance.Properties
+            self._s_rated[i] = float(properties.Value('kVA'))
+            self._p_rated[i] = float(properties.Value('kWrated'))
+            self._kwh_rated[i] = float(properties.Value('kWhrated'))
+            self._idling[i] = float(properties.Value('%IdlingkW'))
+            self._eff_discharge[i] = float(properties.Value('%EffDischarge'))
+
+    def _read_bus_nodes(self):
+        """Map each storage system to the indices of the nodes of its bus in the array returned by
+        Circuit.AllBusMagPu."""
+        bus_node_indices = defaultdict(list)
+        for i, node_name in enumerate(self._dss_instance.Circuit.AllNodeNames()):
+            bus_node_indices[node_name.rsplit('.', 1)[0]].append(i)
+
+        bus_nodes = []
+        for index in self._storage_indices.tolist():
+            self._dss_instance.Storages.Idx(index)
+            bus = self._dss_instance.CktElement.BusNames()[0].split('.')[0].lower()
+            bus_nodes.append(bus_node_indices[bus])
+        self._bus_nodes, self._bus_nodes_mask = self._make_index_matrix(bus_nodes)
+
+    def _prepare_time_settings(self, users):
+        """Convert the times, schedules and tariffs of the time-based control modes to arrays."""
+        num_devices = len(self._element_names)
+        hour_charge = self._values['HrCharge']
+        hour_discharge = self._values['HrDischarge']
+        self._hour_charge = np.zeros(num_devices, dtype=int)
+        self._minute_charge = np.zeros(num_devices, dtype=int)
+        self._hour_discharge = np.zeros(num_devices, dtype=int)
+        self._minute_discharge = np.zeros(num_devices, dtype=int)
+        for i in users['TT']:
+            self._hour_charge[i] = int(hour_charge[i])
+            self._minute_charge[i] = int((hour_charge[i] - self._hour_charge[i]) * 60)
+            self._hour_discharge[i] = int(hour_discharge[i])
+            self._minute_discharge[i] = int((hour_discharge[i] - self._hour_discharge[i]) * 60)
+
+        schedules = [[] for _ in range(num_devices)]
+        for i in users['SH']:
+            schedules[i] = self._values['Schedule'][i]
+        self._schedule_lengths = np.array([len(x) for x in schedules], dtype=int)
+        self._schedules = np.zeros((num_devices, max(self._schedule_lengths, default=0)))
+        for i, schedule in enumerate(schedules):
+            self._schedules[i, :len(schedule)] = schedule
+        with np.errstate(divide='ignore'):
+            total_seconds = 24 * 60 * 60 * self._values['Days']
+            self._time_step_per_sample = np.where(
+                self._schedule_lengths > 0, total_seconds / np.maximum(self._schedule_lengths, 1), 1
+            ).astype(int)
+
+        self._export_start = np.zeros(num_devices, dtype=int)
+        self._export_end = np.zeros(num_devices, dtype=int)
+        self._export_forward = np.zeros(num_devices, dtype=bool)
+        for i in users['NETT']:
+            start = self._values['ExpWindowStart'][i]
+            end = self._values['ExpWindowEnd'][i]
+            self._export_start[i] = start.hour * 60 + start.minute
+            self._export_end[i] = end.hour * 60 + end.minute
+            self._export_forward[i] = start.hour < end.hour
+        self._export_window = np.where(
+            self._export_forward,
+            (self._export_end - self._export_start) / 60,
+            24 - (self._export_start - self._export_end) / 60,
+        )
+
+        # Storage systems share the parsing and evaluation of identical tariff structures.
+        tariff_indices = {}
+        self._tariff_index = np.zeros(num_devices, dtype=int)
+        for i in users['TOU']:
+            tariff = self._values['touTarrifStructure'][i]
+            self._tariff_index[i] = tariff_indices.setdefault(tariff, len(tariff_indices))
+        self._tariffs = [ast.literal_eval(x) for x in tariff_indices]
+
+    def _run_command(self, command):
+        reply = self._dss_instance.utils.run_command(command)
+        # The edits bypass the element objects, which may have cached the old values.
+        dssElement.InvalidateParameterCaches()
+        if reply != "":
+            raise Exception(f"SetParameter failed: {reply}")
+
+    def _set_parameter(self, i, param, value):
+        """Queue a property edit for storage system i. Update applies the edits in one batch."""
+        self._edits.append(self._element_names[i] + '.' + param + ' = ' + str(value))
+
+    def _set_state(self, indices, state, param, values):
+        """Queue the state and a percentage set point of the storage systems."""
+        for i, value in zip(indices.tolist(), values.tolist()):
+            self._set_parameter(i, 'State', state)
+            self._set_parameter(i, param, value)
+
+    def _read_parameter(self, indices, param):
+        """Read a numeric property of the storage systems."""
+        storages = self._dss_instance.Storages
+        properties = self._dss_instance.Properties
+        values = np.zeros(len(indices))
+        for j, index in enumerate(self._storage_indices[indices].tolist()):
+            storages.Idx(index)
+            values[j] = float(properties.Value(param))
+        return values
+
+    def _read_input_power(self, indices, first_terminal):
+        """Return the power measured by the PowerMeaElem of each storage system.
+
+        The measurements of each element are read once per Update. If first_terminal is True, sum the
+        active power of the first terminal of the measurement element; otherwise, sum the first three
+        values.
+        """
+        by_element = {}
+        values = np.zeros(len(indices))
+        for j, element in enumerate(self._values['PowerMeaElem'][i] for i in indices.tolist()):
+            if element not in by_element:
+                if element == 'Total':
+                    if 'Total' not in self._powers:
+                        self._powers['Total'] = self._dss_instance.Circuit.TotalPower()
+                    by_element[element] = -sum(self._powers['Total'][0:5:2])
+                else:
+                    if element not in self._powers:
+                        self._powers[element] = self._element_object_list[element].GetVariable('Powers')
+                    powers = self._powers[element]
+                    if first_terminal:
+                        by_element[element] = sum(powers[0:int(len(powers) / 2):2])
+                    else:
+                        by_element[element] = sum(powers[0:5:2])
+            values[j] = by_element[element]
+        return values
+
+    def _current_time(self):
+        solution = self._dss_instance.Solution
+        return int(solution.Seconds() / 60), solution.Hour() % 24
+
+    def Name(self):
+        return self._name
+
+    def ControlledElements(self):
+        return self._element_names
+
+    def DeviceErrors(self):
+        return dict(zip(self._element_names, self._errors.tolist()))
+
+    def debugInfo(self):
+        return [sorted(controls) for controls in self._controls]
+
+    def Update(self, Priority, Time, Update):
+        self.Time = (Time, Priority)
+        errors = np.zeros(len(self._element_names))
+        self._edits = []
+        self._powers = {}
+        for control, indices in self._controls[Priority].items():
+            errors[indices] = self.ControlDict[control](indices)
+
+        if self._edits:
+            self._run_command('\n'.join(self._edits))
+        self._errors = errors
+        return float(errors.max()) if len(errors) > 0 else 0
+
+    def _charge_or_discharge(self, indices, Pbatt, limit):
+        """Queue the state and set point that make the storage systems output Pbatt."""
+        Prated = self._p_rated[indices]
+        discharging = Pbatt >= 0
+        pct = np.where(discharging, Pbatt, -Pbatt) / Prated * 100
+        if limit:
+            pct = np.minimum(pct, 100)
+        self._set_state(indices[discharging], 'DISCHARGING', '%Discharge', pct[discharging])
+        self._set_state(indices[~discharging], 'CHARGING', '%charge', pct[~discharging])
+
+    def TimeOfUse(self, indices):
+        """ Implementation of a time of use controller for behind the meter applications
+        """
+        Pub = self._values['touLoadLim'][indices]
+        touCharge = self._values['%touCharge'][indices]
+        CurrDateTime = self._dss_solver.GetDateTime()
+        isTOU = np.array([IsTouPeriod(x, CurrDateTime) for x in self._tariffs], dtype=bool)[
+            self._tariff_index[indices]
+        ]
+        Pbatt = self._read_parameter(indices, 'kw')
+        Pin = self._read_input_power(indices, False)
+        PbattOld = self.PbattOld[indices]
+
+        dP = Pin - Pub
+        Pbatt = np.where(
+            isTOU,
+            np.where(
+                Pin > Pub,
+                Pbatt + dP * self._values['alpha'][indices] - (Pbatt - PbattOld) * self._values['beta'][indices],
+                0,
+            ),
+            -touCharge * self._p_rated[indices] / 100,
+        )
+        self._charge_or_discharge(indices, Pbatt, True)
+
+        Error = np.abs(Pbatt - PbattOld)
+        self.PbattOld[indices] = Pbatt
+        return Error
+
+    def ScheduledControl(self, indices):
+        """ Implementation of a fixed schedule controller. Used to implemented predefined dispatch signals
+        """
+        solution = self._dss_instance.Solution
+        CurrentTime = int(solution.Hour()) * 60 * 60 + int(solution.Seconds())
+        Index = (CurrentTime / self._time_step_per_sample[indices]).astype(int)
+        if np.any(Index >= self._schedule_lengths[indices]):
+            raise IndexError(f'Storage schedule has no entry for time {CurrentTime}')
+        Pout = self._schedules[indices, Index]
+
+        discharging = Pout > 0
+        charging = Pout < 0
+        self._set_state(indices[discharging], 'DISCHARGING', '%Discharge', Pout[discharging] * 100)
+        self._set_state(indices[charging], 'CHARGING', '%charge', -Pout[charging] * 100)
+        for i in indices[~(discharging | charging)].tolist():
+            self._set_parameter(i, 'State', 'IDLE')
+        return np.zeros(len(indices))
+
+    def NonExportTimeTriggered(self, indices):
+        """ Implementation of a smart non-export controller. Makes use of TOU window to optimize charging
+        """
+        Minutes, Hour = self._current_time()
+        now = Hour * 60 + Minutes
+        start = self._export_start[indices]
+        end = self._export_end[indices]
+        Export = np.where(
+            self._export_forward[indices],
+            (now > start) & (now < end),
+            (now > start) | (now < end),
+        )
+
+        starting = Export & ~self.ExportOld[indices]
+        if np.any(starting):
+            started = indices[starting]
+            perKWHstored = self._read_parameter(started, '%stored')
+            kWhrem = self._kwh_rated[started] * (perKWHstored / 100)
+            self.Pbatt[started] = (
+                kWhrem / self._export_window[started] * self._eff_discharge[started] / 100
+                - self._idling[started] * self._p_rated[started] / 100
+            )
+        self.ExportOld[indices] = Export
+
+        Error = np.zeros(len(indices))
+        exporting = indices[Export]
+        self._set_state(
+            exporting, 'DISCHARGING', '%Discharge', self.Pbatt[exporting] / self._p_rated[exporting] * 100
+        )
+
+        importing = indices[~Export]
+        if len(importing) > 0:
+            Plb = self._values['BaseLoadLim'][importing]
+            Pin = self._read_input_power(importing, True)
+            Pbatt = self._read_parameter(importing, 'kw')
+            PbattOld = self.PbattOld[importing]
+            dP = Plb - Pin
+            Pbatt = np.where(
+                Pin < Plb,
+                Pbatt - dP * self._values['alpha'][importing] - (Pbatt - PbattOld) * self._values['beta'][importing],
+                0,
+            )
+            self._charge_or_discharge(importing, Pbatt, False)
+            Error[~Export] = np.abs(Pbatt - PbattOld)
+            self.PbattOld[importing] = Pbatt
+        return Error
+
+    def PeakShavingControl(self, indices):
+        """ Implementation of a peak shaving / base loading controller. Setting both peak shaving and base loading
+        limits to zero will make the storage work in "SELF CONSUMPTION" mode
+        """
+        Pub = self._values['PS_ub'][indices]
+        Plb = self._values['PS_lb'][indices]
+        dampCoef = self._values['DampCoef'][indices]
+        Pin = self._read_input_power(indices, True)
+        Pbatt = self._read_parameter(indices, 'kw')
+
+        Pbatt = np.select(
+            [Pin > Pub, Pin < Plb],
+            [Pbatt + (Pin - Pub) * dampCoef, Pbatt + (Pin - Plb) * dampCoef],
+            Pbatt * dampCoef,
+        )
+        self._charge_or_discharge(indices, Pbatt, True)
+
+        PbattOld = self.PbattOld[indices]
+        Error = np.abs(Pbatt - PbattOld) / self._s_rated[indices]
+        self.PbattOld[indices] = Pbatt
+        return Error
+
+    def RealTimeControl(self, indices):
+        kWOut = self._values['%kWOut'][indices]
+        discharging = kWOut > 0
+        charging = kWOut < 0
+        self._set_state(indices[discharging], 'DISCHARGING', '%Discharge', kWOut[discharging])
+        self._set_state(indices[charging], 'CHARGING', '%charge', -kWOut[charging])
+        for i in indices[~(discharging | charging)].tolist():
+            self._set_parameter(i, 'State', 'IDLE')
+        return np.zeros(len(indices))
+
+    def TimeTriggeredControl(self, indices):
+        Minutes, Hour = self._current_time()
+        charging = (Hour == self._hour_charge[indices]) & (Minutes == self._minute_charge[indices])
+        discharging = ~charging & (Hour == self._hour_discharge[indices]) & (Minutes == self._minute_discharge[indices])
+        self._set_state(
+            indices[charging], 'CHARGING', '%charge', self._values['%rateCharge'][indices[charging]]
+        )
+        self._set_state(
+            indices[discharging], 'DISCHARGING', '%Discharge', self._values['%rateDischarge'][indices[discharging]]
+        )
+        return np.zeros(len(indices))
+
+    def VoltVarControl(self, indices):
+        """ Implementation of a Volt / var algorithm. Enables the storage to stack multiple services. In all cases of
+        reactive power support, active power will be prioritized over reactive power.
+        """
+        uMin = self._values['uMin'][indices]
+        uMax = self._values['uMax'][indices]
+        uDbMin = self._values['uDbMin'][indices]
+        uDbMax = self._values['uDbMax'][indices]
+        QlimPU = self._values['QlimPU'][indices]
+        PFlim = self._values['PFlim'][indices]
+        dampCoef = self._values['DampCoef'][indices]
+        pfLimit = np.array([bool(self._values['Enable PF limit'][i]) for i in indices.tolist()], dtype=bool)
+        Srated = self._s_rated[indices]
+
+        voltages = np.asarray(self._dss_instance.Circuit.AllBusMagPu())
+        uIn = np.where(self._bus_nodes_mask[indices], voltages[self._bus_nodes[indices]], -np.inf).max(axis=1)
+
+        Ppv = self._read_parameter(indices, 'kw')
+        Pcalc = Ppv / Srated
+        Qpv = np.zeros(len(indices))
+        storages = self._dss_instance.Storages
+        element = self._dss_instance.CktElement
+        for j, index in enumerate(self._storage_indices[indices].tolist()):
+            storages.Idx(index)
+            Qpv[j] = sum(element.Powers()[1::2])
+        Qpv = Qpv / Srated
+
+        with np.errstate(invalid='ignore', divide='ignore'):
+            m1 = QlimPU / (uMin - uDbMin)
+            m2 = QlimPU / (uDbMax - uMax)
+            c1 = QlimPU * uDbMin / (uDbMin - uMin)
+            c2 = QlimPU * uDbMax / (uMax - uDbMax)
+            Qcalc = np.select(
+                [uIn <= uMin, uIn <= uDbMin, uIn <= uDbMax, uIn <= uMax, uIn >= uMax],
+                [QlimPU, uIn * m1 + c1, 0, uIn * m2 + c2, -QlimPU],
+                0,
+            )
+
+        # adding heavy ball term to improve convergence
+        Qcalc = Qpv + (Qcalc - Qpv) * 0.5 / dampCoef + (Qpv - self.oldQcalc[indices]) * 0.1 / dampCoef
+        with np.errstate(invalid='ignore'):
+            Qlim = np.where(np.abs(Pcalc) < 1, (1 - Pcalc ** 2) ** 0.5, 0)  # note - this is watt priority
+            Qlim = np.where(pfLimit, np.minimum(Qlim, np.abs(Pcalc * np.tan(np.arccos(PFlim)))), Qlim)
+        Qcalc = np.where(np.abs(Qcalc) > Qlim, np.where(Qcalc > 0, Qlim, -Qlim), Qcalc)
+
+        dQ = np.abs(Qcalc - Qpv)
+        pct = np.minimum((Qcalc ** 2 + Pcalc ** 2) ** 0.5 * Srated / self._p_rated[indices] * 100, 100)
+        with np.errstate(invalid='ignore', divide='ignore'):
+            pf = np.where(Pcalc != 0, np.cos(np.arctan(Qcalc / Pcalc)), 1)
+        pf = np.where(Qcalc * Pcalc < 0, -pf, pf)
+        for j in np.flatnonzero(Pcalc != 0).tolist():
+            i = int(indices[j])
+            self._set_parameter(i, 'pf', float(pf[j]))
+            if Pcalc[j] > 0:
+                self._set_parameter(i, 'State', 'DISCHARGING')
+                self._set_parameter(i, '%Discharge', float(pct[j]))
+            else:
+                self._set_parameter(i, 'State', 'CHARGING')
+                self._set_parameter(i, '%charge', float(pct[j]))
+        dQ[Pcalc == 0] = 0
+
+        self.oldQcalc[indices] = Qcalc
+        return dQ
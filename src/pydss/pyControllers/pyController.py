@@ -7,6 +7,7 @@ modules = glob.glob(Controllers.__path__[0]+"/*.py")
 pythonFiles = [ basename(f)[:-3] for f in modules if isfile(f) and not f.endswith('__init__.py') ]
 
 from pydss.dssElement import dssElement
+from pydss.pyControllers.pyControllerAbstract import BatchControllerAbstract
 ControllerTypes = {}
 
 for file in pythonFiles:
@@ -33,3 +34,19 @@ def Create(ElmName, ControllerType, Settings, ElmObjectList, dssInstance, dssSol
 
     ObjectController = ControllerTypes[ControllerType](relObject, Settings, dssInstance, ElmObjectList, dssSolver)
     return ObjectController
+
+
+def IsBatchController(ControllerType):
+    """Return True if the controller type controls all of its elements with one controller."""
+    ControllerClass = ControllerTypes.get(ControllerType)
+    return ControllerClass is not None and issubclass(ControllerClass, BatchControllerAbstract)
+
+
+def CreateBatch(ControllerType, SettingsByElement, ElmObjectList, dssInstance, dssSolver):
+
+    assert (ControllerType in ControllerTypes), "Definition for '{}' controller not found.".format(ControllerType)
+
+    for ElmName in SettingsByElement:
+        assert (ElmName in ElmObjectList), "'{}' does not exist in the pydss master object dictionary.".format(ElmName)
+
+    return ControllerTypes[ControllerType](SettingsByElement, dssInstance, ElmObjectList, dssSolver)
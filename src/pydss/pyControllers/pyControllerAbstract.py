@@ -1,5 +1,7 @@
 import abc
 
+import numpy as np
+
 
 class ControllerAbstract(abc.ABC):
 
@@ -21,4 +23,39 @@ class ControllerAbstract(abc.ABC):
 
     @abc.abstractmethod
     def debugInfo(self):
-        pass
\ No newline at end of file
+        pass
+
+
+class BatchControllerAbstract(ControllerAbstract):
+    """Controller that controls a fleet of elements with one Update call.
+
+    A controller type that subclasses this class is created once per scenario with
+    the settings of all of its elements instead of once per element.
+
+    """
+
+    def __init__(self, SettingsByElement, dssInstance, ElmObjectList, dssSolver):
+        """Abstract class CONSTRUCTOR."""
+        pass
+
+    @abc.abstractmethod
+    def ControlledElements(self):
+        """Return the names of the controlled elements."""
+
+    @abc.abstractmethod
+    def DeviceErrors(self):
+        """Return a dict that maps element name to its error from the last Update."""
+
+    def ControlledElement(self):
+        return self.ControlledElements()[0]
+
+    @staticmethod
+    def _make_index_matrix(rows):
+        """Pad rows of indices of different lengths into a matrix and a mask of the valid entries."""
+        width = max((len(x) for x in rows), default=0)
+        indices = np.zeros((len(rows), width), dtype=int)
+        mask = np.zeros((len(rows), width), dtype=bool)
+        for i, row in enumerate(rows):
+            indices[i, :len(row)] = row
+            mask[i, :len(row)] = True
+        return indices, mask
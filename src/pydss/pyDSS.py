@@ -32,24 +32,30 @@ class instance(object):
     def run_scenario(self, project, scenario, settings: SimulationSettingsModel, dry_run=False):
         if dry_run:
             dss = OpenDSS(settings)
-            self._dump_scenario_simulation_settings(settings)
-            #dss.init(dss_args)
-            logger.info('Dry run scenario: %s', settings.project.active_scenario)
-            if settings.monte_carlo.num_scenarios > 0:
-                raise InvalidConfiguration("Dry run does not support MonteCarlo simulation.")
-            else:
-                self._estimated_space = dss.DryRunSimulation(project, scenario)
+            try:
+                self._dump_scenario_simulation_settings(settings)
+                #dss.init(dss_args)
+                logger.info('Dry run scenario: %s', settings.project.active_scenario)
+                if settings.monte_carlo.num_scenarios > 0:
+                    raise InvalidConfiguration("Dry run does not support MonteCarlo simulation.")
+                else:
+                    self._estimated_space = dss.DryRunSimulation(project, scenario)
+            finally:
+                dss.Close()
             return None, None
 
         opendss = OpenDSS(settings)
-        self._dump_scenario_simulation_settings(settings)
-        logger.info('Running scenario: %s', settings.project.active_scenario)
-        if settings.monte_carlo.num_scenarios > 0:
-            opendss.RunMCsimulation(project, scenario, samples=settings.monte_carlo.num_scenarios)
-        else:
-            for is_complete, _, _, _ in opendss.RunSimulation(project, scenario):
-                if is_complete:
-                    break
+        try:
+            self._dump_scenario_simulation_settings(settings)
+            logger.info('Running scenario: %s', settings.project.active_scenario)
+            if settings.monte_carlo.num_scenarios > 0:
+                opendss.RunMCsimulation(project, scenario, samples=settings.monte_carlo.num_scenarios)
+            else:
+                for is_complete, _, _, _ in opendss.RunSimulation(project, scenario):
+                    if is_complete:
+                        break
+        finally:
+            opendss.Close()
 
     def get_estimated_space(self):
         return self._estimated_space
@@ -13,13 +13,18 @@ import pandas as pd
 import toml
 
 from pydss.common import PLOTS_FILENAME, PROJECT_TAR, PROJECT_ZIP, \
-    ControllerType, ExportMode, SIMULATION_SETTINGS_FILENAME
+    ControllerType, DataStoreFormat, ExportMode, SIMULATION_SETTINGS_FILENAME
 from pydss.exceptions import InvalidConfiguration
 from pydss.simulation_input_models import SimulationSettingsModel, load_simulation_settings
 from pydss.utils.utils import load_data
 
 
 STORE_FILENAME = "store.h5"
+PARQUET_STORE_FILENAME = "store.parquet"
+STORE_FILENAMES = {
+    DataStoreFormat.HDF5: STORE_FILENAME,
+    DataStoreFormat.PARQUET: PARQUET_STORE_FILENAME,
+}
 SCENARIOS = "Scenarios"
 PROJECT_DIRECTORIES = ("DSSfiles", "Exports", "Logs", "Scenarios")
 
@@ -303,6 +308,9 @@ class PyDssArchiveFileInterfaceBase(PyDssFileSystemInterface):
 
     def _list_scenario_names(self):
         store_filename = os.path.join(self._project_dir, STORE_FILENAME)
+        parquet_exports_dir = os.path.join(self._project_dir, PARQUET_STORE_FILENAME, "Exports")
+        if not os.path.exists(store_filename) and os.path.isdir(parquet_exports_dir):
+            return sorted(os.listdir(parquet_exports_dir))
         if not os.path.exists(store_filename):
             return None
 
@@ -1,4 +1,6 @@
 """Contains functionality to configure pydss simulations."""
+from concurrent.futures import ProcessPoolExecutor
+import multiprocessing
 import os
 import shutil
 import sys
@@ -7,8 +9,6 @@ import tempfile
 import zipfile
 from pathlib import Path
 
-import h5py
-
 from loguru import logger
 
 import pydss
@@ -18,12 +18,13 @@ from pydss.common import PROJECT_TAR, PROJECT_ZIP, CONTROLLER_TYPES, \
     filename_from_enum, DEFAULT_MONTE_CARLO_SETTINGS_FILE,\
     SUBSCRIPTIONS_FILENAME, DEFAULT_SUBSCRIPTIONS_FILE, OPENDSS_MASTER_FILENAME, \
     RUN_SIMULATION_FILENAME
+from pydss.data_store import merge_data_stores, open_data_store, remove_data_store
 from pydss.exceptions import InvalidParameter, InvalidConfiguration
 from pydss.pyDSS import instance
 from pydss.pydss_fs_interface import PyDssFileSystemInterface, \
     PyDssArchiveFileInterfaceBase, PyDssTarFileInterface, \
     PyDssZipFileInterface, PROJECT_DIRECTORIES, \
-    SCENARIOS, STORE_FILENAME
+    SCENARIOS, STORE_FILENAME, STORE_FILENAMES, PARQUET_STORE_FILENAME
 from pydss.reports.reports import REPORTS_DIR
 from pydss.registry import Registry
 from pydss.simulation_input_models import (
@@ -45,13 +46,14 @@ DATA_FORMAT_VERSION = "1.0.2"
 
 READ_CONTROLLER_FUNCTIONS = {
     ControllerType.PV_CONTROLLER.value: read_pv_systems_from_dss_file,
+    ControllerType.PV_CONTROLLER_FLEET.value: read_pv_systems_from_dss_file,
 }
 
 
 class PyDssProject:
     """Represents the project options for a pydss simulation."""
 
-    _SKIP_ARCHIVE = (PROJECT_ZIP, PROJECT_TAR, STORE_FILENAME, REPORTS_DIR)
+    _SKIP_ARCHIVE = (PROJECT_ZIP, PROJECT_TAR, STORE_FILENAME, PARQUET_STORE_FILENAME, REPORTS_DIR)
 
     def __init__(self, path, name, scenarios, settings: SimulationSettingsModel, fs_intf=None,
                  simulation_file=SIMULATION_SETTINGS_FILENAME):
@@ -107,6 +109,17 @@ class PyDssProject:
             raise InvalidConfiguration("hdf_store is not defined")
         return self._hdf_store
 
+    @hdf_store.setter
+    def hdf_store(self, hdf_store):
+        self._hdf_store = hdf_store
+
+    def __getstate__(self):
+        # An open store cannot be sent to another process. Worker processes
+        # open their own.
+        state = self.__dict__.copy()
+        state["_hdf_store"] = None
+        return state
+
     @property
     def fs_interface(self):
         """Return the interface object used to read files.
@@ -140,6 +153,26 @@ class PyDssProject:
 
         return filename
 
+    def get_data_store_filename(self):
+        """Return the path to the data store in the format configured for the project.
+
+        Returns
+        -------
+        str
+
+        Raises
+        ------
+        InvalidConfiguration
+            Raised if no store exists.
+
+        """
+        store_format = self._settings.exports.data_store_format
+        filename = os.path.join(self._project_dir, STORE_FILENAMES[store_format])
+        if not os.path.exists(filename):
+            raise InvalidConfiguration(f"data store does not exist: {filename}")
+
+        return filename
+
     def get_post_process_directory(self, scenario_name):
         """Return the post-process output directory for scenario_name.
 
@@ -313,53 +346,63 @@ class PyDssProject:
     def list_scenario_names(self):
         return [x.name for x in self.scenarios]
 
-    def run(self, logging_configured=True, tar_project=False, zip_project=False, dry_run=False):
-        """Run all scenarios in the project."""
+    def run(self, logging_configured=True, tar_project=False, zip_project=False, dry_run=False,
+            num_workers=None):
+        """Run all scenarios in the project.
+
+        Parameters
+        ----------
+        logging_configured : bool
+        tar_project : bool
+            tar project files after successful execution
+        zip_project : bool
+            zip project files after successful execution
+        dry_run : bool
+            dry run for getting estimated space.
+        num_workers : int | None
+            If greater than 1, run scenarios in parallel in this many processes.
+            Each process has its own OpenDSS instance and writes its own data
+            store, and the stores are merged into the project store after all
+            scenarios finish. By default, run scenarios sequentially in this process.
+
+        """
         if isinstance(self._fs_intf, PyDssArchiveFileInterfaceBase):
             raise InvalidConfiguration("cannot run from an archived project")
         if tar_project and zip_project:
             raise InvalidParameter("tar_project and zip_project cannot both be True")
+        if num_workers is not None and num_workers < 1:
+            raise InvalidParameter(f"num_workers must be at least 1: {num_workers}")
         if self._settings.project.dss_file == "":
             raise InvalidConfiguration("a valid opendss file needs to be passed")
 
-        inst = instance()
         if not logging_configured:
             if self._settings.logging.enable_console:
                 console_level = "INFO"
             else:
                 console_level = "ERROR"
-            if self._settings.logging.enable_file:
-                filename = os.path.join(self._project_dir, "Logs", "pydss.log")
-            else:
-                filename = None
+            filename = self._get_log_filename()
             file_level = "INFO"
             logger.level(console_level)
             if filename:
                 logger.add(filename)
             
+        store_format = self._settings.exports.data_store_format
         if dry_run:
-            store_filename = os.path.join(tempfile.gettempdir(), STORE_FILENAME)
+            store_filename = os.path.join(tempfile.gettempdir(), STORE_FILENAMES[store_format])
         else:
-            store_filename = os.path.join(self._project_dir, STORE_FILENAME)
+            store_filename = os.path.join(self._project_dir, STORE_FILENAMES[store_format])
             self._dump_simulation_settings()
 
-        driver = None
-        if self._settings.exports.export_data_in_memory:
-            driver = "core"
-        if os.path.exists(store_filename):
-            os.remove(store_filename)
+        remove_data_store(store_filename)
 
         try:
-            # This ensures that all datasets are flushed and closed after each
-            # scenario. If there is an unexpected crash in a later scenario then
-            # the file will still be valid for completed scenarios.
-            for scenario in self._scenarios:
-                with h5py.File(store_filename, mode="a", driver=driver) as hdf_store:
-                    self._hdf_store = hdf_store
-                    self._hdf_store.attrs["version"] = DATA_FORMAT_VERSION
-                    self._settings.project.active_scenario = scenario.name
-                    inst.run(self._settings, self, scenario, dry_run=dry_run)
-                    self._estimated_space[scenario.name] = inst.get_estimated_space()
+            if num_workers is not None and num_workers > 1 and len(self._scenarios) > 1:
+                self._run_scenarios_in_parallel(store_filename, num_workers, dry_run=dry_run)
+            else:
+                for scenario in self._scenarios:
+                    self._estimated_space[scenario.name] = self._run_scenario(
+                        scenario.name, store_filename, dry_run=dry_run
+                    )
 
             export_tables = self._settings.exports.export_data_tables
             generate_reports = bool(self._settings.reports)
@@ -385,8 +428,61 @@ class PyDssProject:
             elif zip_project:
                 self._zip_project_files()
 
-            if dry_run and os.path.exists(store_filename):
-                os.remove(store_filename)
+            if dry_run:
+                remove_data_store(store_filename)
+
+    def _run_scenario(self, scenario_name, store_filename, dry_run=False):
+        """Run one scenario and return its estimated space."""
+        scenario = next(x for x in self._scenarios if x.name == scenario_name)
+        store_format = self._settings.exports.data_store_format
+        in_memory = self._settings.exports.export_data_in_memory
+        # This ensures that all datasets are flushed and closed after each
+        # scenario. If there is an unexpected crash in a later scenario then
+        # the file will still be valid for completed scenarios.
+        with open_data_store(store_filename, "a", store_format, in_memory) as hdf_store:
+            self._hdf_store = hdf_store
+            self._hdf_store.attrs["version"] = DATA_FORMAT_VERSION
+            self._settings.project.active_scenario = scenario.name
+            inst = instance()
+            inst.run(self._settings, self, scenario, dry_run=dry_run)
+            return inst.get_estimated_space()
+
+    def _run_scenarios_in_parallel(self, store_filename, num_workers, dry_run=False):
+        store_format = self._settings.exports.data_store_format
+        store_dir = tempfile.mkdtemp(dir=os.path.dirname(store_filename), prefix="scenario_stores_")
+        filenames = {
+            x.name: os.path.join(store_dir, f"{x.name}_{STORE_FILENAMES[store_format]}")
+            for x in self._scenarios
+        }
+        # OpenDSS keeps its state in the process, so the workers must not
+        # inherit it from this process.
+        context = multiprocessing.get_context("spawn")
+        max_workers = min(num_workers, len(self._scenarios))
+        logger.info("Run %s scenarios with %s workers", len(self._scenarios), max_workers)
+        try:
+            with ProcessPoolExecutor(
+                max_workers=max_workers,
+                mp_context=context,
+                initializer=_configure_worker_logging,
+                initargs=(self._get_log_filename(),),
+            ) as executor:
+                futures = {
+                    name: executor.submit(self._run_scenario, name, filename, dry_run)
+                    for name, filename in filenames.items()
+                }
+                for name, future in futures.items():
+                    self._estimated_space[name] = future.result()
+
+            if not dry_run:
+                merge_data_stores(store_filename, list(filenames.values()), store_format)
+        finally:
+            shutil.rmtree(store_dir, ignore_errors=True)
+
+    def _get_log_filename(self):
+        """Return the project log file or None if logging to a file is disabled."""
+        if self._settings.logging.enable_file:
+            return os.path.join(self._project_dir, "Logs", "pydss.log")
+        return None
 
     def _dump_simulation_settings(self):
         # Various settings may have been updated. Write the actual settings to a file.
@@ -413,7 +509,7 @@ class PyDssProject:
     def _tar_project_files(self, delete=True):
         orig = os.getcwd()
         os.chdir(self._project_dir)
-        skip_names = (PROJECT_ZIP, STORE_FILENAME, REPORTS_DIR)
+        skip_names = (PROJECT_ZIP, STORE_FILENAME, PARQUET_STORE_FILENAME, REPORTS_DIR)
         try:
             filename = PROJECT_TAR
             to_delete = []
@@ -542,7 +638,8 @@ class PyDssProject:
         )
 
     @classmethod
-    def run_project(cls, path, options=None, tar_project=False, zip_project=False, simulation_file=None, dry_run=False):
+    def run_project(cls, path, options=None, tar_project=False, zip_project=False, simulation_file=None, dry_run=False,
+                    num_workers=None):
 
         """Load a PyDssProject from directory and run all scenarios.
 
@@ -558,10 +655,14 @@ class PyDssProject:
             zip project files after successful execution
         dry_run: bool
             dry run for getting estimated space.
+        num_workers : int | None
+            If greater than 1, run scenarios in parallel in this many processes.
         """
 
         project = cls.load_project(path, options=options, simulation_file=simulation_file)
-        return project.run(tar_project=tar_project, zip_project=zip_project, dry_run=dry_run)
+        return project.run(
+            tar_project=tar_project, zip_project=zip_project, dry_run=dry_run, num_workers=num_workers
+        )
 
     def read_scenario_settings(self, scenario):
         """Read the simulation settings file for the scenario.
@@ -803,6 +904,13 @@ class PyDssScenario:
         self.post_process_infos.append(post_process_info)
 
 
+def _configure_worker_logging(filename):
+    """Log to the project log file from a worker process. Spawned processes do
+    not inherit the sinks of the parent process."""
+    if filename is not None:
+        logger.add(filename)
+
+
 def load_config(path):
     """Return a configuration from files.
 
@@ -4,12 +4,13 @@ import json
 import os
 import re
 
-import h5py
 import numpy as np
 import pandas as pd
 from loguru import logger
 
+from pydss.column_index import ColumnIndex
 from pydss.common import  DatasetPropertyType
+from pydss.data_store import open_data_store
 from pydss.dataset_buffer import DatasetBuffer
 from pydss.element_options import ElementOptions
 from pydss.exceptions import InvalidParameter
@@ -25,10 +26,14 @@ class PyDssResults:
     """Interface to perform analysis on pydss output data."""
     def __init__(
             self, project_path=None, project=None, in_memory=False,
-            frequency=False, mode=False
+            frequency=False, mode=False, chunk_cache_bytes=None,
         ):
         """Constructs PyDssResults object.
 
+        Data is read lazily. Each query reads only the rows and columns that
+        it returns, so memory use is bounded by the size of the result plus
+        the chunk cache of each open dataset.
+
         Parameters
         ----------
         project_path : str | None
@@ -36,11 +41,15 @@ class PyDssResults:
         project : PyDssProject | None
             Existing project object
         in_memory : bool
-            If true, load all exported data into memory.
+            Deprecated and ignored. It used to load the entire data store
+            into memory.
         frequency : bool
             If true, add frequency column to all dataframes.
         mode : bool
             If true, add mode column to all dataframes.
+        chunk_cache_bytes : int | None
+            Maximum size of the HDF5 chunk cache for each open dataset;
+            defaults to the h5py default (1 MiB).
 
         """
         options = ElementOptions()
@@ -56,9 +65,15 @@ class PyDssResults:
             self._project = project
         self._fs_intf = self._project.fs_interface
         self._scenarios = []
-        filename = self._project.get_hdf_store_filename()
-        driver = "core" if in_memory else None
-        self._hdf_store = h5py.File(filename, "r", driver=driver)
+        if in_memory:
+            logger.warning("in_memory is deprecated and ignored. Data is read lazily.")
+        filename = self._project.get_data_store_filename()
+        self._hdf_store = open_data_store(
+            filename,
+            "r",
+            self._project.simulation_config.exports.data_store_format,
+            chunk_cache_bytes=chunk_cache_bytes,
+        )
 
         if self._project.simulation_config.exports.export_results:
             for name in self._project.list_scenario_names():
@@ -171,11 +186,11 @@ class PyDssResults:
 
     @property
     def hdf_store(self):
-        """Return a handle to the HDF data store.
+        """Return a handle to the data store.
 
         Returns
         -------
-        h5py.File
+        h5py.File | ParquetStore
 
         """
         return self._hdf_store
@@ -249,39 +264,28 @@ class PyDssScenarioResults:
             return
 
         self._group = self._hdf_store[f"Exports/{name}"]
-        self._elem_classes = [
-            x for x in self._group if isinstance(self._group[x], h5py.Group)
-        ]
+        # Stores written before the index existed don't have one.
+        self._column_index = ColumnIndex.read(self._group) or ColumnIndex.from_group(self._group)
+        self._elem_classes = list(self._column_index.element_classes)
 
         self._parse_datasets()
 
     def _parse_datasets(self):
         for elem_class in self._elem_classes:
-            class_group = self._group[elem_class]
-            if "ElementProperties" in class_group:
-                prop_group = class_group["ElementProperties"]
-                for prop, dataset in prop_group.items():
-                    dataset_property_type = get_dataset_property_type(dataset)
-                    if dataset_property_type == DatasetPropertyType.TIME_STEP:
-                        continue
+            if self._column_index.has_element_properties(elem_class):
+                for prop, prop_index in self._column_index.iter_properties(elem_class):
+                    dataset_property_type = prop_index.dataset_property_type
                     if dataset_property_type == DatasetPropertyType.VALUE:
                         self._elem_values_by_prop[elem_class][prop] = []
                         prop_names = self._elem_values_by_prop
-                    elif dataset_property_type in (
-                            DatasetPropertyType.PER_TIME_POINT,
-                            DatasetPropertyType.FILTERED,
-                    ):
+                    else:
                         self._elem_data_by_prop[elem_class][prop] = []
                         prop_names = self._elem_data_by_prop
-                    else:
-                        continue
 
                     self._props_by_class[elem_class].append(prop)
                     self._elem_indices_by_prop[elem_class][prop] = {}
-                    names = DatasetBuffer.get_names(dataset)
-                    self._column_ranges_per_elem[elem_class][prop] = \
-                        DatasetBuffer.get_column_ranges(dataset)
-                    for i, name in enumerate(names):
+                    self._column_ranges_per_elem[elem_class][prop] = prop_index.column_ranges
+                    for i, name in enumerate(prop_index.names):
                         self._elems_by_class[elem_class].add(name)
                         prop_names[elem_class][prop].append(name)
                         self._elem_indices_by_prop[elem_class][prop][name] = i
@@ -375,9 +379,9 @@ class PyDssScenarioResults:
                     start = col_range[0]
                     length = col_range[1]
                     if length == 1:
-                        val = dataset[:][0][start]
+                        val = dataset[0, start]
                     else:
-                        val = dataset[:][0][start: start + length]
+                        val = dataset[0, start: start + length]
                     if prop not in elem_prop_nums[elem_class]:
                         elem_prop_nums[elem_class][prop] = {}
                     elem_prop_nums[elem_class][prop][name] = val
@@ -418,9 +422,12 @@ class PyDssScenarioResults:
         filename = os.path.join(path, "summed_element_property_values.json")
         dump_data(self._summed_elem_props, filename, default=make_json_serializable)
 
-    def get_dataframe(self, element_class, prop, element_name, real_only=False, abs_val=False, **kwargs):
+    def get_dataframe(self, element_class, prop, element_name, real_only=False, abs_val=False,
+                      start=None, end=None, columns=None, **kwargs):
         """Return the dataframe for an element.
 
+        Only the requested time range and columns are read from the store.
+
         Parameters
         ----------
         element_class : str
@@ -430,6 +437,12 @@ class PyDssScenarioResults:
             If dtype of any column is complex, drop the imaginary component.
         abs_val : bool
             If dtype of any column is complex, compute its absolute value.
+        start : str | datetime | pd.Timestamp | None
+            Return rows at or after this time; defaults to the start of the simulation.
+        end : str | datetime | pd.Timestamp | None
+            Return rows at or before this time; defaults to the end of the simulation.
+        columns : list | None
+            Return only these columns of the element.
         kwargs
             Filter on options; values can be strings or regular expressions.
 
@@ -451,13 +464,14 @@ class PyDssScenarioResults:
         if prop_type == DatasetPropertyType.PER_TIME_POINT:
             return self._get_elem_prop_dataframe(
                 element_class, prop, element_name, dataset, real_only=real_only,
-                abs_val=abs_val, **kwargs
+                abs_val=abs_val, start=start, end=end, columns=columns, **kwargs
             )
         elif prop_type == DatasetPropertyType.FILTERED:
-            return self._get_filtered_dataframe(
+            df = self._get_filtered_dataframe(
                 element_class, prop, element_name, dataset, real_only=real_only,
                 abs_val=abs_val, **kwargs
             )
+            return self._select_filtered_rows_and_columns(df, start, end, columns)
         assert False, str(prop_type)
 
     def get_filtered_dataframes(self, element_class, prop, real_only=False, abs_val=False):
@@ -488,47 +502,33 @@ class PyDssScenarioResults:
             return {}
 
         dataset = self._group[f"{element_class}/ElementProperties/{prop}"]
-        columns = DatasetBuffer.get_columns(dataset)
-        names = DatasetBuffer.get_names(dataset)
-        length = dataset.attrs["length"]
-        indices_df = self._get_indices_df()
-        data_vals = dataset[:length]
-        elem_data = defaultdict(list)
-        elem_timestamps = defaultdict(list)
-
-        # The time_step_dataset has these columns:
-        # 1. time step index
-        # 2. element index
-        # Each row describes the source data in the dataset row.
-        path = dataset.attrs["time_step_path"]
-        assert length == self._hdf_store[path].attrs["length"]
-        time_step_data = self._hdf_store[path][:length]
-
-        for i in range(length):
-            ts_index = time_step_data[:, 0][i]
-            elem_index = time_step_data[:, 1][i]
-            # TODO DT: more than one column?
-            val = data_vals[i, 0]
-            if real_only:
-                val = val.real
-            elif abs_val:
-                val = abs(val)
-            elem_data[elem_index].append(val)
-            elem_timestamps[elem_index].append(indices_df.iloc[ts_index, 0])
-
+        prop_index = self._column_index.get(element_class, prop)
+        columns = prop_index.columns
+        names = prop_index.names
+        values, timestamps, elem_indices = self._read_filtered_data(dataset, real_only, abs_val)
+
+        # Group the rows by element with a stable sort so that each element's
+        # rows stay in time order. Return the elements in the order in which
+        # they first appear.
+        order = np.argsort(elem_indices, kind="stable")
+        unique_indices, starts = np.unique(elem_indices[order], return_index=True)
+        value_groups = np.split(values[order], starts[1:])
+        timestamp_groups = np.split(timestamps[order], starts[1:])
         dfs = {}
-        for elem_index, vals in elem_data.items():
-            elem_name = names[elem_index]
-            cols = self._fix_columns(elem_name, columns)
+        for i in np.argsort(order[starts], kind="stable"):
+            elem_name = names[unique_indices[i]]
             dfs[elem_name] = pd.DataFrame(
-                vals,
-                columns=cols,
-                index=elem_timestamps[elem_index],
+                value_groups[i],
+                columns=self._fix_columns(elem_name, columns),
+                index=pd.DatetimeIndex(timestamp_groups[i]),
             )
         return dfs
 
-    def get_full_dataframe(self, element_class, prop, real_only=False, abs_val=False, **kwargs):
-        """Return a dataframe containing all data.  The dataframe is copied.
+    def get_full_dataframe(self, element_class, prop, real_only=False, abs_val=False,
+                           start=None, end=None, columns=None, **kwargs):
+        """Return a dataframe containing all elements. The dataframe is copied.
+
+        Only the requested time range and columns are read from the store.
 
         Parameters
         ----------
@@ -538,6 +538,12 @@ class PyDssScenarioResults:
             If dtype of any column is complex, drop the imaginary component.
         abs_val : bool
             If dtype of any column is complex, compute its absolute value.
+        start : str | datetime | pd.Timestamp | None
+            Return rows at or after this time; defaults to the start of the simulation.
+        end : str | datetime | pd.Timestamp | None
+            Return rows at or before this time; defaults to the end of the simulation.
+        columns : list | None
+            Return only these columns.
         kwargs
             Filter on options; values can be strings or regular expressions.
 
@@ -550,15 +556,29 @@ class PyDssScenarioResults:
             raise InvalidParameter(f"property {prop} is not stored")
 
         dataset = self._group[f"{element_class}/ElementProperties/{prop}"]
-        df = DatasetBuffer.to_dataframe(dataset)
+        prop_index = self._column_index.get(element_class, prop)
+        all_columns = prop_index.columns
+        if prop_index.dataset_property_type == DatasetPropertyType.FILTERED:
+            df = DatasetBuffer.to_dataframe(dataset, columns=all_columns)
+            if kwargs:
+                indices = self._select_columns(element_class, prop, **kwargs)
+                df = df[sorted(all_columns[i] for i in indices)]
+            self._finalize_dataframe(df, dataset, real_only=real_only, abs_val=abs_val)
+            return self._select_filtered_rows_and_columns(df, start, end, columns)
+
+        selected = range(len(all_columns))
         if kwargs:
-            options = self._check_options(element_class, prop, **kwargs)
-            names = self._elems_by_class.get(element_class, set())
-            columns = ValueStorageBase.get_columns(df, names, options, **kwargs)
-            columns = list(columns)
-            columns.sort()
-            df = df[columns]
-        self._finalize_dataframe(df, dataset, real_only=real_only, abs_val=abs_val)
+            indices = self._select_columns(element_class, prop, **kwargs)
+            selected = sorted(indices, key=lambda i: all_columns[i])
+        column_indices = self._get_column_indices(prop_index, selected, columns)
+        start_index, end_index = self._get_time_step_range(start, end)
+        df = DatasetBuffer.to_dataframe(
+            dataset, start=start_index, end=end_index, column_indices=column_indices,
+            columns=all_columns,
+        )
+        self._finalize_dataframe(
+            df, dataset, real_only=real_only, abs_val=abs_val, start=start_index
+        )
         return df
 
     def get_summed_element_total(self, element_class, prop, group=None):
@@ -603,8 +623,8 @@ class PyDssScenarioResults:
         start = col_range[0]
         length = col_range[1]
         if length == 1:
-            return dataset[:][0][start]
-        return dataset[:][0][start: start + length]
+            return dataset[0, start]
+        return dataset[0, start: start + length]
 
     def get_option_values(self, element_class, prop, element_name):
         """Return the option values for the element property.
@@ -621,7 +641,8 @@ class PyDssScenarioResults:
         df = self.get_dataframe(element_class, prop, element_name)
         return ValueStorageBase.get_option_values(df, element_name)
 
-    def get_summed_element_dataframe(self, element_class, prop, real_only=False, abs_val=False, group=None):
+    def get_summed_element_dataframe(self, element_class, prop, real_only=False, abs_val=False,
+                                     group=None, start=None, end=None):
         """Return the dataframe for a summed element property.
 
         Parameters
@@ -634,6 +655,10 @@ class PyDssScenarioResults:
             If dtype of any column is complex, drop the imaginary component.
         abs_val : bool
             If dtype of any column is complex, compute its absolute value.
+        start : str | datetime | pd.Timestamp | None
+            Return rows at or after this time; defaults to the start of the simulation.
+        end : str | datetime | pd.Timestamp | None
+            Return rows at or before this time; defaults to the end of the simulation.
 
         Returns
         -------
@@ -654,8 +679,9 @@ class PyDssScenarioResults:
 
         elem_group = self._group[element_class]["SummedElementProperties"]
         dataset = elem_group[prop]
-        df = DatasetBuffer.to_dataframe(dataset)
-        self._add_indices_to_dataframe(df)
+        start_index, end_index = self._get_time_step_range(start, end)
+        df = DatasetBuffer.to_dataframe(dataset, start=start_index, end=end_index)
+        self._add_indices_to_dataframe(df, start=start_index)
 
         if real_only:
             for column in df.columns:
@@ -944,16 +970,70 @@ class PyDssScenarioResults:
         """
         return self._fs_intf.read_file(path)
 
-    def _add_indices_to_dataframe(self, df):
-        indices_df = self._get_indices_df()
-        df["Timestamp"] = indices_df["Timestamp"]
+    def _add_indices_to_dataframe(self, df, start=None):
+        start = start or 0
+        indices_df = self._get_indices_df().iloc[start:start + len(df)]
+        df["Timestamp"] = indices_df["Timestamp"].values
         if self._add_frequency:
-            df["Frequency"] = indices_df["Frequency"]
+            df["Frequency"] = indices_df["Frequency"].values
         if self._add_mode:
-            df["Simulation Mode"] = indices_df["Simulation Mode"]
+            df["Simulation Mode"] = indices_df["Simulation Mode"].values
         df.set_index("Timestamp", inplace=True)
 
-    def _finalize_dataframe(self, df, dataset, real_only=False, abs_val=False):
+    @staticmethod
+    def _check_columns(available, columns):
+        available_set = set(available)
+        for column in columns:
+            if column not in available_set:
+                raise InvalidParameter(f"column {column} is not stored")
+        return list(columns)
+
+    def _select_columns(self, element_class, prop, start=0, length=None, **kwargs):
+        """Return the indices of the columns that match the option filters in kwargs."""
+        options = self._check_options(element_class, prop, **kwargs)
+        prop_index = self._column_index.get(element_class, prop)
+        indices = prop_index.select_columns(options, start=start, length=length, **kwargs)
+        if indices.size == 0:
+            raise InvalidParameter(f"no columns of {element_class}/{prop} match {kwargs}")
+        return indices.tolist()
+
+    @staticmethod
+    def _get_column_indices(prop_index, selected, columns):
+        """Return the indices of the requested columns, which must be in selected."""
+        if columns is None:
+            return selected
+        available = selected if isinstance(selected, range) else set(selected)
+        try:
+            indices = prop_index.get_column_indices(columns)
+        except KeyError as exc:
+            raise InvalidParameter(f"column {exc.args[0]} is not stored") from None
+        for column, index in zip(columns, indices):
+            if index not in available:
+                raise InvalidParameter(f"column {column} is not stored")
+        return indices
+
+    def _get_time_step_range(self, start, end):
+        """Return the range of time step indices [start, end) for the timestamps."""
+        if start is None and end is None:
+            return None, None
+        timestamps = self._get_indices_df()["Timestamp"]
+        start_index = None if start is None else \
+            int(timestamps.searchsorted(pd.Timestamp(start), side="left"))
+        end_index = None if end is None else \
+            int(timestamps.searchsorted(pd.Timestamp(end), side="right"))
+        return start_index, end_index
+
+    @staticmethod
+    def _select_filtered_rows_and_columns(df, start, end, columns):
+        if columns is not None:
+            df = df[PyDssScenarioResults._check_columns(df.columns, columns)]
+        if start is not None:
+            df = df[df.index >= pd.Timestamp(start)]
+        if end is not None:
+            df = df[df.index <= pd.Timestamp(end)]
+        return df
+
+    def _finalize_dataframe(self, df, dataset, real_only=False, abs_val=False, start=None):
         if df.empty:
             return
         dataset_property_type = get_dataset_property_type(dataset)
@@ -963,7 +1043,7 @@ class PyDssScenarioResults:
             df["TimeStep"] = DatasetBuffer.to_datetime(time_step_dataset)
             df.set_index("TimeStep", inplace=True)
         else:
-            self._add_indices_to_dataframe(df)
+            self._add_indices_to_dataframe(df, start=start)
 
         if real_only:
             for column in df.columns:
@@ -983,16 +1063,24 @@ class PyDssScenarioResults:
             cols.append(ValueStorageBase.DELIMITER.join(fields))
         return cols
 
-    def _get_elem_prop_dataframe(self, elem_class, prop, name, dataset, real_only=False, abs_val=False, **kwargs):
-        col_range = self._get_element_column_range(elem_class, prop, name)
-        df = DatasetBuffer.to_dataframe(dataset, column_range=col_range)
-
+    def _get_elem_prop_dataframe(self, elem_class, prop, name, dataset, real_only=False,
+                                 abs_val=False, start=None, end=None, columns=None, **kwargs):
+        prop_index = self._column_index.get(elem_class, prop)
+        col_start, col_length = self._get_element_column_range(elem_class, prop, name)
+        selected = range(col_start, col_start + col_length)
         if kwargs:
-            options = self._check_options(elem_class, prop, **kwargs)
-            columns = ValueStorageBase.get_columns(df, name, options, **kwargs)
-            df = df[columns]
-
-        self._finalize_dataframe(df, dataset, real_only=real_only, abs_val=abs_val)
+            selected = self._select_columns(
+                elem_class, prop, start=col_start, length=col_length, **kwargs
+            )
+        column_indices = self._get_column_indices(prop_index, selected, columns)
+        start_index, end_index = self._get_time_step_range(start, end)
+        df = DatasetBuffer.to_dataframe(
+            dataset, start=start_index, end=end_index, column_indices=column_indices,
+            columns=prop_index.columns,
+        )
+        self._finalize_dataframe(
+            df, dataset, real_only=real_only, abs_val=abs_val, start=start_index
+        )
         return df
 
     def _get_element_column_range(self, elem_class, prop, name):
@@ -1002,37 +1090,45 @@ class PyDssScenarioResults:
 
     def _get_filtered_dataframe(self, elem_class, prop, name, dataset,
                                 real_only=False, abs_val=False, **kwargs):
-        indices_df = self._get_indices_df()
         elem_index = self._elem_indices_by_prop[elem_class][prop][name]
+        values, timestamps, elem_indices = self._read_filtered_data(dataset, real_only, abs_val)
+        mask = elem_indices == elem_index
+        columns = self._fix_columns(name, self._column_index.get(elem_class, prop).columns)
+        if not mask.any():
+            return pd.DataFrame([], columns=columns, index=[])
+        return pd.DataFrame(
+            values[mask], columns=columns, index=pd.DatetimeIndex(timestamps[mask])
+        )
+
+    def _read_filtered_data(self, dataset, real_only, abs_val):
+        """Return the values, timestamps, and element indices of a filtered dataset.
+
+        Returns
+        -------
+        tuple
+            (np.ndarray, np.ndarray, np.ndarray)
+
+        """
         length = dataset.attrs["length"]
-        data_vals = dataset[:length]
+        # TODO DT: more than one column?
+        values = dataset[:length, 0]
 
         # The time_step_dataset has these columns:
         # 1. time step index
         # 2. element index
         # Each row describes the source data in the dataset row.
         path = dataset.attrs["time_step_path"]
+        assert length == self._hdf_store[path].attrs["length"]
         time_step_data = self._hdf_store[path][:length]
+        if real_only:
+            values = values.real
+        elif abs_val:
+            # np.abs can differ from Python's abs in the last bit for complex
+            # values; np.hypot does not.
+            values = np.hypot(values.real, values.imag) if np.iscomplexobj(values) else np.abs(values)
 
-        assert length == self._hdf_store[path].attrs["length"]
-        data = []
-        timestamps = []
-        for i in range(length):
-            stored_elem_index = time_step_data[:, 1][i]
-            if stored_elem_index == elem_index:
-                ts_index = time_step_data[:, 0][i]
-                # TODO DT: more than one column?
-                val = data_vals[i, 0]
-                # TODO: profile this vs a df operation at end
-                if real_only:
-                    val = val.real
-                elif abs_val:
-                    val = abs(val)
-                data.append(val)
-                timestamps.append(indices_df.iloc[ts_index, 0])
-
-        columns = self._fix_columns(name, DatasetBuffer.get_columns(dataset))
-        return pd.DataFrame(data, columns=columns, index=timestamps)
+        timestamps = self._get_indices_df()["Timestamp"].values[time_step_data[:, 0]]
+        return values, timestamps, time_step_data[:, 1]
 
     def _get_indices_df(self):
         if self._indices_df is None:
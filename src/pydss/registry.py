@@ -39,6 +39,15 @@ DEFAULT_REGISTRY = {
                 ),
             },
         ],
+        ControllerType.PV_CONTROLLER_FLEET.value: [
+            {
+                "name": "volt-var",
+                "filename": os.path.join(
+                    os.path.dirname(getattr(pydss, "__path__")[0]),
+                    "pydss/pyControllers/Controllers/Settings/PvControllers.toml",
+                ),
+            },
+        ],
         ControllerType.PV_VOLTAGE_RIDETHROUGH.value: [
             {
                 "name": "NO_VRT_DVS_test",
@@ -64,6 +73,7 @@ DEFAULT_REGISTRY = {
         ],
         ControllerType.SOCKET_CONTROLLER.value: [],
         ControllerType.STORAGE_CONTROLLER.value: [],
+        ControllerType.STORAGE_CONTROLLER_FLEET.value: [],
         ControllerType.XMFR_CONTROLLER.value: [],
         ControllerType.MOTOR_STALL.value: [],
         ControllerType.MOTOR_STALL_SIMPLE.value: [],
@@ -15,8 +15,12 @@ from pydantic import BaseModel, Field
 
 from pydss.common import (
     ControlMode,
+    DataStoreFormat,
     FileFormat,
+    HdfChunkPolicy,
+    HdfCompression,
     LoggingLevel,
+    ProfileStoreFormat,
     ReportGranularity,
     SimulationType,
     SnapshotTimePointSelectionMode,
@@ -274,6 +278,16 @@ class ProjectModel(InputsBaseModel):
             alias="Max error tolerance",
             default=0.0,
         )]
+    skip_converged_controllers: Annotated[
+        bool,
+        Field(
+            title="skip_converged_controllers",
+            description="In later iterations of a control loop, only update the pydss controllers "
+                        "that have not converged. The loop still requires a final iteration in "
+                        "which all controllers converge.",
+            alias="Skip converged controllers",
+            default=False,
+        )]
     skip_export_on_convergence_error: Annotated[
         bool,
         Field(
@@ -298,6 +312,16 @@ class ProjectModel(InputsBaseModel):
             alias="DSS File Absolute Path",
             default=False,
         )]
+    use_topology_cache: Annotated[
+        bool,
+        Field(
+            title="use_topology_cache",
+            description="Store the element and bus topology read from OpenDSS in the project's "
+                        "Logs directory and reuse it in later runs while the files in the "
+                        "directory of the DSS file do not change.",
+            alias="Use topology cache",
+            default=False,
+        )]
     disable_pydss_controllers: Annotated[
         bool,
         Field(
@@ -474,6 +498,18 @@ class ExportsModel(InputsBaseModel):
             default=False,
             alias="Export Compression",
         )]
+    data_store_format: Annotated[
+        DataStoreFormat,
+        Field(
+            title="data_store_format",
+            description="Format of the data store for exported data. hdf5 writes store.h5. parquet "
+                        "writes one Parquet file per scenario, element class, and property in the "
+                        "store.parquet directory and requires the pyarrow package. The HDF settings "
+                        "below also control the row group size and compression codec of Parquet "
+                        "files; Parquet uses snappy instead of lzf and lz4 instead of blosc.",
+            default=DataStoreFormat.HDF5,
+            alias="Data Store Format",
+        )]
     hdf_max_chunk_bytes: Annotated[
         int, 
         Field(
@@ -485,6 +521,67 @@ class ExportsModel(InputsBaseModel):
             default=DEFAULT_MAX_CHUNK_BYTES,
             alias="HDF Max Chunk Bytes",
         )]
+    hdf_compression: Annotated[
+        HdfCompression,
+        Field(
+            title="hdf_compression",
+            description="Compression codec for exported data in the HDF5 data store. blosc and zstd "
+                        "require the hdf5plugin package to write and read the data; pydss uses gzip "
+                        "if it is not installed.",
+            default=HdfCompression.GZIP,
+            alias="HDF Compression",
+        )]
+    hdf_compression_level: Annotated[
+        int,
+        Field(
+            title="hdf_compression_level",
+            description="Compression level for gzip (0-9), blosc (0-9), and zstd (0-22). "
+                        "Ignored for none and lzf.",
+            default=4,
+            alias="HDF Compression Level",
+        )]
+    hdf_chunk_policy: Annotated[
+        HdfChunkPolicy,
+        Field(
+            title="hdf_chunk_policy",
+            description="Chunk layout for exported data in the HDF5 data store. time_step stores all "
+                        "elements for a range of time points in each chunk, which is fastest for "
+                        "reading all elements. balanced also splits wide datasets across elements, "
+                        "which makes reading one element's time series much faster at the cost of "
+                        "larger write buffers.",
+            default=HdfChunkPolicy.TIME_STEP,
+            alias="HDF Chunk Policy",
+        )]
+    hdf_background_writer: Annotated[
+        bool,
+        Field(
+            title="hdf_background_writer",
+            description="Set to true to compress and write chunks of exported data to the HDF5 data "
+                        "store on a background thread so that writes overlap with the simulation.",
+            default=False,
+            alias="HDF Background Writer",
+        )]
+    hdf_writer_queue_size: Annotated[
+        int,
+        Field(
+            title="hdf_writer_queue_size",
+            description="Maximum number of chunks waiting to be written by the background writer. "
+                        "The simulation blocks when the queue is full.",
+            default=4,
+            alias="HDF Writer Queue Size",
+        )]
+    use_bulk_reads: Annotated[
+        bool,
+        Field(
+            title="use_bulk_reads",
+            description="Set to true to read supported element properties for all elements with one "
+                        "OpenDSS call per time point, such as line currents and powers, and to compute "
+                        "ExportLoadingsMetric, ExportPowersMetric, and OverloadsMetricInMemory without "
+                        "OpenDSS export files. Set to false to read each element individually and to "
+                        "parse the export files.",
+            default=True,
+            alias="Use Bulk Reads",
+        )]
 
     @model_validator(mode="before")
     @classmethod
@@ -504,6 +601,28 @@ class ExportsModel(InputsBaseModel):
             raise ValueError(f"hdf_max_chunk_bytes must be a multiple of 512")
         return val
 
+    @model_validator(mode="after")
+    def check_hdf_compression_level(self) -> "ExportsModel":
+        max_levels = {
+            HdfCompression.GZIP: 9,
+            HdfCompression.BLOSC: 9,
+            HdfCompression.ZSTD: 22,
+        }
+        max_level = max_levels.get(self.hdf_compression)
+        if max_level is not None and not 0 <= self.hdf_compression_level <= max_level:
+            raise ValueError(
+                f"hdf_compression_level must be between 0 and {max_level} for "
+                f"{self.hdf_compression.value}: {self.hdf_compression_level}"
+            )
+        return self
+
+    @field_validator("hdf_writer_queue_size")
+    @classmethod
+    def check_hdf_writer_queue_size(cls, val):
+        if val < 1:
+            raise ValueError(f"hdf_writer_queue_size must be >= 1")
+        return val
+
 
 class FrequencyModel(InputsBaseModel):
     """Defines the user inputs for defining frequency parameters."""
@@ -764,7 +883,32 @@ class MonteCarloModel(InputsBaseModel):
             default=-1,
             alias="Number of Monte Carlo scenarios",
         )]
+    num_workers: Annotated[
+        int,
+        Field(
+            title="num_workers",
+            description="Number of processes that run Monte Carlo scenarios. Each process "
+                        "compiles the circuit once.",
+            default=1,
+            alias="Number of workers",
+        )]
+    seed: Annotated[
+        Optional[int],
+        Field(
+            title="seed",
+            description="Seed for the random values. Each scenario uses its own seed derived "
+                        "from this value, so the random values do not depend on the number of "
+                        "workers. Pydss generates and logs a seed if this is not set.",
+            default=None,
+            alias="Random seed",
+        )]
 
+    @field_validator("num_workers")
+    @classmethod
+    def check_num_workers(cls, val):
+        if val < 1:
+            raise ValueError(f"num_workers must be >= 1: {val}")
+        return val
 
 
 class ProfilesModel(InputsBaseModel):
@@ -778,10 +922,10 @@ class ProfilesModel(InputsBaseModel):
             default=False,
             alias="Use profile manager",
         )]
-    source_type: Optional[FileFormat] = Field(
+    source_type: Optional[ProfileStoreFormat] = Field(
         title="source_type",
         description="File format for source data",
-        default=FileFormat.HDF5,
+        default=ProfileStoreFormat.HDF5,
     )
     source: Annotated[
         str, 
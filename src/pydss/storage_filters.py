@@ -1,12 +1,11 @@
 
-import copy
 import abc
 
 from loguru import logger
 import numpy as np
 
-from pydss.utils.simulation_utils import CircularBufferHelper
-from pydss.value_storage import ValueContainer
+from pydss.utils.simulation_utils import CircularBufferArrayHelper
+from pydss.value_storage import ValueArray, ValueContainer
 from pydss.common import StoreValuesType
 
 
@@ -17,6 +16,9 @@ class StorageFilterBase(abc.ABC):
     """
     def __init__(self, hdf_store, path, prop, num_steps, max_chunk_bytes, values, elem_names, **kwargs):
         self._prop = prop
+        if not isinstance(values, ValueArray):
+            values = ValueArray(values)
+        self._values = values
         self._container = self.make_container(
             hdf_store,
             path,
@@ -25,12 +27,22 @@ class StorageFilterBase(abc.ABC):
             max_chunk_bytes,
             values,
             elem_names,
+            writer=kwargs.get("writer"),
+            dataset_options=kwargs.get("dataset_options"),
         )
         logger.debug("Created %s path=%s", self.__class__.__name__, path)
 
     @abc.abstractmethod
     def append_values(self, values, time_step):
-        """Store a new set of values for each element."""
+        """Store a new set of values for each element.
+
+        Parameters
+        ----------
+        values : ValueArray | list
+            ValueArray or list of ValueStorageBase
+        time_step : int
+
+        """
 
     def close(self):
         """Perform any final writes to the container."""
@@ -51,7 +63,8 @@ class StorageFilterBase(abc.ABC):
         return self._container.max_num_bytes()
 
     @staticmethod
-    def make_container(hdf_store, path, prop, num_steps, max_chunk_bytes, values, elem_names):
+    def make_container(hdf_store, path, prop, num_steps, max_chunk_bytes, values, elem_names,
+                       writer=None, dataset_options=None):
         """Return an instance of ValueContainer for storing values."""
         container = ValueContainer(
             values,
@@ -62,23 +75,49 @@ class StorageFilterBase(abc.ABC):
             prop.get_dataset_property_type(),
             max_chunk_bytes=max_chunk_bytes,
             store_time_step=prop.should_store_time_step(),
+            writer=writer,
+            dataset_options=dataset_options,
         )
         logger.debug("Created storage container path=%s", path)
         return container
 
+    def _to_array(self, values):
+        """Return the values as a ValueArray, reusing this filter's buffer."""
+        if isinstance(values, ValueArray):
+            return values
+        self._values.set_values(values)
+        return self._values
+
+    def _append_filtered(self, values, data, time_step, num_elements=None):
+        """Append the values of each element that pass the property's limits.
+        Only consider the first num_elements elements, if set.
+        """
+        if num_elements is None:
+            num_elements = len(values)
+        if values.has_scalar_elements:
+            indices = np.flatnonzero(self._prop.should_store_values(data[:num_elements]))
+            for i in indices:
+                self._container.append_by_time_step(data[i], time_step, i)
+        else:
+            for i, (start, length) in enumerate(values.column_ranges[:num_elements]):
+                value = data[start:start + length]
+                if self._prop.should_store_value(value):
+                    self._container.append_by_time_step(value, time_step, i)
+
 
 class StorageAll(StorageFilterBase):
     """Store values at every time point, optionally filtered."""
 
     def append_values(self, values, time_step):
+        values = self._to_array(values)
+        data = values.data
         if self._prop.limits:
-            for i, value in enumerate(values):
-                if value.is_nan():
-                    break
-                if self._prop.should_store_value(value.value):
-                    self._container.append_by_time_step(value, time_step, i)
+            # Stop at the first element with a NaN value.
+            nan_elements = np.flatnonzero(values.is_nan_by_element())
+            num_elements = nan_elements[0] if nan_elements.size > 0 else len(values)
+            self._append_filtered(values, data, time_step, num_elements)
         else:
-            self._container.append(values)
+            self._container.append_array(data)
 
 
 """
@@ -100,24 +139,22 @@ class StorageMin(StorageFilterBase):
         self._min = None
 
     def append_values(self, values, time_step):
-        if values[0].is_nan():
+        values = self._to_array(values)
+        if values.is_nan():
             return
-        self._handle_values(values)
+        self._handle_values(values.data)
 
     def close(self):
         if self._min is not None:
-            self._container.append(self._min)
+            self._container.append_array(self._min)
             self._container.flush_data()
 
-    def _handle_values(self, values):
+    def _handle_values(self, data):
         if self._min is None:
-            self._min = [copy.deepcopy(x) for x in values]
+            self._min = data.copy()
         else:
-            for i, new_val in enumerate(values):
-                cur_val = self._min[i]
-                if (np.isnan(cur_val.value) and not np.isnan(new_val.value)) or \
-                        new_val < cur_val:
-                    self._min[i].set_value(new_val.value)
+            update = (np.isnan(self._min) & ~np.isnan(data)) | (data < self._min)
+            self._min[update] = data[update]
 
 
 class StorageMax(StorageFilterBase):
@@ -127,24 +164,22 @@ class StorageMax(StorageFilterBase):
         self._max = None
 
     def append_values(self, values, time_step):
-        if values[0].is_nan():
+        values = self._to_array(values)
+        if values.is_nan():
             return
-        self._handle_values(values)
+        self._handle_values(values.data)
 
     def close(self):
         if self._max is not None:
-            self._container.append(self._max)
+            self._container.append_array(self._max)
             self._container.flush_data()
 
-    def _handle_values(self, values):
+    def _handle_values(self, data):
         if self._max is None:
-            self._max = [copy.deepcopy(x) for x in values]
+            self._max = data.copy()
         else:
-            for i, new_val in enumerate(values):
-                cur_val = self._max[i]
-                if (np.isnan(cur_val.value) and not np.isnan(new_val.value)) or \
-                        new_val > cur_val:
-                    self._max[i].set_value(new_val.value)
+            update = (np.isnan(self._max) & ~np.isnan(data)) | (data > self._max)
+            self._max[update] = data[update]
 
 
 class StorageMovingAverage(StorageFilterBase):
@@ -161,29 +196,25 @@ class StorageMovingAverage(StorageFilterBase):
         """
         super().__init__(*args, **kwargs)
         self._averages = None
-        self._bufs = None
+        self._buf = None
         self._window_sizes = kwargs.get("window_sizes")
 
     def append_values(self, values, time_step):
-        if values[0].is_nan():
+        values = self._to_array(values)
+        if values.is_nan():
             return
         # Store every value in the circular buffer. Apply limits to the
         # moving average.
-        if self._bufs is None:
-            self._averages = [copy.deepcopy(x) for x in values]
-            self._bufs = _make_circular_buffers(len(values), self._prop, self._window_sizes)
+        if self._buf is None:
+            self._buf = _make_circular_buffer(values, self._prop, self._window_sizes)
 
-        for i, val in enumerate(values):
-            buf = self._bufs[i]
-            buf.append(val.value)
-            self._averages[i].set_value(buf.average())
+        self._buf.append(values.data)
+        self._averages = self._buf.average()
 
         if self._prop.limits:
-            for i, avg in enumerate(self._averages):
-                if self._prop.should_store_value(avg.value):
-                    self._container.append_by_time_step(avg, time_step, i)
+            self._append_filtered(values, self._averages, time_step)
         else:
-            self._container.append(self._averages)
+            self._container.append_array(self._averages)
 
 
 class StorageMovingAverageMax(StorageMax):
@@ -199,21 +230,19 @@ class StorageMovingAverageMax(StorageMax):
 
         """
         super().__init__(*args, **kwargs)
-        self._bufs = None
+        self._buf = None
         self._averages = None
         self._window_sizes = kwargs.get("window_sizes")
 
     def append_values(self, values, time_step):
-        if values[0].is_nan():
+        values = self._to_array(values)
+        if values.is_nan():
             return
-        if self._bufs is None:
-            self._averages = [copy.deepcopy(x) for x in values]
-            self._bufs = _make_circular_buffers(len(values), self._prop, self._window_sizes)
+        if self._buf is None:
+            self._buf = _make_circular_buffer(values, self._prop, self._window_sizes)
 
-        for i, val in enumerate(values):
-            buf = self._bufs[i]
-            buf.append(val.value)
-            self._averages[i].set_value(buf.average())
+        self._buf.append(values.data)
+        self._averages = self._buf.average()
 
         self._handle_values(self._averages)
 
@@ -225,27 +254,24 @@ class StorageSum(StorageFilterBase):
         self._sum = None
 
     def append_values(self, values, _time_step):
-        if values[0].is_nan():
+        values = self._to_array(values)
+        if values.is_nan():
             return
         if self._sum is None:
-            self._sum = [copy.deepcopy(x) for x in values]
+            self._sum = values.data.copy()
         else:
-            for i, val in enumerate(values):
-                self._sum[i] += val
+            self._sum += values.data
 
     def close(self):
         if self._sum is not None:
-            self._container.append(self._sum)
+            self._container.append_array(self._sum)
             self._container.flush_data()
 
 
-def _make_circular_buffers(num_elements, prop, window_sizes):
+def _make_circular_buffer(values, prop, window_sizes):
     if window_sizes is None:
-        window_size = prop.window_size
-        bufs = [CircularBufferHelper(window_size) for _ in range(num_elements)]
-    else:
-        bufs = [CircularBufferHelper(window_sizes[i]) for i in range(num_elements)]
-    return bufs
+        window_sizes = prop.window_size
+    return CircularBufferArrayHelper(len(values), window_sizes, dtype=values.value_type)
 
 
 STORAGE_TYPE_MAP = {
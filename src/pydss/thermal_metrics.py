@@ -4,9 +4,10 @@ import math
 import os
 
 from loguru import logger
+import numpy as np
 from pydantic import BaseModel, Field
 
-from pydss.utils.simulation_utils import CircularBufferHelper
+from pydss.utils.simulation_utils import CircularBufferArrayHelper
 from pydss.utils.utils import dump_data, load_data
 from pydantic import ConfigDict
 
@@ -254,10 +255,10 @@ class ThermalMetrics:
 
         inst_violations_by_line = {}
         mavg_violations_by_line = {}
-        for i in range(len(self._max_inst_line_violations)):
-            inst_violations_by_line[self._line_names[i]] = self._max_inst_line_violations[i]
-        for i in range(len(self._max_mavg_line_violations)):
-            mavg_violations_by_line[self._line_names[i]] = self._max_mavg_line_violations[i]
+        for i, val in enumerate(self._max_inst_line_violations.tolist()):
+            inst_violations_by_line[self._line_names[i]] = val
+        for i, val in enumerate(self._max_mavg_line_violations.tolist()):
+            mavg_violations_by_line[self._line_names[i]] = val
         line_metric = ThermalMetricsModel(
             max_instantaneous_loadings_pct=inst_violations_by_line,
             max_instantaneous_loading_pct=max(inst_violations_by_line.values()),
@@ -272,10 +273,10 @@ class ThermalMetrics:
 
         inst_violations_by_transformer = {}
         mavg_violations_by_transformer = {}
-        for i in range(len(self._max_inst_transformer_violations)):
-            inst_violations_by_transformer[self._transformer_names[i]] = self._max_inst_transformer_violations[i]
-        for i in range(len(self._max_mavg_transformer_violations)):
-            mavg_violations_by_transformer[self._transformer_names[i]] = self._max_mavg_transformer_violations[i]
+        for i, val in enumerate(self._max_inst_transformer_violations.tolist()):
+            inst_violations_by_transformer[self._transformer_names[i]] = val
+        for i, val in enumerate(self._max_mavg_transformer_violations.tolist()):
+            mavg_violations_by_transformer[self._transformer_names[i]] = val
 
         if self.has_transformers():
             transformer_metric = ThermalMetricsModel(
@@ -339,50 +340,36 @@ class ThermalMetrics:
         Parameters
         ----------
         time_step : int
-        voltages : list
-            list of ValueStorageBase
+        line_loadings : np.ndarray
+            loading percent for each line, ordered like line_names
+        transformer_loadings : np.ndarray
+            loading percent for each transformer, ordered like transformer_names
 
         """
         if self._line_bufs is None:
-            self._line_bufs = [CircularBufferHelper(self._line_window_size) for _ in range(len(self._line_names))]
-            self._transformer_bufs = [CircularBufferHelper(self._transformer_window_size) for _ in range(len(self._transformer_names))]
-            self._max_inst_line_violations = [0.0] * len(self._line_names)
-            self._max_mavg_line_violations = [0.0] * len(self._line_names)
-            self._max_inst_transformer_violations = [0.0] * len(self._transformer_names)
-            self._max_mavg_transformer_violations = [0.0] * len(self._transformer_names)
-
-        has_inst_line_violation = False
-        has_mavg_line_violation = False
-        for i, loading in enumerate(line_loadings):
-            if loading.value > self._max_inst_line_violations[i]:
-                self._max_inst_line_violations[i] = loading.value
-            if not has_inst_line_violation and loading.value > self._line_loading_percent_threshold:
-                has_inst_line_violation = True
-
-            buf = self._line_bufs[i]
-            buf.append(loading.value)
-            moving_avg = buf.average()
-
-            if moving_avg > self._max_mavg_line_violations[i]:
-                self._max_mavg_line_violations[i] = moving_avg
-            if not has_mavg_line_violation and moving_avg > self._line_loading_percent_mavg_threshold:
-                has_mavg_line_violation = True
-
-        has_inst_transformer_violation = False
-        has_mavg_transformer_violation = False
-        for i, loading in enumerate(transformer_loadings):
-            if loading.value > self._max_inst_transformer_violations[i]:
-                self._max_inst_transformer_violations[i] = loading.value
-            if not has_inst_transformer_violation and loading.value > self._transformer_loading_percent_threshold:
-                has_inst_transformer_violation = True
-
-            buf = self._transformer_bufs[i]
-            buf.append(loading.value)
-            moving_avg = buf.average()
-            if moving_avg > self._max_mavg_transformer_violations[i]:
-                self._max_mavg_transformer_violations[i] = moving_avg
-            if not has_mavg_transformer_violation and moving_avg > self._transformer_loading_percent_mavg_threshold:
-                has_mavg_transformer_violation = True
+            self._line_bufs = CircularBufferArrayHelper(len(self._line_names), self._line_window_size)
+            self._transformer_bufs = CircularBufferArrayHelper(len(self._transformer_names), self._transformer_window_size)
+            self._max_inst_line_violations = np.zeros(len(self._line_names))
+            self._max_mavg_line_violations = np.zeros(len(self._line_names))
+            self._max_inst_transformer_violations = np.zeros(len(self._transformer_names))
+            self._max_mavg_transformer_violations = np.zeros(len(self._transformer_names))
+
+        has_inst_line_violation, has_mavg_line_violation = self._update_elements(
+            line_loadings,
+            self._line_bufs,
+            self._max_inst_line_violations,
+            self._max_mavg_line_violations,
+            self._line_loading_percent_threshold,
+            self._line_loading_percent_mavg_threshold,
+        )
+        has_inst_transformer_violation, has_mavg_transformer_violation = self._update_elements(
+            transformer_loadings,
+            self._transformer_bufs,
+            self._max_inst_transformer_violations,
+            self._max_mavg_transformer_violations,
+            self._transformer_loading_percent_threshold,
+            self._transformer_loading_percent_mavg_threshold,
+        )
 
         if has_inst_line_violation:
             self._num_time_points_inst_line_violations += 1
@@ -392,3 +379,15 @@ class ThermalMetrics:
             self._num_time_points_inst_transformer_violations += 1
         if has_mavg_transformer_violation:
             self._num_time_points_mavg_transformer_violations += 1
+
+    @staticmethod
+    def _update_elements(loadings, bufs, max_inst, max_mavg, threshold, mavg_threshold):
+        # fmax ignores NaN, so NaN loadings and incomplete windows never
+        # replace a maximum or count as violations.
+        np.fmax(max_inst, loadings, out=max_inst)
+        bufs.append(loadings)
+        moving_avgs = bufs.average()
+        np.fmax(max_mavg, moving_avgs, out=max_mavg)
+        has_inst_violation = bool((loadings > threshold).any())
+        has_mavg_violation = bool((moving_avgs > mavg_threshold).any())
+        return has_inst_violation, has_mavg_violation
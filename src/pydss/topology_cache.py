@@ -0,0 +1,134 @@
+"""Cache of the element and bus topology of an OpenDSS model.
+
+To create its element and bus objects, pydss reads the names, node orders,
+property names and buses of every element from OpenDSS. That takes minutes for
+models with hundreds of thousands of elements. The cache stores these values
+in a JSON file along with a hash of the files in the model's directory, so
+later runs of the same model create the objects without those reads. OpenDSS
+still compiles the model.
+
+"""
+
+import hashlib
+import json
+import os
+from pathlib import Path
+
+import opendssdirect as dss
+from loguru import logger
+
+from pydss.dssBus import dssBus
+from pydss.dssElementFactory import get_dss_element_class
+
+
+TOPOLOGY_CACHE_VERSION = 1
+
+
+def compute_model_hash(dss_file):
+    """Return a hash of all files in the directory of the OpenDSS master file.
+
+    Files outside of that directory, such as redirects to a parent directory,
+    are not included.
+
+    Parameters
+    ----------
+    dss_file : str | Path
+
+    Returns
+    -------
+    str
+
+    """
+    dss_file = Path(dss_file)
+    directory = dss_file.parent
+    sha = hashlib.sha256()
+    sha.update(f"{TOPOLOGY_CACHE_VERSION} {dss.__version__} {dss_file.name}".encode())
+    for path in sorted(x for x in directory.rglob("*") if x.is_file()):
+        sha.update(str(path.relative_to(directory)).encode())
+        with open(path, "rb") as f_in:
+            for chunk in iter(lambda: f_in.read(1024 * 1024), b""):
+                sha.update(chunk)
+    return sha.hexdigest()
+
+
+def load_topology(filename, model_hash, dssInstance):
+    """Return the topology stored in filename.
+
+    Parameters
+    ----------
+    filename : str | Path
+    model_hash : str
+        Return value of compute_model_hash for the compiled model
+    dssInstance
+
+    Returns
+    -------
+    dict | None
+        None if the file does not exist or does not match the compiled model
+
+    """
+    if not os.path.exists(filename):
+        return None
+
+    try:
+        with open(filename) as f_in:
+            topology = json.load(f_in)
+    except (OSError, ValueError):
+        logger.warning(f"Ignoring unreadable topology cache {filename}")
+        return None
+
+    if topology.get("version") != TOPOLOGY_CACHE_VERSION or topology.get("model_hash") != model_hash:
+        logger.info(f"Topology cache {filename} does not match the model")
+        return None
+    if topology["bus_names"] != dssInstance.Circuit.AllBusNames():
+        logger.info(f"Topology cache {filename} does not match the buses of the circuit")
+        return None
+
+    logger.info(f"Loaded topology cache {filename}")
+    return topology
+
+
+def read_topology(dssInstance):
+    """Read the topology of all buses and elements of the compiled circuit.
+
+    Returns
+    -------
+    dict
+        Can be passed to save_topology and to OpenDSS.CreateBusObjects and
+        OpenDSS.CreateDssObjects.
+
+    """
+    buses = {}
+    bus_names = dssInstance.Circuit.AllBusNames()
+    for name in bus_names:
+        dssInstance.Circuit.SetActiveBus(name)
+        buses[name] = dssBus.read_info(dssInstance)
+
+    elements = {}
+    for name in dssInstance.Circuit.AllElementNames():
+        dssInstance.Circuit.SetActiveElement(name)
+        element_class = get_dss_element_class(name.split(".", 1)[0])
+        elements[name] = element_class.read_info(dssInstance)
+
+    return {"bus_names": bus_names, "buses": buses, "elements": elements}
+
+
+def save_topology(filename, model_hash, topology):
+    """Store the topology in filename.
+
+    Parameters
+    ----------
+    filename : str | Path
+    model_hash : str
+        Return value of compute_model_hash for the compiled model
+    topology : dict
+        Return value of read_topology
+
+    """
+    data = {"version": TOPOLOGY_CACHE_VERSION, "model_hash": model_hash, **topology}
+    # Parallel simulations of the same project may write the file concurrently.
+    tmp_filename = f"{filename}.{os.getpid()}.tmp"
+    with open(tmp_filename, "w") as f_out:
+        json.dump(data, f_out)
+    os.replace(tmp_filename, filename)
+    logger.info(f"Saved topology cache {filename}")
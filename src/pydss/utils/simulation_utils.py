@@ -27,6 +27,79 @@ class CircularBufferHelper:
         return sum(self._buf) / len(self._buf)
 
 
+class CircularBufferArrayHelper:
+    """Computes moving averages for many elements with one 2-D ring buffer.
+
+    Each element can have its own window size. The buffer keeps a running sum
+    per element, so each append is O(elements) regardless of window size.
+    Averages are NaN until an element's window is full or while the window
+    contains a NaN, matching CircularBufferHelper.
+
+    """
+    def __init__(self, num_elements, window_sizes, dtype=float):
+        """Constructor for CircularBufferArrayHelper
+
+        Parameters
+        ----------
+        num_elements : int
+        window_sizes : int | list
+            One window size for all elements or one per element
+        dtype : type
+            Type of the values; integers are averaged as floats.
+
+        """
+        self._window_sizes = np.broadcast_to(np.asarray(window_sizes, dtype=int), (num_elements,)).copy()
+        if num_elements > 0 and self._window_sizes.min() < 1:
+            raise ValueError(f"window sizes must be at least 1: {window_sizes}")
+        max_window_size = int(self._window_sizes.max()) if num_elements > 0 else 1
+        dtype = np.result_type(dtype, float)
+        # Rows beyond an element's window size are never written and stay zero.
+        self._buf = np.zeros((max_window_size, num_elements), dtype=dtype)
+        self._is_nan = np.zeros((max_window_size, num_elements), dtype=bool)
+        self._sums = np.zeros(num_elements, dtype=dtype)
+        self._nan_counts = np.zeros(num_elements, dtype=int)
+        self._columns = np.arange(num_elements)
+        self._count = 0
+        self._averages = np.empty(num_elements, dtype=dtype)
+
+    def __len__(self):
+        return self._count
+
+    def append(self, values):
+        """Append one value for each element.
+
+        Parameters
+        ----------
+        values : np.ndarray
+
+        """
+        rows = self._count % self._window_sizes
+        is_nan = np.isnan(values)
+        new = np.where(is_nan, 0, values)
+        self._sums += new - self._buf[rows, self._columns]
+        self._nan_counts += is_nan.astype(int) - self._is_nan[rows, self._columns]
+        self._buf[rows, self._columns] = new
+        self._is_nan[rows, self._columns] = is_nan
+        self._count += 1
+        if self._count % self._buf.shape[0] == 0:
+            # Remove accumulated floating-point error from the running sums.
+            self._sums[:] = self._buf.sum(axis=0)
+
+    def average(self):
+        """Return the moving average for each element.
+
+        The returned array is reused by subsequent calls.
+
+        Returns
+        -------
+        np.ndarray
+
+        """
+        np.divide(self._sums, self._window_sizes, out=self._averages)
+        self._averages[(self._count < self._window_sizes) | (self._nan_counts > 0)] = np.nan
+        return self._averages
+
+
 class SimulationFilteredTimeRange:
     """Provides filtering in a time range."""
     def __init__(self, start, end):
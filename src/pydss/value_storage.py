@@ -513,11 +513,192 @@ class ValueByLabel(ValueStorageBase):
         return self._value_type
 
 
+class ValueArray:
+    """Stores the values of all elements of a metric in one preallocated array.
+
+    Column names and the column range of each element are computed once at
+    construction. The values are replaced in place at each time point.
+
+    """
+
+    def __init__(self, values):
+        """Constructor for ValueArray
+
+        Parameters
+        ----------
+        values : list
+            list of ValueStorageBase that defines the names, columns, and
+            data type of the array
+
+        """
+        self._names = [x.name for x in values]
+        self._columns = []
+        self._column_ranges = []
+        for value in values:
+            columns = value.make_columns()
+            self._column_ranges.append((len(self._columns), len(columns)))
+            self._columns.extend(columns)
+        self._value_type = values[0].value_type
+        self._element_starts = np.array([x[0] for x in self._column_ranges], dtype=int)
+        self._has_scalar_elements = len(self._columns) == len(values)
+        self._data = np.empty(len(self._columns), dtype=self._value_type)
+        self.set_values(values)
+
+    def __len__(self):
+        return len(self._names)
+
+    @property
+    def columns(self):
+        """Return the column names for all elements.
+
+        Returns
+        -------
+        list
+
+        """
+        return self._columns
+
+    @property
+    def column_ranges(self):
+        """Return the column range of each element as (start, length).
+
+        Returns
+        -------
+        list
+
+        """
+        return self._column_ranges
+
+    @property
+    def data(self):
+        """Return the values of all elements in column order.
+
+        Returns
+        -------
+        np.ndarray
+
+        """
+        return self._data
+
+    @property
+    def element_starts(self):
+        """Return the index of the first column of each element.
+
+        Returns
+        -------
+        np.ndarray
+
+        """
+        return self._element_starts
+
+    @property
+    def has_scalar_elements(self):
+        """Return True if each element has exactly one column.
+
+        Returns
+        -------
+        bool
+
+        """
+        return self._has_scalar_elements
+
+    def is_nan(self):
+        """Return True if the first value is NaN, following ValueStorageBase.is_nan.
+
+        Returns
+        -------
+        bool
+
+        """
+        if np.issubdtype(self._data.dtype, np.integer):
+            return self._data[0] == INTEGER_NAN
+        return np.isnan(self._data[0])
+
+    def is_nan_by_element(self):
+        """Return whether the first value of each element is NaN, following is_nan.
+
+        Returns
+        -------
+        numpy.ndarray
+            bool array with one entry per element
+
+        """
+        first_values = self._data[self._element_starts]
+        if np.issubdtype(self._data.dtype, np.integer):
+            return first_values == INTEGER_NAN
+        return np.isnan(first_values)
+
+    @property
+    def names(self):
+        """Return the element names.
+
+        Returns
+        -------
+        list
+
+        """
+        return self._names
+
+    @property
+    def num_columns(self):
+        """Return the number of columns in the data.
+
+        Returns
+        -------
+        int
+
+        """
+        return len(self._columns)
+
+    def set_data(self, data):
+        """Set the values of all elements from an array in column order.
+
+        Parameters
+        ----------
+        data : np.ndarray
+
+        """
+        self._data[:] = data
+
+    def set_nan(self):
+        """Set all values to NaN or equivalent."""
+        if np.issubdtype(self._data.dtype, np.integer):
+            self._data.fill(INTEGER_NAN)
+        else:
+            self._data.fill(np.nan)
+
+    def set_values(self, values):
+        """Set the values of all elements from instances of ValueStorageBase.
+
+        Parameters
+        ----------
+        values : list
+            list of ValueStorageBase
+
+        """
+        if self._has_scalar_elements:
+            self._data[:] = [x.value for x in values]
+        else:
+            self._data[:] = [x for y in values for x in y.value]
+
+    @property
+    def value_type(self):
+        """Return the type of value being stored.
+
+        Returns
+        -------
+        Type
+
+        """
+        return self._value_type
+
+
 class ValueContainer:
     """Container for a sequence of instances of ValueStorageBase."""
 
     def __init__(self, values, hdf_store, path, max_size, elem_names,
-                 dataset_property_type, max_chunk_bytes=None, store_time_step=False):
+                 dataset_property_type, max_chunk_bytes=None, store_time_step=False,
+                 writer=None, dataset_options=None):
         group_name = os.path.dirname(path)
         basename = os.path.basename(path)
         self.group_name = group_name
@@ -528,15 +709,11 @@ class ValueContainer:
         except KeyError:
             # Don't bother checking each sub path.
             pass
-        
-        self._length={}
-        for value in values:
-            if isinstance(value, list):
-                self._length[value] = len(value.value)
-            else:
-                self._length[value] = 1
-        
-        dtype = values[0].value_type
+
+        if not isinstance(values, ValueArray):
+            values = ValueArray(values)
+
+        dtype = values.value_type
         scaleoffset = None
         # There is no np.float128 on Windows.
         if dtype in (float, np.float32, np.float64, np.longdouble):
@@ -559,25 +736,20 @@ class ValueContainer:
                 scaleoffset=0,
                 max_chunk_bytes=max_chunk_bytes,
                 attributes=attributes,
+                writer=writer,
+                dataset_options=dataset_options,
             )
             columns = []
-            tmp_columns = values[0].make_columns()
+            start, length = values.column_ranges[0]
+            tmp_columns = values.columns[start:start + length]
             for column in tmp_columns:
                 fields = column.split(ValueStorageBase.DELIMITER)
                 fields[0] = "AllNames"
                 columns.append(ValueStorageBase.DELIMITER.join(fields))
             column_ranges = [0, len(tmp_columns)]
         else:
-            columns = []
-            column_ranges = []
-            col_index = 0
-            for value in values:
-                tmp_columns = value.make_columns()
-                col_range = (col_index, len(tmp_columns))
-                column_ranges.append(col_range)
-                for column in tmp_columns:
-                    columns.append(column)
-                    col_index += 1
+            columns = values.columns
+            column_ranges = values.column_ranges
             self._time_steps = None
 
         attributes = {"type": dataset_property_type.value}
@@ -595,6 +767,8 @@ class ValueContainer:
             attributes=attributes,
             names=elem_names,
             column_ranges_per_name=column_ranges,
+            writer=writer,
+            dataset_options=dataset_options,
         )
 
     @staticmethod
@@ -610,34 +784,34 @@ class ValueContainer:
             list of ValueStorageBase
 
         """
-        
-        if values:
-            if isinstance(values[0].value, list):
-                vals = [x for y in values for x in y.value]
-            else:
-                vals = [INTEGER_NAN if (x.is_nan() and x._value_type == int) else x.value for x in values ]
+        if isinstance(values[0].value, list):
+            vals = [x for y in values for x in y.value]
         else:
-            vals = [self.set_nan() for k, v in self._length.items() for x in range(v)]
+            vals = [INTEGER_NAN if (x.is_nan() and x._value_type == int) else x.value for x in values ]
         self._dataset.write_value(vals)
-                     
+
+    def append_array(self, values):
+        """Append a row of values for all elements to the container.
+
+        Parameters
+        ----------
+        values : np.ndarray
+
+        """
+        self._dataset.write_value(values)
 
     def append_by_time_step(self, value, time_step, elem_index):
         """Append a value to the container.
 
         Parameters
         ----------
-        value : ValueStorageBase
+        value : float | complex | int | np.ndarray
+            values for one element
         time_step : int
         elem_index : int
 
         """
-        
-        if isinstance(value.value, list):
-            vals = [x for x in value.value]
-        else:
-            vals = value.value
-
-        self._dataset.write_value(vals)
+        self._dataset.write_value(value)
         self._time_steps.write_value([time_step, elem_index])
         
         
@@ -0,0 +1,105 @@
+"""Compares the time to collect OpenDSS export metrics from export files and in process.
+
+Usage:
+    python tests/benchmarks/benchmark_export_metrics.py [--dss-file FILE] [--num-steps N]
+
+"""
+
+import argparse
+import os
+from pathlib import Path
+import shutil
+import tempfile
+import time
+
+import h5py
+from loguru import logger
+import opendssdirect as dss
+
+from pydss.dssElement import dssElement
+from pydss.export_list_reader import ExportListProperty
+from pydss.metrics import ExportLoadingsMetric, ExportPowersMetric
+from pydss.simulation_input_models import create_simulation_settings, load_simulation_settings
+
+
+DEFAULT_DSS_FILE = Path("tests") / "data" / "custom_exports_project" / "DSSfiles" / "Master_Spohn_existing_VV.dss"
+METRICS = (
+    (ExportLoadingsMetric, ("Line.", "Transformer.")),
+    (ExportPowersMetric, ("Line.", "Transformer.", "Load.", "PVSystem.")),
+)
+
+
+def compile_circuit(dss_file):
+    orig = os.getcwd()
+    try:
+        dss.run_command(f"compile {Path(dss_file).absolute()}")
+        dss.Solution.Solve()
+    finally:
+        # OpenDSS changes the current directory on compile.
+        os.chdir(orig)
+
+
+def make_elements(prefixes):
+    objs = []
+    for name in dss.Circuit.AllElementNames():
+        if name.startswith(prefixes):
+            dss.Circuit.SetActiveElement(name)
+            objs.append(dssElement(dss))
+    return objs
+
+
+def run_metric(metric_class, objs, settings, num_steps):
+    """Return the average seconds per time step to collect the metric's values."""
+    data = {
+        "property": metric_class.__name__,
+        "store_values_type": "all",
+        "opendss_classes": ["Lines", "Transformers"],
+    }
+    metric = metric_class(ExportListProperty("CktElement", data), objs, settings)
+    with h5py.File("benchmark.h5", mode="w", driver="core", backing_store=False) as hdf_store:
+        metric.initialize_data_store(hdf_store, "", num_steps)
+        # The first step validates the in-process values against the export file.
+        dss.Solution.Solve()
+        metric.append_values(0)
+        duration = 0.0
+        for i in range(1, num_steps):
+            dss.Solution.Solve()
+            start = time.perf_counter()
+            metric.append_values(i)
+            duration += time.perf_counter() - start
+        metric.close()
+    return duration / (num_steps - 1)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--dss-file", default=str(DEFAULT_DSS_FILE), help="OpenDSS master file")
+    parser.add_argument("--num-steps", default=100, type=int, help="number of time steps")
+    args = parser.parse_args()
+    logger.remove()
+
+    project_path = Path(tempfile.mkdtemp())
+    try:
+        filename = create_simulation_settings(project_path, "benchmark", ["s1"])
+        settings = load_simulation_settings(filename)
+        compile_circuit(args.dss_file)
+        print(f"{'metric':<24}{'elements':>10}{'files (ms)':>14}{'in process (ms)':>18}{'speedup':>10}")
+        for metric_class, prefixes in METRICS:
+            objs = make_elements(prefixes)
+            durations = []
+            for use_bulk_reads in (False, True):
+                settings.exports.use_bulk_reads = use_bulk_reads
+                durations.append(run_metric(metric_class, objs, settings, args.num_steps))
+            print(
+                f"{metric_class.__name__:<24}{len(objs):>10}{durations[0] * 1000:>14.3f}"
+                f"{durations[1] * 1000:>18.3f}{durations[0] / durations[1]:>9.1f}x"
+            )
+    finally:
+        shutil.rmtree(project_path)
+        # OpenDSS ignores the filename for the powers export and writes to the model directory.
+        for filename in Path(args.dss_file).parent.glob("*_EXP_POWERS.csv"):
+            os.remove(filename)
+
+
+if __name__ == "__main__":
+    main()
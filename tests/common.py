@@ -10,7 +10,8 @@ import opendssdirect as dss
 import pytest
 
 from pydss.common import PROJECT_TAR, PROJECT_ZIP, RUN_SIMULATION_FILENAME
-from pydss.pydss_fs_interface import STORE_FILENAME
+from pydss.data_store import remove_data_store
+from pydss.pydss_fs_interface import PARQUET_STORE_FILENAME, STORE_FILENAME
 from pydss.pydss_project import PyDssProject
 from pydss.utils.utils import dump_data
 
@@ -111,9 +112,8 @@ def cleanup_project():
                 shutil.rmtree(path)
             os.mkdir(path)
 
-        store_filename = os.path.join(project_path, STORE_FILENAME)
-        if os.path.exists(store_filename):
-            os.remove(store_filename)
+        for filename in (STORE_FILENAME, PARQUET_STORE_FILENAME):
+            remove_data_store(os.path.join(project_path, filename))
 
         for path in Path(project_path).rglob(RUN_SIMULATION_FILENAME):
             os.remove(path)
@@ -0,0 +1,77 @@
+from pathlib import Path
+import os
+
+import opendssdirect as dss
+import pytest
+
+from pydss.activation_tracker import activation_tracker
+from pydss.dssBus import dssBus
+from pydss.dssElement import dssElement
+
+
+MASTER_FILE = Path("tests") / "data" / "custom_exports_project" / "DSSfiles" / "Master_Spohn_existing_VV.dss"
+
+
+@pytest.fixture
+def loads():
+    orig = os.getcwd()
+    try:
+        dss.run_command(f"compile {MASTER_FILE.absolute()}")
+        dss.Solution.Solve()
+    finally:
+        # OpenDSS changes the current directory on compile.
+        os.chdir(orig)
+    objs = []
+    for name in dss.Circuit.AllElementNames():
+        if name.startswith("Load."):
+            dss.Circuit.SetActiveElement(name)
+            objs.append(dssElement(dss))
+    activation_tracker.clear()
+    yield objs[:2]
+
+
+def _read_powers(name):
+    dss.Circuit.SetActiveElement(name)
+    return dss.CktElement.Powers()
+
+
+def test_activation_tracker_skips_repeated_activations(loads):
+    load1, load2 = loads
+    expected1 = _read_powers(load1.FullName)
+    expected2 = _read_powers(load2.FullName)
+
+    with activation_tracker.track():
+        for _ in range(3):
+            assert load1.GetValue("Powers") == expected1
+            assert load1.GetValue("kW") == load1.GetParameter("kW")
+            assert load2.GetValue("Powers") == expected2
+    stats = activation_tracker.get_stats()
+    # One activation each time the element changes
+    assert stats["activations"] == 6
+    assert stats["checks"] == 0
+    assert stats["skipped"] > 0
+
+
+def test_activation_tracker_outside_track(loads):
+    load1, load2 = loads
+    expected1 = _read_powers(load1.FullName)
+    load2.SetActiveObject()
+    # The tracker checks the active element outside of track blocks, so direct
+    # activations do not confuse it.
+    assert load1.GetVariable("Powers") == expected1
+    dss.Circuit.SetActiveElement(load2.FullName)
+    assert load1.GetVariable("Powers") == expected1
+    assert activation_tracker.get_stats()["activations"] == 2
+
+
+def test_activation_tracker_bus_slot(loads):
+    load1, _ = loads
+    dss.Circuit.SetActiveBus(load1.Bus[0])
+    bus = dssBus(dss)
+    with activation_tracker.track():
+        powers = load1.GetVariable("Powers")
+        voltages = bus.GetVariable("puVmagAngle")
+        # Activating the bus does not change the active element.
+        assert load1.GetVariable("Powers") == powers
+        assert bus.GetVariable("puVmagAngle") == voltages
+    assert activation_tracker.get_stats()["activations"] == 2
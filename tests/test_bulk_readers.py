@@ -0,0 +1,179 @@
+from pathlib import Path
+import tempfile
+import shutil
+import os
+
+import h5py
+import numpy as np
+import opendssdirect as dss
+import pytest
+
+from pydss.bulk_readers import (
+    CktElementTerminalPowerReader,
+    PDElementTerminalPowerReader,
+    make_bulk_reader,
+    make_loading_reader,
+    make_terminal_power_reader,
+)
+from pydss.dataset_buffer import DatasetBuffer
+from pydss.dssElement import dssElement
+from pydss.export_list_reader import ExportListProperty
+from pydss.metrics import ExportLoadingsMetric, ExportPowersMetric, OpenDssPropertyMetric
+from pydss.simulation_input_models import (
+    create_simulation_settings,
+    load_simulation_settings
+)
+
+
+STORE_FILENAME = os.path.join(tempfile.gettempdir(), "store.h5")
+MASTER_FILE = Path("tests") / "data" / "custom_exports_project" / "DSSfiles" / "Master_Spohn_existing_VV.dss"
+
+
+@pytest.fixture
+def simulation_settings():
+    project_path = Path(tempfile.gettempdir()) / "pydss_projects"
+    if project_path.exists():
+        shutil.rmtree(project_path)
+    project_name = "test_project"
+    project_path.mkdir()
+    filename = create_simulation_settings(project_path, project_name, ["s1"])
+    yield load_simulation_settings(filename)
+    if os.path.exists(STORE_FILENAME):
+        os.remove(STORE_FILENAME)
+    if project_path.exists():
+        shutil.rmtree(project_path)
+
+
+def _compile_circuit(prefixes):
+    orig = os.getcwd()
+    try:
+        dss.run_command(f"compile {MASTER_FILE.absolute()}")
+        dss.Solution.Solve()
+    finally:
+        # OpenDSS changes the current directory on compile.
+        os.chdir(orig)
+    objs = []
+    for name in dss.Circuit.AllElementNames():
+        if name.startswith(prefixes):
+            dss.Circuit.SetActiveElement(name)
+            objs.append(dssElement(dss))
+    return objs
+
+
+@pytest.fixture
+def pd_elements():
+    yield _compile_circuit(("Line.", "Transformer."))
+
+
+@pytest.fixture
+def power_elements():
+    yield _compile_circuit(("Line.", "Transformer.", "Load.", "PVSystem."))
+
+
+@pytest.mark.parametrize("prop_name", ["Currents", "CurrentsMagAng", "Powers"])
+def test_pd_element_bulk_reader(pd_elements, prop_name):
+    # Reverse the order to make sure that the reader follows the caller's order.
+    objs = list(reversed(pd_elements))
+    reader = make_bulk_reader(objs, prop_name)
+    assert reader is not None
+    values = reader.read()
+    expected = np.array([x for obj in objs for x in obj.GetValue(prop_name)])
+    if prop_name != "CurrentsMagAng":
+        expected = expected.view(np.complex128)
+    assert reader.num_values == len(values)
+    assert np.array_equal(values, expected)
+
+
+def test_bulk_reader_unsupported_property(pd_elements):
+    assert make_bulk_reader(pd_elements, "NormalAmps") is None
+
+
+@pytest.mark.parametrize("data_conversion", ["none", "abs", "sum", "abs_sum"])
+def test_bulk_metric_matches_element_metric(simulation_settings, pd_elements, data_conversion):
+    data = {
+        "property": "Currents",
+        "store_values_type": "all",
+        "data_conversion": data_conversion,
+    }
+    lines = [x for x in pd_elements if x._Class == "Line"]
+    num_steps = 3
+    results = []
+    for use_bulk_reads in (False, True):
+        simulation_settings.exports.use_bulk_reads = use_bulk_reads
+        prop = ExportListProperty("Lines", data)
+        metric = OpenDssPropertyMetric(prop, lines, simulation_settings)
+        with h5py.File(STORE_FILENAME, mode="w", driver="core") as hdf_store:
+            metric.initialize_data_store(hdf_store, "", num_steps)
+            current_results = []
+            for i in range(num_steps):
+                current_results.append(metric.append_values(i, store_nan=i == 2))
+            assert (metric._bulk_reader is not None) == use_bulk_reads
+            metric.close()
+            dataset = hdf_store[f"Lines/ElementProperties/{prop.storage_name}"]
+            results.append((DatasetBuffer.to_dataframe(dataset), current_results))
+
+    df1, current_results1 = results[0]
+    df2, current_results2 = results[1]
+    assert list(df1.columns) == list(df2.columns)
+    assert np.array_equal(df1.values, df2.values, equal_nan=True)
+    assert current_results1[:2] == current_results2[:2]
+
+
+def test_terminal_power_readers(power_elements):
+    pd_elements = [x for x in power_elements if x._Class in ("Line", "Transformer")]
+    reader = make_terminal_power_reader(pd_elements)
+    assert isinstance(reader, PDElementTerminalPowerReader)
+    pd_values = dict(zip((x.FullName for x in pd_elements), reader.read()))
+    assert reader.num_values == len(pd_values) == len(pd_elements)
+
+    reader = make_terminal_power_reader(power_elements)
+    assert isinstance(reader, CktElementTerminalPowerReader)
+    for obj, value in zip(power_elements, reader.read()):
+        powers = obj.GetValue("Powers")
+        num_conductors = obj.GetValue("NumConductors")
+        assert value == pytest.approx(sum(powers[:2 * num_conductors:2]))
+        if obj.FullName in pd_values:
+            assert value == pytest.approx(pd_values[obj.FullName])
+
+
+def test_loading_reader(pd_elements, power_elements):
+    reader = make_loading_reader(pd_elements)
+    for obj, value in zip(pd_elements, reader.read()):
+        currents = np.array(obj.GetValue("Currents")).view(np.complex128)
+        max_current = np.abs(currents[:obj.GetValue("NumPhases")]).max()
+        assert value == pytest.approx(max_current / obj.GetValue("NormalAmps") * 100)
+    assert make_loading_reader(power_elements) is None
+
+
+@pytest.mark.parametrize("metric_class, prefixes", [
+    (ExportLoadingsMetric, ("Line.", "Transformer.")),
+    (ExportPowersMetric, ("Line.", "Transformer.", "Load.", "PVSystem.")),
+])
+def test_export_metric_in_process(simulation_settings, metric_class, prefixes):
+    objs = _compile_circuit(prefixes)
+    data = {
+        "property": metric_class.__name__,
+        "store_values_type": "all",
+        "opendss_classes": ["Lines", "Transformers"],
+    }
+    num_steps = 2
+    results = []
+    for use_bulk_reads in (False, True):
+        simulation_settings.exports.use_bulk_reads = use_bulk_reads
+        prop = ExportListProperty("CktElement", data)
+        metric = metric_class(prop, objs, simulation_settings)
+        with h5py.File(STORE_FILENAME, mode="w", driver="core") as hdf_store:
+            metric.initialize_data_store(hdf_store, "", num_steps)
+            for i in range(num_steps):
+                metric.append_values(i)
+            assert (metric._reader is not None) == use_bulk_reads
+            metric.close()
+            dataset = hdf_store[f"CktElement/ElementProperties/{prop.storage_name}"]
+            results.append(DatasetBuffer.to_dataframe(dataset))
+
+    df1, df2 = results
+    assert list(df1.columns) == list(df2.columns)
+    assert np.allclose(df1.values, df2.values, rtol=0, atol=metric_class.export_file_precision())
+    # OpenDSS ignores the filename for the powers export and writes to the model directory.
+    for filename in MASTER_FILE.parent.glob("*_EXP_POWERS.csv"):
+        os.remove(filename)
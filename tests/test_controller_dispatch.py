@@ -0,0 +1,92 @@
+from pathlib import Path
+import os
+
+import opendssdirect as dss
+import pytest
+
+from pydss.controller_dispatch import ControllerDispatchList
+
+
+MASTER_FILE = Path("tests") / "data" / "custom_exports_project" / "DSSfiles" / "Master_Spohn_existing_VV.dss"
+TOLERANCE = 0.001
+
+
+class FakeController:
+    """Controller that converges after a fixed number of updates."""
+
+    def __init__(self, element_name, num_updates, calls):
+        self._element_name = element_name
+        self._num_updates = num_updates
+        self._calls = calls
+
+    def ControlledElement(self):
+        return self._element_name
+
+    def Update(self, priority, time, update_results):
+        assert dss.Element.Name() == self._element_name
+        self._calls.append(self._element_name)
+        self._num_updates -= 1
+        return 1.0 if self._num_updates > 0 else 0.0
+
+
+@pytest.fixture
+def element_names():
+    orig = os.getcwd()
+    try:
+        dss.run_command("clear")
+        dss.run_command(f"compile {MASTER_FILE.absolute()}")
+    finally:
+        # OpenDSS changes the current directory on compile.
+        os.chdir(orig)
+    yield dss.Circuit.AllElementNames()
+
+
+def _make_controllers(element_names, calls):
+    loads = [x for x in element_names if x.startswith("Load.")]
+    pv_systems = [x for x in element_names if x.startswith("PVSystem.")]
+    # Names and updates to converge, not in circuit order.
+    selected = [(pv_systems[1], 1), (loads[2], 3), (pv_systems[0], 2), (loads[0], 1)]
+    controllers = {
+        "Controller." + name: FakeController(name, num_updates, calls)
+        for name, num_updates in selected
+    }
+    if element_names.index(loads[0]) < element_names.index(pv_systems[0]):
+        expected_order = [loads[0], loads[2], pv_systems[0], pv_systems[1]]
+    else:
+        expected_order = [pv_systems[0], pv_systems[1], loads[0], loads[2]]
+    return controllers, expected_order
+
+
+def test_controller_dispatch_order(element_names):
+    calls = []
+    controllers, expected_order = _make_controllers(element_names, calls)
+    dispatch = ControllerDispatchList(controllers, dss)
+    assert len(dispatch) == 4
+    has_converged, max_error, errors = dispatch.update(0, 0, 0, False, TOLERANCE)
+    assert not has_converged
+    assert max_error == 1.0
+    assert calls == expected_order
+    assert [x[0].ControlledElement() for x in errors] == expected_order
+
+
+def test_controller_dispatch_skip_converged(element_names):
+    calls = []
+    controllers, expected_order = _make_controllers(element_names, calls)
+    dispatch = ControllerDispatchList(controllers, dss)
+    results = []
+    for i in range(10):
+        calls.clear()
+        has_converged, _, _ = dispatch.update(0, 0, i, False, TOLERANCE, skip_converged=True)
+        results.append((has_converged, len(calls)))
+        if has_converged:
+            break
+
+    assert results == [
+        # All controllers run first; two have not converged.
+        (False, 4),
+        # Only the two unconverged controllers run; one still has not converged.
+        (False, 2),
+        # The last unconverged controller converges, so all are checked again.
+        (False, 1),
+        (True, 4),
+    ]
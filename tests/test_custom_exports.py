@@ -1,16 +1,22 @@
 
 import math
 import os
+import re
 
 
+import h5py
 import numpy as np
 import pandas as pd
+import pytest
 from pandas.testing import assert_series_equal
 
 
+from pydss.column_index import ColumnIndex, COLUMN_INDEX_NAME, COLUMN_INDEX_VERSION
+from pydss.exceptions import InvalidParameter
 from pydss.utils.utils import load_data
 from pydss.pydss_project import PyDssProject
 from pydss.pydss_results import PyDssResults
+from pydss.value_storage import ValueStorageBase
 from tests.common import (
     run_project_with_custom_exports,
     CUSTOM_EXPORTS_PROJECT_PATH,
@@ -108,6 +114,188 @@ def test_custom_exports(cleanup_project):
         assert isinstance(info["load_shape_pmult_sum"], float)
 
 
+def test_parquet_data_store(cleanup_project):
+    pytest.importorskip("pyarrow")
+    path = CUSTOM_EXPORTS_PROJECT_PATH
+    results = {}
+    for store_format in ("hdf5", "parquet"):
+        PyDssProject.run_project(
+            path,
+            options={"exports": {"data_store_format": store_format}},
+            simulation_file=SIMULATION_SETTINGS_FILENAME,
+        )
+        pydss_results = PyDssResults(path)
+        scenario = pydss_results.scenarios[0]
+        data = {}
+        for elem_class in scenario.list_element_classes():
+            for prop in scenario.list_element_properties(elem_class):
+                data[(elem_class, prop)] = scenario.get_full_dataframe(elem_class, prop)
+        data["values"] = list(scenario.iterate_element_property_values())
+        data["line_losses"] = scenario.get_dataframe("Circuits", "LineLosses", "Circuit.heco19021")
+        results[store_format] = data
+
+    assert os.path.isdir(os.path.join(path, "store.parquet", "Exports", "scenario1"))
+    hdf5_data = results["hdf5"]
+    parquet_data = results["parquet"]
+    assert hdf5_data.keys() == parquet_data.keys()
+    for key in hdf5_data:
+        if key == "values":
+            for expected, actual in zip(hdf5_data[key], parquet_data[key]):
+                assert expected[:3] == actual[:3]
+                assert np.array_equal(expected[3], actual[3])
+        else:
+            pd.testing.assert_frame_equal(hdf5_data[key], parquet_data[key])
+
+
+def test_topology_cache(cleanup_project):
+    path = CUSTOM_EXPORTS_PROJECT_PATH
+    results = []
+    for use_topology_cache in (False, True, True):
+        PyDssProject.run_project(
+            path,
+            options={"project": {"use_topology_cache": use_topology_cache}},
+            simulation_file=SIMULATION_SETTINGS_FILENAME,
+        )
+        pydss_results = PyDssResults(path)
+        scenario = pydss_results.scenarios[0]
+        results.append({
+            (elem_class, prop): scenario.get_full_dataframe(elem_class, prop)
+            for elem_class in scenario.list_element_classes()
+            for prop in scenario.list_element_properties(elem_class)
+        })
+
+    assert os.path.exists(os.path.join(path, "Logs", "Master_Spohn_existing_VV_topology.json"))
+    for data in results[1:]:
+        assert data.keys() == results[0].keys()
+        for key in data:
+            pd.testing.assert_frame_equal(data[key], results[0][key])
+
+
+@pytest.mark.parametrize("store_format", ["hdf5", "parquet"])
+def test_dataframe_time_range_and_columns(cleanup_project, store_format):
+    if store_format == "parquet":
+        pytest.importorskip("pyarrow")
+    path = CUSTOM_EXPORTS_PROJECT_PATH
+    PyDssProject.run_project(
+        path,
+        options={"exports": {"data_store_format": store_format}},
+        simulation_file=SIMULATION_SETTINGS_FILENAME,
+    )
+    results = PyDssResults(path)
+    scenario = results.scenarios[0]
+    start = "2020-01-01 06:00:00"
+    end = "2020-01-01 12:00:00"
+
+    full_df = scenario.get_full_dataframe("Lines", "CurrentsMagAng")
+    columns = [full_df.columns[5], full_df.columns[1], full_df.columns[2]]
+    df = scenario.get_full_dataframe("Lines", "CurrentsMagAng", start=start, end=end, columns=columns)
+    pd.testing.assert_frame_equal(df, full_df.loc[start:end, columns])
+    assert len(df) == 25
+
+    df = scenario.get_full_dataframe("Lines", "CurrentsMagAng", end=start, mag_ang="mag")
+    expected = scenario.get_full_dataframe("Lines", "CurrentsMagAng", mag_ang="mag")
+    pd.testing.assert_frame_equal(df, expected.loc[:start])
+
+    name = "Line.pvl_110"
+    elem_df = scenario.get_dataframe("Lines", "CurrentsMagAng", name, mag_ang="ang")
+    df = scenario.get_dataframe("Lines", "CurrentsMagAng", name, start=start, mag_ang="ang",
+                                columns=[elem_df.columns[1]])
+    pd.testing.assert_frame_equal(df, elem_df.loc[start:, [elem_df.columns[1]]])
+
+    circuit_df = scenario.get_dataframe("Circuits", "LineLosses", "Circuit.heco19021")
+    df = scenario.get_dataframe("Circuits", "LineLosses", "Circuit.heco19021", start=end)
+    pd.testing.assert_frame_equal(df, circuit_df.loc[end:])
+
+    with pytest.raises(InvalidParameter):
+        scenario.get_dataframe("Lines", "CurrentsMagAng", name, columns=["invalid"])
+
+
+def test_column_index(cleanup_project):
+    path = CUSTOM_EXPORTS_PROJECT_PATH
+    PyDssProject.run_project(path, simulation_file=SIMULATION_SETTINGS_FILENAME)
+    results = PyDssResults(path)
+    scenario = results.scenarios[0]
+    group = results.hdf_store["Exports/scenario1"]
+    column_index = ColumnIndex.read(group)
+    assert column_index is not None
+    assert group[COLUMN_INDEX_NAME].attrs["version"] == COLUMN_INDEX_VERSION
+    scanned_index = ColumnIndex.from_group(group)
+    assert column_index.element_classes == scanned_index.element_classes
+    for elem_class in column_index.element_classes:
+        for prop, prop_index in column_index.iter_properties(elem_class):
+            assert prop_index.to_dict() == scanned_index.get(elem_class, prop).to_dict()
+
+    options = scenario.list_element_property_options("Lines", "CurrentsMagAng")
+    full_df = scenario.get_full_dataframe("Lines", "CurrentsMagAng")
+    names = scenario.list_element_names("Lines")
+    prop_index = column_index.get("Lines", "CurrentsMagAng")
+    for kwargs in (
+        {"mag_ang": "mag"},
+        {"phase_terminal": "A1", "mag_ang": "ang"},
+        {"phase_terminal": re.compile(r"[AB]2"), "mag_ang": None},
+        {"phase_terminal": "Z9"},
+    ):
+        expected = []
+        try:
+            expected = ValueStorageBase.get_columns(full_df, names, options, **kwargs)
+        except InvalidParameter:
+            pass
+        indices = prop_index.select_columns(options, **kwargs)
+        assert [prop_index.columns[i] for i in indices] == expected
+
+    # Stores written without an index must give the same results.
+    name = "Line.pvl_110"
+    expected = scenario.get_dataframe("Lines", "CurrentsMagAng", name, mag_ang="mag")
+    expected_full = scenario.get_full_dataframe("Lines", "CurrentsMagAng", mag_ang="ang")
+    del results
+    filename = os.path.join(path, "store.h5")
+    with h5py.File(filename, "a") as hdf_store:
+        del hdf_store[f"Exports/scenario1/{COLUMN_INDEX_NAME}"]
+    results = PyDssResults(path)
+    scenario = results.scenarios[0]
+    assert ColumnIndex.read(results.hdf_store["Exports/scenario1"]) is None
+    df = scenario.get_dataframe("Lines", "CurrentsMagAng", name, mag_ang="mag")
+    pd.testing.assert_frame_equal(df, expected)
+    df = scenario.get_full_dataframe("Lines", "CurrentsMagAng", mag_ang="ang")
+    pd.testing.assert_frame_equal(df, expected_full)
+
+
+def test_filtered_dataframes(cleanup_project):
+    path = CUSTOM_EXPORTS_PROJECT_PATH
+    data = {"Buses": {"Distance": {"store_values_type": "all"}}}
+    run_project_with_custom_exports(path, "scenario1", SIMULATION_SETTINGS_FILENAME, data)
+    results = PyDssResults(path)
+    full_df = results.scenarios[0].get_full_dataframe("Buses", "Distance")
+    del results
+
+    data["Buses"]["Distance"]["limits"] = [0.05, 0.1]
+    run_project_with_custom_exports(path, "scenario1", SIMULATION_SETTINGS_FILENAME, data)
+    results = PyDssResults(path)
+    scenario = results.scenarios[0]
+    dfs = scenario.get_filtered_dataframes("Buses", "Distance")
+    names = [x.replace("__Distance", "") for x in full_df.columns]
+    assert sorted(names) == sorted(scenario.list_element_names("Buses", "Distance"))
+    num_without_rows = 0
+    for name, column in zip(names, full_df.columns):
+        expected = full_df[column][(full_df[column] < 0.05) | (full_df[column] > 0.1)]
+        df = scenario.get_dataframe("Buses", "Distance", name)
+        if expected.empty:
+            # Elements with all values inside the limits have no stored rows.
+            num_without_rows += 1
+            assert name not in dfs
+            assert df.empty
+            continue
+        assert list(dfs[name].columns) == [column]
+        assert list(dfs[name].index) == list(expected.index)
+        assert dfs[name][column].tolist() == expected.tolist()
+        pd.testing.assert_frame_equal(df, dfs[name])
+
+    assert num_without_rows > 0
+    assert len(dfs) == len(names) - num_without_rows
+    # Elements are returned in the order of their first stored row, as stored.
+    assert list(dfs) == [x for x in names if x in dfs]
+
+
 def test_export_moving_averages(cleanup_project):
     # Compares the moving average storage/calculation with a rolling average
     # computed on dataset with every time point.
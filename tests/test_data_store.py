@@ -0,0 +1,172 @@
+import os
+import shutil
+import tempfile
+
+import numpy as np
+import pandas as pd
+import pytest
+from loguru import logger
+
+from pydss.common import DataStoreFormat, HdfCompression
+from pydss.data_store import ParquetStore, is_group, merge_data_stores, open_data_store
+from pydss.dataset_buffer import DatasetBuffer, DatasetOptions, DEFAULT_DATASET_OPTIONS
+from pydss.exceptions import InvalidParameter
+
+pq = pytest.importorskip("pyarrow.parquet")
+
+STORE_PATH = os.path.join(tempfile.gettempdir(), "store.parquet")
+
+
+@pytest.fixture
+def store_path():
+    if os.path.exists(STORE_PATH):
+        shutil.rmtree(STORE_PATH)
+    yield STORE_PATH
+    if os.path.exists(STORE_PATH):
+        shutil.rmtree(STORE_PATH)
+
+
+@pytest.mark.parametrize("dtype", [float, complex, int])
+def test_parquet_store__dataset_buffer(store_path, dtype):
+    columns = ["Line.one__A1", "Line.one__B1", "Line.two__A1"]
+    max_size = 100
+    data = (np.arange(max_size * len(columns)) * (1 + 1j)).reshape(max_size, len(columns))
+    data = data.astype(dtype) if dtype is complex else data.real.astype(dtype)
+    with open_data_store(store_path, "w", DataStoreFormat.PARQUET) as store:
+        store.attrs["version"] = "1.0.0"
+        dataset = DatasetBuffer(
+            store, "Exports/s1/Lines/ElementProperties/Currents", max_size, dtype, columns,
+            max_chunk_bytes=256, names=["Line.one", "Line.two"],
+            column_ranges_per_name=[(0, 2), (2, 1)], attributes={"type": "per_time_point"},
+        )
+        for row in data:
+            dataset.write_value(row)
+        dataset.flush_data()
+        num_row_groups = max_size // dataset.chunk_count + bool(max_size % dataset.chunk_count)
+
+    with open_data_store(store_path, "r", DataStoreFormat.PARQUET) as store:
+        assert store.attrs["version"] == "1.0.0"
+        assert list(store["Exports"]) == ["s1"]
+        group = store["Exports/s1/Lines"]
+        assert is_group(group)
+        assert "ElementProperties" in group
+        assert "Missing" not in group
+        dataset = group["ElementProperties/Currents"]
+        assert not is_group(dataset)
+        assert dataset.attrs["type"] == "per_time_point"
+        assert dataset.attrs["length"] == max_size
+        assert DatasetBuffer.get_columns(dataset) == columns
+        assert DatasetBuffer.get_names(dataset) == ["Line.one", "Line.two"]
+        assert DatasetBuffer.get_column_ranges(dataset).tolist() == [[0, 2], [2, 1]]
+        df = DatasetBuffer.to_dataframe(dataset)
+        assert np.array_equal(df.values, data)
+        df = DatasetBuffer.to_dataframe(dataset, column_range=(1, 2))
+        assert list(df.columns) == columns[1:]
+        assert np.array_equal(df.values, data[:, 1:])
+        assert np.array_equal(dataset[:10, 2], data[:10, 2])
+        with pytest.raises(KeyError):
+            store["Exports/s2"]
+
+    # Each flush is one row group and the files have the real column names.
+    parquet_file = pq.ParquetFile(
+        os.path.join(store_path, "Exports", "s1", "Lines", "ElementProperties", "Currents.parquet")
+    )
+    assert parquet_file.num_row_groups == num_row_groups
+    if dtype is complex:
+        assert parquet_file.schema_arrow.names[:2] == ["Line.one__A1.real", "Line.one__A1.imag"]
+    else:
+        assert parquet_file.schema_arrow.names == columns
+
+
+def test_parquet_store__append_mode(store_path):
+    for i, scenario in enumerate(("s1", "s2")):
+        with open_data_store(store_path, "a", DataStoreFormat.PARQUET) as store:
+            dataset = DatasetBuffer(store, f"Exports/{scenario}/Mode", 4, "S10", ["Mode"])
+            for value in (b"Yearly", b"Snapshot"):
+                dataset.write_value([value])
+            dataset.flush_data()
+            assert list(store["Exports"]) == ["s1", "s2"][:i + 1]
+
+    with ParquetStore(store_path) as store:
+        assert store["Exports/s2/Mode"][:2, 0].tolist() == [b"Yearly", b"Snapshot"]
+
+
+@pytest.mark.parametrize("store_format", [DataStoreFormat.HDF5, DataStoreFormat.PARQUET])
+def test_merge_data_stores(store_format):
+    path = tempfile.mkdtemp()
+    try:
+        filename = os.path.join(path, "store")
+        src_filenames = []
+        for scenario in ("s1", "s2"):
+            src_filename = os.path.join(path, f"store_{scenario}")
+            with open_data_store(src_filename, "w", store_format) as store:
+                store.attrs["version"] = "1.0.0"
+                dataset = DatasetBuffer(store, f"Exports/{scenario}/Timestamp", 2, float, ["Timestamp"])
+                dataset.write_value([1.0])
+                dataset.flush_data()
+            src_filenames.append(src_filename)
+
+        merge_data_stores(filename, src_filenames, store_format)
+        assert not any(os.path.exists(x) for x in src_filenames)
+        with open_data_store(filename, "r", store_format) as store:
+            assert store.attrs["version"] == "1.0.0"
+            assert list(store["Exports"]) == ["s1", "s2"]
+            assert store["Exports/s2/Timestamp"][0, 0] == 1.0
+
+        with open_data_store(src_filenames[0], "w", store_format) as store:
+            DatasetBuffer(store, "Exports/s1/Timestamp", 2, float, ["Timestamp"]).flush_data()
+        with pytest.raises(InvalidParameter):
+            merge_data_stores(filename, src_filenames[:1], store_format)
+    finally:
+        shutil.rmtree(path)
+
+
+def test_parquet_store__errors(store_path):
+    with ParquetStore(store_path, "w") as store:
+        dataset = store.create_dataset("data", shape=(10, 2), dtype=float)
+        dataset[0:2] = np.ones((2, 2))
+        with pytest.raises(InvalidParameter):
+            dataset[5:7] = np.ones((2, 2))
+        with pytest.raises(InvalidParameter):
+            dataset[:]
+        with pytest.raises(InvalidParameter):
+            store.create_dataset("data", shape=(10, 2), dtype=float)
+
+    with ParquetStore(store_path, "r") as store:
+        with pytest.raises(InvalidParameter):
+            store.create_dataset("data2", shape=(10, 2), dtype=float)
+
+
+def test_parquet_store__in_memory(store_path):
+    messages = []
+    handler_id = logger.add(messages.append, level="WARNING")
+    try:
+        with open_data_store(store_path, "w", DataStoreFormat.PARQUET, in_memory=True) as store:
+            assert isinstance(store, ParquetStore)
+    finally:
+        logger.remove(handler_id)
+    assert any("in-memory" in x for x in messages)
+
+
+@pytest.mark.parametrize("compression", list(HdfCompression))
+def test_parquet_store__compression(store_path, compression):
+    options = DatasetOptions(compression, 4, DEFAULT_DATASET_OPTIONS.chunk_policy)
+    with ParquetStore(store_path, "w") as store:
+        dataset = DatasetBuffer(store, "data", 10, float, ["a", "b"], dataset_options=options)
+        for i in range(10):
+            dataset.write_value([i, i * 2])
+        dataset.flush_data()
+
+    filename = os.path.join(store_path, "data.parquet")
+    codec = pq.ParquetFile(filename).metadata.row_group(0).column(0).compression
+    expected = {
+        HdfCompression.NONE: "UNCOMPRESSED",
+        HdfCompression.LZF: "SNAPPY",
+        HdfCompression.GZIP: "GZIP",
+        HdfCompression.BLOSC: "LZ4",
+        HdfCompression.ZSTD: "ZSTD",
+    }[compression]
+    assert codec == expected
+    # Other tools can read the files directly.
+    df = pd.read_parquet(filename)
+    assert df["b"].tolist() == [i * 2.0 for i in range(10)]
@@ -5,8 +5,17 @@ import tempfile
 import h5py
 import numpy as np
 import pandas as pd
+import pytest
 
-from pydss.dataset_buffer import DatasetBuffer
+import pydss.dataset_buffer
+from pydss.common import HdfChunkPolicy, HdfCompression
+from pydss.dataset_buffer import (
+    BackgroundDatasetWriter,
+    DatasetBuffer,
+    DatasetOptions,
+    make_compression_kwargs,
+)
+from pydss.exceptions import DataStoreWriteError
 
 
 def test_dataset_buffer__compute_chunk_count():
@@ -30,6 +39,73 @@ def test_dataset_buffer__compute_chunk_count():
     ) == 1365
 
 
+def test_dataset_buffer__compute_chunk_shape():
+    one_year_at_5_minutes = int(60 / 5 * 24 * 365)
+    assert DatasetBuffer.compute_chunk_shape(
+        num_columns=4,
+        max_size=one_year_at_5_minutes,
+        dtype=float,
+        max_chunk_bytes=128 * 1024,
+        chunk_policy=HdfChunkPolicy.TIME_STEP,
+    ) == (4096, 4)
+    # Narrow datasets keep full rows.
+    assert DatasetBuffer.compute_chunk_shape(
+        num_columns=4,
+        max_size=one_year_at_5_minutes,
+        dtype=float,
+        max_chunk_bytes=128 * 1024,
+        chunk_policy=HdfChunkPolicy.BALANCED,
+    ) == (4096, 4)
+    assert DatasetBuffer.compute_chunk_shape(
+        num_columns=10000,
+        max_size=one_year_at_5_minutes,
+        dtype=float,
+        max_chunk_bytes=1024 * 1024,
+        chunk_policy=HdfChunkPolicy.BALANCED,
+    ) == (362, 362)
+    # The whole time series fits in the chunk height.
+    assert DatasetBuffer.compute_chunk_shape(
+        num_columns=10000,
+        max_size=96,
+        dtype=float,
+        max_chunk_bytes=1024 * 1024,
+        chunk_policy=HdfChunkPolicy.BALANCED,
+    ) == (96, 1365)
+
+
+@pytest.mark.parametrize("chunk_policy", list(HdfChunkPolicy))
+@pytest.mark.parametrize("compression", list(HdfCompression))
+def test_dataset_buffer__dataset_options(compression, chunk_policy):
+    filename = os.path.join(tempfile.gettempdir(), "store.h5")
+    try:
+        with h5py.File(filename, "w") as store:
+            # Rows are wider than max_chunk_bytes, which only the balanced policy allows.
+            num_columns = 3000 if chunk_policy == HdfChunkPolicy.BALANCED else 300
+            columns = [str(x) for x in range(num_columns)]
+            max_size = 100
+            options = DatasetOptions(compression, 4, chunk_policy)
+            dataset = DatasetBuffer(store, "data", max_size, float, columns,
+                                    max_chunk_bytes=16 * 1024, dataset_options=options)
+            for i in range(max_size):
+                dataset.write_value(np.arange(len(columns)) + i)
+            dataset.flush_data()
+            kwargs = make_compression_kwargs(compression, 4)
+            if not isinstance(kwargs.get("compression"), int):
+                # h5py reports filters from hdf5plugin as "unknown".
+                assert store["data"].compression == kwargs.get("compression")
+            if chunk_policy == HdfChunkPolicy.BALANCED:
+                assert store["data"].chunks == (45, 45)
+            else:
+                assert store["data"].chunks == (dataset.chunk_count, len(columns))
+
+        with h5py.File(filename, "r") as store:
+            expected = np.arange(len(columns)) + np.arange(max_size).reshape(max_size, 1)
+            assert np.array_equal(store["data"][:], expected)
+    finally:
+        if os.path.exists(filename):
+            os.remove(filename)
+
+
 def test_dataset_buffer__max_num_bytes():
     filename = os.path.join(tempfile.gettempdir(), "store.h5")
     try:
@@ -74,3 +150,79 @@ def test_dataset_buffer__write_value():
     finally:
         if os.path.exists(filename):
             os.remove(filename)
+
+
+def test_dataset_buffer__to_dataframe_hyperslab():
+    filename = os.path.join(tempfile.gettempdir(), "store.h5")
+    try:
+        with h5py.File(filename, "w") as store:
+            columns = ["a", "b", "c", "d", "e"]
+            data = np.arange(50, dtype=float).reshape(10, 5)
+            dataset = DatasetBuffer(store, "data", 10, float, columns, max_chunk_bytes=128)
+            for row in data:
+                dataset.write_value(row)
+            dataset.flush_data()
+
+            expected = pd.DataFrame(data, columns=columns)
+            df = DatasetBuffer.to_dataframe(store["data"], start=2, end=6)
+            assert df.equals(expected.iloc[2:6].reset_index(drop=True))
+            df = DatasetBuffer.to_dataframe(store["data"], column_range=(1, 3), end=100)
+            assert df.equals(expected[["b", "c", "d"]])
+            df = DatasetBuffer.to_dataframe(store["data"], start=8, column_indices=[4, 0, 4])
+            assert df.equals(expected.iloc[8:][["e", "a", "e"]].reset_index(drop=True))
+            df = DatasetBuffer.to_dataframe(store["data"], column_indices=[])
+            assert df.shape == (10, 0)
+    finally:
+        if os.path.exists(filename):
+            os.remove(filename)
+
+
+def test_dataset_buffer__background_writer():
+    filename = os.path.join(tempfile.gettempdir(), "store.h5")
+    try:
+        with h5py.File(filename, "w") as store:
+            writer = BackgroundDatasetWriter(max_queue_size=2)
+            columns = ("1", "2", "3", "4")
+            max_size = 5000
+            datasets = [
+                DatasetBuffer(store, f"data{i}", max_size, float, columns,
+                              max_chunk_bytes=16 * 1024, writer=writer)
+                for i in range(3)
+            ]
+            for i in range(max_size):
+                for j, dataset in enumerate(datasets):
+                    dataset.write_value(np.arange(4) + i * 4 + j)
+            for dataset in datasets:
+                dataset.flush_data()
+            writer.shutdown()
+
+        with h5py.File(filename, "r") as store:
+            for j in range(3):
+                dataset = store[f"data{j}"]
+                assert dataset.attrs["length"] == max_size
+                expected = np.arange(max_size * 4, dtype=float).reshape(max_size, 4) + j
+                assert np.array_equal(dataset[:], expected)
+    finally:
+        if os.path.exists(filename):
+            os.remove(filename)
+
+
+def test_dataset_buffer__background_writer_error():
+    writer = BackgroundDatasetWriter()
+
+    def fail():
+        raise OSError("disk full")
+
+    writer.submit(fail)
+    with pytest.raises(DataStoreWriteError):
+        writer.flush()
+    with pytest.raises(DataStoreWriteError):
+        writer.submit(fail)
+    with pytest.raises(DataStoreWriteError):
+        writer.shutdown()
+
+
+def test_make_compression_kwargs__missing_hdf5plugin(monkeypatch):
+    monkeypatch.setattr(pydss.dataset_buffer, "hdf5plugin", None)
+    kwargs = make_compression_kwargs(HdfCompression.ZSTD, 15)
+    assert kwargs == {"compression": "gzip", "compression_opts": 9, "shuffle": True}
@@ -0,0 +1,63 @@
+from pathlib import Path
+import os
+
+import numpy as np
+import opendssdirect as dss
+import pytest
+
+from pydss.dssElement import dssElement, set_parameters
+from pydss.exceptions import InvalidParameter
+
+
+MASTER_FILE = Path("tests") / "data" / "custom_exports_project" / "DSSfiles" / "Master_Spohn_existing_VV.dss"
+
+
+@pytest.fixture
+def loads():
+    orig = os.getcwd()
+    try:
+        dss.run_command(f"compile {MASTER_FILE.absolute()}")
+        dss.Solution.Solve()
+    finally:
+        # OpenDSS changes the current directory on compile.
+        os.chdir(orig)
+    objs = []
+    for name in dss.Circuit.AllElementNames():
+        if name.startswith("Load."):
+            dss.Circuit.SetActiveElement(name)
+            objs.append(dssElement(dss))
+    yield objs
+
+
+def test_set_parameters(loads):
+    values = np.arange(1, len(loads) + 1) * 1.5
+    set_parameters(loads, "kW", values)
+    for load, value in zip(loads, values):
+        assert load.GetParameter("kW") == value
+
+    set_parameters(loads, "kW", 2.0)
+    assert [x.GetParameter("kW") for x in loads] == [2.0] * len(loads)
+
+
+def test_set_parameters_errors(loads):
+    with pytest.raises(InvalidParameter):
+        set_parameters(loads, "kW", [1.0] * (len(loads) + 1))
+    with pytest.raises(InvalidParameter):
+        set_parameters(loads, "invalid_property", [1.0] * len(loads))
+
+
+def test_get_parameter_cache(loads):
+    load = loads[0]
+    kw = load.GetParameter("kW", use_cache=True)
+    dss.run_command(f"{load.FullName}.kW = {kw + 1}")
+    # Edits that bypass the element leave the cached value.
+    assert load.GetParameter("kW", use_cache=True) == kw
+    assert load.GetParameter("kW") == kw + 1
+    dssElement.InvalidateParameterCaches()
+    assert load.GetParameter("kw", use_cache=True) == kw + 1
+
+    load.SetParameter("kW", kw + 2)
+    assert load.GetParameter("kW", use_cache=True) == kw + 2
+
+    set_parameters([load], "kW", kw + 3)
+    assert load.GetParameter("kW", use_cache=True) == kw + 3
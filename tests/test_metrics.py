@@ -11,7 +11,7 @@ import numpy as np
 import pytest
 import h5py
 
-from pydss.value_storage import ValueByNumber, ValueByList
+from pydss.value_storage import ValueArray, ValueByNumber, ValueByList
 from pydss.export_list_reader import ExportListProperty
 from pydss.metrics import MultiValueTypeMetricBase
 from pydss.dataset_buffer import DatasetBuffer
@@ -216,6 +216,33 @@ def test_metrics_store_all_filtered(simulation_settings):
         assert [x for x in time_step_dataset[3]] == [4, 1]
 
 
+def test_metrics_store_all_filtered_int_nan(simulation_settings):
+    data = {
+        "property": "Property",
+        "store_values_type": "all",
+        "limits": [1, 3],
+        "limits_filter": LimitsFilter.OUTSIDE,
+    }
+    values = (1, 2, 3, 4, 5)
+    prop = ExportListProperty("Fake", data)
+    metric = FakeMetric(prop, OBJS, simulation_settings, values)
+    with h5py.File(STORE_FILENAME, mode="w", driver="core") as hdf_store:
+        metric.initialize_data_store(hdf_store, "", len(values))
+        for i in range(len(values)):
+            # The NaN values of int properties are outside of the limits but must
+            # not be stored.
+            metric.append_values(i, store_nan=i in (1, 3))
+        metric.close()
+
+        dataset = hdf_store["Fake/ElementProperties/Property"]
+        assert dataset.attrs["length"] == len(OBJS)
+        assert [x for x in dataset[:2]] == [5, 5]
+        time_step_dataset = hdf_store["Fake/ElementProperties/PropertyTimeStep"]
+        assert time_step_dataset.attrs["length"] == 2
+        assert [x for x in time_step_dataset[0]] == [4, 0]
+        assert [x for x in time_step_dataset[1]] == [4, 1]
+
+
 def test_metrics_store_moving_average_and_max(simulation_settings):
     window_size = 10
     values = [float(i) for i in range(50)] + [float(i) for i in range(25)]
@@ -391,3 +418,34 @@ def test_metrics_store_min(simulation_settings):
         assert dataset[0][0] == min(values)
         assert dataset[0][1] == min(values)
         assert metric.max_num_bytes() == 8 * len(OBJS)
+
+
+def test_value_array():
+    values = [
+        ValueByList("Fake.a", "Property", [1.0, 2.0], ["x", "y"]),
+        ValueByList("Fake.b", "Property", [3.0, 4.0], ["x", "y"]),
+    ]
+    array = ValueArray(values)
+    assert len(array) == 2
+    assert array.num_columns == 4
+    assert not array.has_scalar_elements
+    assert array.columns == [y for x in values for y in x.make_columns()]
+    assert array.column_ranges == [(0, 2), (2, 2)]
+    assert list(array.element_starts) == [0, 2]
+    assert list(array.data) == [1.0, 2.0, 3.0, 4.0]
+
+    values[1].set_value_from_raw([5.0, 6.0])
+    array.set_values(values)
+    assert list(array.data) == [1.0, 2.0, 5.0, 6.0]
+    array.set_nan()
+    assert array.is_nan()
+    assert list(array.is_nan_by_element()) == [True, True]
+
+    int_array = ValueArray([
+        ValueByNumber("Fake.a", "Property", 1),
+        ValueByNumber("Fake.b", "Property", 2),
+    ])
+    assert np.issubdtype(int_array.data.dtype, np.integer)
+    assert list(int_array.is_nan_by_element()) == [False, False]
+    int_array.set_nan()
+    assert list(int_array.is_nan_by_element()) == [True, True]
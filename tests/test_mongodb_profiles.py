@@ -0,0 +1,105 @@
+import datetime
+import threading
+
+import pytest
+
+from pydss.ProfileManager.hooks.MongoDB import ProfilePrefetcher
+
+
+START = datetime.datetime(2020, 1, 1)
+RESOLUTION = 900
+NUM_STEPS = 50
+
+
+class FakeCollection:
+    """In-process stand-in for a pymongo collection that supports the date range
+    queries of ProfilePrefetcher."""
+
+    def __init__(self, records, error=None):
+        self.records = records
+        self.error = error
+        self.num_queries = 0
+        self.threads = set()
+        self.queried = threading.Condition()
+
+    def wait_for_queries(self, num_queries):
+        with self.queried:
+            assert self.queried.wait_for(lambda: self.num_queries >= num_queries, timeout=10)
+
+    def find(self, query):
+        with self.queried:
+            self.num_queries += 1
+            self.threads.add(threading.get_ident())
+            self.queried.notify_all()
+        if self.error is not None:
+            raise self.error
+        condition = query["date"]
+        return [
+            dict(x) for x in self.records
+            if condition["$gte"] <= x["date"] < condition["$lt"]
+        ]
+
+
+def _make_records(offset, step=1):
+    return [
+        {
+            "date": START + datetime.timedelta(seconds=RESOLUTION * i),
+            "kw": {"load1": offset + i},
+        }
+        for i in range(0, NUM_STEPS, step)
+    ]
+
+
+def _time(step):
+    return START + datetime.timedelta(seconds=RESOLUTION * step)
+
+
+def test_prefetcher():
+    collections = {
+        "loads": FakeCollection(_make_records(0)),
+        "pv": FakeCollection(_make_records(1000, step=2)),
+    }
+    prefetcher = ProfilePrefetcher(
+        collections, START, _time(NUM_STEPS - 1), RESOLUTION, window_size=4, cache_size=2
+    )
+    try:
+        for i in range(NUM_STEPS):
+            records = prefetcher.get(_time(i))
+            assert records["loads"]["kw"]["load1"] == i
+            if i % 2 == 0:
+                assert records["pv"]["kw"]["load1"] == 1000 + i
+            else:
+                assert "pv" not in records
+        assert prefetcher.get(_time(NUM_STEPS)) == {}
+        assert threading.get_ident() not in collections["pv"].threads
+        # Moving back in time restarts reading ahead at the new time.
+        for i in range(3, 8):
+            assert prefetcher.get(_time(i))["loads"]["kw"]["load1"] == i
+        assert threading.get_ident() not in collections["loads"].threads
+    finally:
+        prefetcher.close()
+
+
+def test_prefetcher_cache_is_bounded():
+    collection = FakeCollection(_make_records(0))
+    prefetcher = ProfilePrefetcher(
+        {"loads": collection}, START, _time(NUM_STEPS - 1), RESOLUTION, window_size=2, cache_size=3
+    )
+    try:
+        # The thread fills the queue and then reads one more window that waits for space.
+        collection.wait_for_queries(4)
+        assert collection.num_queries == 4
+        assert prefetcher.get(_time(0))["loads"]["kw"]["load1"] == 0
+        collection.wait_for_queries(5)
+    finally:
+        prefetcher.close()
+
+
+def test_prefetcher_error():
+    collection = FakeCollection([], error=RuntimeError("connection lost"))
+    prefetcher = ProfilePrefetcher({"loads": collection}, START, _time(10), RESOLUTION)
+    try:
+        with pytest.raises(RuntimeError, match="connection lost"):
+            prefetcher.get(START)
+    finally:
+        prefetcher.close()
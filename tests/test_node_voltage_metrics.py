@@ -0,0 +1,63 @@
+from datetime import datetime, timedelta
+
+import numpy as np
+
+from pydss.node_voltage_metrics import NodeVoltageMetricsByType
+
+
+class _Limits:
+    def __init__(self, min_val, max_val):
+        self.min = min_val
+        self.max = max_val
+
+
+class _Prop:
+    limits = _Limits(0.95, 1.05)
+    limits_b = _Limits(0.90, 1.10)
+
+
+def test_node_voltage_metrics_by_type_update():
+    start = datetime(2020, 1, 1)
+    resolution = timedelta(minutes=15)
+    metrics = NodeVoltageMetricsByType(_Prop(), start, resolution, 2)
+    # Node 1 is not tracked and must be ignored.
+    metrics.set_node_info(["n0", "n2"], [0, 2])
+    voltages = np.array([
+        [1.00, 0.50, 1.00],
+        [0.94, 0.50, 1.00],
+        [0.93, 0.50, 1.12],
+        [1.00, 0.50, np.nan],
+    ])
+    for time_step, row in enumerate(voltages):
+        metrics.increment_steps()
+        metrics.update(time_step, row)
+
+    result = metrics.generate(True)
+    times = [start + resolution * i for i in range(len(voltages))]
+    assert result.metric_1.time_points == [times[1]]
+    assert result.metric_2["n0"].duration == 2 * resolution
+    assert result.metric_2["n2"].duration == resolution
+    # Moving averages: n0 = 0.97, 0.935, 0.965; n2 = 1.0, 1.06, NaN
+    assert result.metric_3.time_points == [times[2]]
+    assert result.metric_4.percent_node_ansi_a_violations == [[times[1], 50.0], [times[2], 100.0]]
+    assert result.metric_5.min_voltages == {"n0": 0.93, "n2": 1.0}
+    assert result.metric_5.max_voltages == {"n0": 1.0, "n2": 1.12}
+    assert result.metric_6.num_time_points == 1
+
+
+def test_node_voltage_metrics_by_type_generate_without_update():
+    start = datetime(2020, 1, 1)
+    resolution = timedelta(minutes=15)
+    metrics = NodeVoltageMetricsByType(_Prop(), start, resolution, 2)
+    metrics.set_node_info(["n0", "n2"], [0, 2])
+    assert metrics.generate(True) is None
+
+    # All time steps may be skipped, such as when the solution does not converge.
+    metrics.increment_steps()
+    result = metrics.generate(True)
+    assert not metrics.has_data()
+    assert result.metric_2 == {}
+    assert result.metric_5.min_voltages == {}
+    assert result.metric_5.max_voltages == {}
+    assert result.metric_6.num_time_points == 0
+    assert result.summary is None
@@ -0,0 +1,65 @@
+from pathlib import Path
+import os
+
+import opendssdirect as dss
+
+from pydss.dssInstance import OpenDSS
+from pydss.object_registry import LazyObjectDict
+
+
+MASTER_FILE = Path("tests") / "data" / "custom_exports_project" / "DSSfiles" / "Master_Spohn_existing_VV.dss"
+
+
+def test_lazy_object_dict():
+    created = []
+
+    def create(name):
+        created.append(name)
+        return name.upper()
+
+    objects = LazyObjectDict(["a", "b", "c"], create)
+    assert list(objects) == ["a", "b", "c"]
+    assert "b" in objects and "d" not in objects
+    assert len(objects) == 3
+    assert objects.num_created == 0
+    assert objects["b"] == "B"
+    assert objects["b"] == "B"
+    assert created == ["b"]
+    assert objects.get("d") is None
+    objects["d"] = "x"
+    assert objects.num_created == 2
+    assert dict(objects) == {"a": "A", "b": "B", "c": "C", "d": "x"}
+    assert created == ["b", "a", "c"]
+
+
+def test_create_dss_objects_on_access():
+    orig = os.getcwd()
+    try:
+        dss.run_command("clear")
+        dss.run_command(f"compile {MASTER_FILE.absolute()}")
+        dss.Solution.Solve()
+    finally:
+        # OpenDSS changes the current directory on compile.
+        os.chdir(orig)
+
+    buses = OpenDSS.CreateBusObjects()
+    elements, elements_by_class = OpenDSS.CreateDssObjects(buses)
+    assert buses.num_created == 0
+    # Only the circuit object is created up front.
+    assert elements.num_created == 1
+
+    names = dss.Circuit.AllElementNames()
+    assert set(elements_by_class["Loads"]) == {x for x in names if x.startswith("Load.")}
+
+    load_names = [x for x in names if x.startswith("Load.")]
+    dss.Basic.SetActiveClass("Load")
+    dss.ActiveClass.First()
+    load = elements_by_class["Loads"][load_names[-1]]
+    # Creating an element does not disturb iteration over the active class.
+    assert dss.Element.Name() == load_names[0]
+    dss.ActiveClass.Next()
+    assert dss.Element.Name() == load_names[1]
+    assert elements[load.FullName] is load
+    assert load.GetParameter("kW") > 0
+    assert load.sBus[0].Name in buses
+    assert elements.num_created == 2
@@ -0,0 +1,221 @@
+import datetime
+import os
+import shutil
+import tempfile
+from pathlib import Path
+from types import SimpleNamespace
+
+import h5py
+import numpy as np
+import opendssdirect as dss
+import pytest
+from loguru import logger
+
+from pydss.common import DATE_FORMAT, PROFILE_MAPPING, ProfileStoreFormat
+from pydss.dssInstance import OpenDSS
+from pydss.ProfileManager import ProfileInterface
+from pydss.ProfileManager.hooks.h5 import ProfileMatrix
+from pydss.ProfileManager.hooks.npy import (
+    MappedProfileMatrix, MappedProfileStore, convert_h5_store
+)
+from pydss.simulation_input_models import ProfilesModel
+from pydss.utils.utils import dump_data
+
+
+STORE_FILENAME = os.path.join(tempfile.gettempdir(), "test_profiles.h5")
+MAPPED_STORE_DIR = os.path.join(tempfile.gettempdir(), "test_profiles_npy")
+START = datetime.datetime(2020, 1, 1)
+MASTER_FILE = Path("tests") / "data" / "custom_exports_project" / "DSSfiles" / "Master_Spohn_existing_VV.dss"
+
+
+@pytest.fixture
+def profiles():
+    rng = np.random.default_rng(1)
+    with h5py.File(STORE_FILENAME, "w") as store:
+        items = []
+        for i, (offset_sec, resolution, num_points) in enumerate(
+            ((0, 900, 96), (1800, 1800, 40), (-3600, 300, 500))
+        ):
+            start = START + datetime.timedelta(seconds=offset_sec)
+            dataset = store.create_dataset(
+                f"Load/profile{i}", data=rng.random(num_points), chunks=True, compression="gzip"
+            )
+            dataset.attrs["sTime"] = np.string_(start.strftime(DATE_FORMAT))
+            dataset.attrs["resTime"] = resolution
+            dataset.attrs["units"] = np.string_("kW")
+            items.append(SimpleNamespace(
+                profile=dataset,
+                sTime=start,
+                eTime=start + datetime.timedelta(seconds=resolution * num_points),
+                attrs={"resTime": resolution},
+            ))
+        yield items
+    os.remove(STORE_FILENAME)
+
+
+def _get_expected_values(profile, time):
+    # Reference implementation of the per-profile lookup.
+    if time < profile.sTime or time > profile.eTime:
+        return 0, 0
+    resolution = profile.attrs["resTime"]
+    last = len(profile.profile) - 1
+    n = min(int((time - profile.sTime).total_seconds() / resolution), last)
+    value = profile.profile[n]
+    dt = (time - (profile.sTime + datetime.timedelta(seconds=n * resolution))).total_seconds()
+    next_value = profile.profile[min(n + 1, last)]
+    return value, value + (next_value - value) * dt / resolution
+
+
+@pytest.mark.parametrize("buffer_size", [None, 2, 10, 1000])
+def test_profile_matrix(profiles, buffer_size):
+    matrix = ProfileMatrix(profiles, buffer_size)
+    time = START - datetime.timedelta(hours=2)
+    while time < START + datetime.timedelta(days=2):
+        values, interpolated = matrix.get_values(time)
+        for i, profile in enumerate(profiles):
+            expected_value, expected_interpolated = _get_expected_values(profile, time)
+            assert values[i] == expected_value
+            assert interpolated[i] == pytest.approx(expected_interpolated)
+        time += datetime.timedelta(seconds=700)
+
+    values, interpolated = matrix.get_values(START, rows=[1])
+    assert values.tolist() == [0]
+
+
+def test_mapped_profile_matrix(profiles):
+    if os.path.exists(MAPPED_STORE_DIR):
+        shutil.rmtree(MAPPED_STORE_DIR)
+    profiles[0].profile.file.flush()
+    try:
+        convert_h5_store(STORE_FILENAME, MAPPED_STORE_DIR)
+        store = MappedProfileStore(MAPPED_STORE_DIR)
+        assert "Load" in store
+        mapped_profiles = []
+        for i, profile in enumerate(profiles):
+            mapped = store["Load"][f"profile{i}"]
+            assert mapped.attrs["units"] == "kW"
+            assert mapped.attrs["resTime"] == profile.attrs["resTime"]
+            assert mapped.attrs["sTime"] == profile.sTime.strftime(DATE_FORMAT)
+            assert np.array_equal(mapped[:], profile.profile[:])
+            mapped_profiles.append(SimpleNamespace(
+                profile=mapped, sTime=profile.sTime, eTime=profile.eTime, attrs=mapped.attrs
+            ))
+
+        matrix = ProfileMatrix(profiles)
+        mapped_matrix = MappedProfileMatrix(mapped_profiles, store.array)
+        time = START - datetime.timedelta(hours=2)
+        while time < START + datetime.timedelta(days=2):
+            for expected, actual in zip(matrix.get_values(time), mapped_matrix.get_values(time)):
+                assert np.array_equal(expected, actual)
+            time += datetime.timedelta(seconds=700)
+    finally:
+        if os.path.exists(MAPPED_STORE_DIR):
+            shutil.rmtree(MAPPED_STORE_DIR)
+
+
+class FakeSolver:
+
+    def __init__(self):
+        self.time = START
+
+    def GetDateTime(self):
+        return self.time
+
+    def GetStepSizeSec(self):
+        return 900
+
+
+def _compile():
+    orig = os.getcwd()
+    try:
+        dss.run_command("clear")
+        dss.run_command(f"compile {MASTER_FILE.absolute()}")
+    finally:
+        # OpenDSS changes the current directory on compile.
+        os.chdir(orig)
+    buses = OpenDSS.CreateBusObjects()
+    elements, _ = OpenDSS.CreateDssObjects(buses)
+    return elements
+
+
+def _run_profile_manager(project_dir, source, source_type, load_names):
+    settings = SimpleNamespace(
+        profiles=ProfilesModel(source=source, source_type=source_type, is_relative_path=False),
+        project=SimpleNamespace(active_project_path=project_dir),
+    )
+    solver = FakeSolver()
+    manager = ProfileInterface.Create(
+        dss, solver, settings, logger, objects=_compile(), bufferSize=10, neglectYear=False
+    )
+    results = []
+    try:
+        solver.time = START - datetime.timedelta(hours=2)
+        while solver.time < START + datetime.timedelta(days=2):
+            manager.update()
+            values = []
+            for name in load_names:
+                dss.Loads.Name(name.split(".")[1])
+                values.append(dss.Loads.kW())
+            results.append(values)
+            solver.time += datetime.timedelta(seconds=700)
+    finally:
+        if hasattr(manager.store, "close"):
+            manager.store.close()
+    return manager, np.array(results)
+
+
+def _create_profile_store(filename):
+    # Profiles with the metadata that the h5 Profile Manager writes.
+    rng = np.random.default_rng(2)
+    with h5py.File(filename, "w") as store:
+        group = store.create_group("Load")
+        for i, (offset_sec, resolution, num_points) in enumerate(
+            ((0, 900, 96), (1800, 1800, 40), (-3600, 300, 500))
+        ):
+            start = START + datetime.timedelta(seconds=offset_sec)
+            data = 10 * rng.random(num_points)
+            dataset = group.create_dataset(f"profile{i}", data=data, chunks=True, compression="gzip")
+            end = start + datetime.timedelta(seconds=resolution * num_points)
+            dataset.attrs["sTime"] = np.string_(start.strftime(DATE_FORMAT))
+            dataset.attrs["eTime"] = np.string_(end.strftime(DATE_FORMAT))
+            dataset.attrs["resTime"] = resolution
+            dataset.attrs["npts"] = num_points
+            dataset.attrs["max"] = data.max()
+            dataset.attrs["units"] = np.string_("kW")
+
+
+def test_npy_profile_manager():
+    project_dir = tempfile.mkdtemp()
+    profiles_dir = os.path.join(project_dir, "Profiles")
+    h5_store = os.path.join(profiles_dir, "profiles.h5")
+    mapped_store = os.path.join(profiles_dir, "profiles_npy")
+    try:
+        _compile()
+        load_names = ["Load." + x for x in dss.Loads.AllNames()[:4]]
+        mapping = {
+            "Load": {
+                "profile0": [
+                    {"object": load_names[0]},
+                    {"object": load_names[1], "multiplier": 2, "normalize": True},
+                ],
+                "profile1": [{"object": load_names[2], "interpolate": True}],
+                "profile2": [{"object": load_names[3], "interpolate": True, "multiplier": 3}],
+            }
+        }
+        os.makedirs(profiles_dir)
+        dump_data(mapping, os.path.join(profiles_dir, PROFILE_MAPPING))
+        _create_profile_store(h5_store)
+        convert_h5_store(h5_store, mapped_store)
+
+        _, expected = _run_profile_manager(project_dir, h5_store, ProfileStoreFormat.HDF5, load_names)
+        manager, actual = _run_profile_manager(
+            project_dir, mapped_store, ProfileStoreFormat.NPY, load_names
+        )
+        assert type(manager.store).__name__ == "MappedProfileStore"
+        assert len(manager.Profiles) == 3
+        # Every load follows its profile at most time points.
+        for column in expected.T:
+            assert len(np.unique(column)) > 50
+        assert np.array_equal(expected, actual)
+    finally:
+        shutil.rmtree(project_dir)
@@ -0,0 +1,94 @@
+from pathlib import Path
+import os
+
+import opendssdirect as dss
+import pytest
+
+from pydss.dssInstance import OpenDSS
+from pydss.exceptions import InvalidConfiguration
+from pydss.pyControllers.Controllers.PvController import PvController
+from pydss.pyControllers.Controllers.PvControllerFleet import PvControllerFleet
+from pydss.utils.utils import load_data
+
+
+MASTER_FILE = Path("tests") / "data" / "custom_exports_project" / "DSSfiles" / "Master_Spohn_existing_VV.dss"
+SETTINGS_FILE = Path("src") / "pydss" / "pyControllers" / "Controllers" / "Settings" / "PvControllers.toml"
+
+
+class Solver:
+    def reSolve(self):
+        dss.Solution.Solve()
+
+
+def _compile():
+    orig = os.getcwd()
+    try:
+        dss.run_command("clear")
+        dss.run_command(f"compile {MASTER_FILE.absolute()}")
+    finally:
+        # OpenDSS changes the current directory on compile.
+        os.chdir(orig)
+    dss.Solution.Solve()
+    buses = OpenDSS.CreateBusObjects()
+    elements, _ = OpenDSS.CreateDssObjects(buses)
+    names = ["PVSystem." + x for x in dss.PVsystems.AllNames()]
+    return names, elements
+
+
+def _get_pv_powers():
+    powers = []
+    flag = dss.PVsystems.First()
+    while flag > 0:
+        powers.append(dss.CktElement.Powers()[:2])
+        flag = dss.PVsystems.Next()
+    return powers
+
+
+def _run_control_loop(update):
+    results = []
+    for time_step in range(2):
+        for _ in range(5):
+            error = update(0, time_step)
+            dss.Solution.Solve()
+            results.append((error, _get_pv_powers()))
+    return results
+
+
+@pytest.mark.parametrize("control", ["VVar", "vwatt", "cpf"])
+def test_pv_controller_fleet_matches_pv_controller(control):
+    settings = load_data(SETTINGS_FILE)["volt-var"]
+    settings["Control1"] = control
+    # Make the volt / watt curve curtail at the voltages of this circuit.
+    settings["uMinC"] = 1.0
+    settings["uMaxC"] = 1.05
+
+    names, elements = _compile()
+    controllers = [PvController(elements[x], settings, dss, elements, Solver()) for x in names]
+
+    def update_controllers(priority, time_step):
+        errors = []
+        for controller in controllers:
+            dss.Circuit.SetActiveElement(controller.ControlledElement())
+            errors.append(controller.Update(priority, time_step, False))
+        return max(errors)
+
+    expected = _run_control_loop(update_controllers)
+
+    names, elements = _compile()
+    fleet = PvControllerFleet({x: settings for x in names}, dss, elements, Solver())
+    assert fleet.ControlledElements() == names
+    actual = _run_control_loop(lambda priority, time_step: fleet.Update(priority, time_step, False))
+    assert sorted(fleet.DeviceErrors()) == sorted(names)
+
+    for (expected_error, expected_powers), (error, powers) in zip(expected, actual):
+        assert error == pytest.approx(expected_error, abs=1e-4)
+        for expected_values, values in zip(expected_powers, powers):
+            assert values == pytest.approx(expected_values, abs=1e-3)
+
+
+def test_pv_controller_fleet_unsupported_control():
+    settings = load_data(SETTINGS_FILE)["volt-var"]
+    settings["Control2"] = "vpf"
+    names, elements = _compile()
+    with pytest.raises(InvalidConfiguration):
+        PvControllerFleet({x: settings for x in names}, dss, elements, Solver())
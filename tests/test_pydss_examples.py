@@ -4,10 +4,13 @@ import subprocess
 import tempfile
 import os
 
+import h5py
 from loguru import logger
+import numpy as np
 import pytest
 
 from pydss.pydss_project import PyDssProject
+from pydss.utils.utils import dump_data, load_data
 
 IN_GITHUB_ACTIONS = os.getenv("GITHUB_ACTIONS") == "true"
 EXAMPLES_path = "examples"
@@ -83,6 +86,38 @@ def test_monte_carlo_example(pydss_project):
     run_example(pydss_project, example_name, scenarios)
     return
 
+def test_monte_carlo_example_in_parallel(pydss_project):
+    example_name = "monte_carlo"
+    base_projects_path = copy_examples_to_temp_folder(pydss_project, example_name)
+    project_path = os.path.join(base_projects_path, example_name)
+    simulation_file = os.path.join(project_path, "simulation.toml")
+    total_power = {}
+    for num_workers in (1, 2):
+        data = load_data(simulation_file)
+        data["MonteCarlo"]["Number of workers"] = num_workers
+        data["MonteCarlo"]["Random seed"] = 42
+        dump_data(data, simulation_file)
+        PyDssProject.run_project(project_path, simulation_file="simulation.toml")
+        with h5py.File(os.path.join(project_path, "store.h5"), "r") as store:
+            assert sorted(store["Exports"]) == [f"scenario_1_MC{i}" for i in range(5)]
+            total_power[num_workers] = [
+                store[f"Exports/scenario_1_MC{i}/Circuits/ElementProperties/TotalPower"][:]
+                for i in range(5)
+            ]
+    assert not [
+        x for x in os.listdir(os.path.join(project_path, "Exports"))
+        if x.startswith("monte_carlo_stores_")
+    ]
+
+    # Each scenario starts at the same time with its own random values.
+    assert all(len(x) == 96 for x in total_power[1])
+    assert not np.allclose(total_power[1][0], total_power[1][1])
+    # The initial solution of each scenario depends on the previous scenario
+    # in the same process, so results only match within solver tolerance.
+    for sequential, parallel in zip(total_power[1], total_power[2]):
+        assert np.allclose(sequential, parallel, rtol=1e-3)
+
+
 def test_custom_contols_example(pydss_project):
     example_name = "custom_contols"
     scenarios = [
@@ -5,6 +5,7 @@ import re
 import shutil
 import tempfile
 
+from loguru import logger
 import pandas as pd
 import pytest
 
@@ -13,7 +14,12 @@ from pydss.exceptions import InvalidParameter
 from pydss.pydss_fs_interface import PROJECT_DIRECTORIES, SCENARIOS, STORE_FILENAME
 from pydss.pydss_project import PyDssProject, PyDssScenario, DATA_FORMAT_VERSION
 from pydss.pydss_results import PyDssResults, PyDssScenarioResults
-from tests.common import RUN_PROJECT_PATH, SCENARIO_NAME, cleanup_project
+from tests.common import (
+    PV_REPORTS_PROJECT_STORE_ALL_PATH,
+    RUN_PROJECT_PATH,
+    SCENARIO_NAME,
+    cleanup_project,
+)
 from pydss.common import SIMULATION_SETTINGS_FILENAME
 
 
@@ -96,6 +102,48 @@ def test_run_project_by_property_err(cleanup_project):
         run_test_project_by_property(tar_project=True, zip_project=True)
 
 
+def test_run_project_in_parallel(cleanup_project):
+    path = PV_REPORTS_PROJECT_STORE_ALL_PATH
+    data = {}
+    log_file = os.path.join(path, "Logs", "pydss.log")
+    for num_workers in (None, 2):
+        if os.path.exists(log_file):
+            os.remove(log_file)
+        logger.add(log_file)
+        PyDssProject.run_project(
+            path, simulation_file=SIMULATION_SETTINGS_FILENAME, num_workers=num_workers
+        )
+        results = PyDssResults(path)
+        assert results.hdf_store.attrs["version"] == DATA_FORMAT_VERSION
+        dfs = {}
+        for scenario in results.scenarios:
+            for elem_class in scenario.list_element_classes():
+                for prop in scenario.list_element_properties(elem_class):
+                    dfs[(scenario.name, elem_class, prop)] = \
+                        scenario.get_full_dataframe(elem_class, prop)
+        data[num_workers] = (dfs, results.read_report("Thermal Metrics"))
+        del results
+        # Workers log to the project log file like the sequential run.
+        with open(log_file) as f:
+            assert f.read().count("End of simulation") == 2
+
+    assert not [x for x in os.listdir(path) if x.startswith("scenario_stores_")]
+    sequential_dfs, sequential_report = data[None]
+    parallel_dfs, parallel_report = data[2]
+    assert {x[0] for x in sequential_dfs} == {"control_mode", "pf1"}
+    assert sequential_dfs.keys() == parallel_dfs.keys()
+    for key, df in sequential_dfs.items():
+        pd.testing.assert_frame_equal(df, parallel_dfs[key])
+    assert sequential_report == parallel_report
+
+
+def test_run_project_invalid_num_workers(cleanup_project):
+    with pytest.raises(InvalidParameter):
+        PyDssProject.run_project(
+            RUN_PROJECT_PATH, simulation_file=SIMULATION_SETTINGS_FILENAME, num_workers=0
+        )
+
+
 def run_test_project_by_property(tar_project, zip_project):
     project = PyDssProject.load_project(RUN_PROJECT_PATH)
     PyDssProject.run_project(
@@ -0,0 +1,33 @@
+import numpy as np
+
+from pydss.utils.simulation_utils import CircularBufferArrayHelper, CircularBufferHelper
+
+
+def test_circular_buffer_array_helper():
+    window_sizes = [1, 3, 5, 7]
+    rng = np.random.default_rng(0)
+    data = rng.uniform(0.9, 1.1, size=(50, len(window_sizes)))
+    data[20, 2] = np.nan
+    bufs = [CircularBufferHelper(x) for x in window_sizes]
+    array_buf = CircularBufferArrayHelper(len(window_sizes), window_sizes)
+    for row in data:
+        array_buf.append(row)
+        averages = array_buf.average()
+        for i, buf in enumerate(bufs):
+            buf.append(row[i])
+            expected = buf.average()
+            if np.isnan(expected):
+                assert np.isnan(averages[i])
+            else:
+                assert np.isclose(averages[i], expected, rtol=1e-12)
+    assert len(array_buf) == len(data)
+
+
+def test_circular_buffer_array_helper_one_window_size():
+    array_buf = CircularBufferArrayHelper(2, 2)
+    array_buf.append(np.array([1.0, 2.0]))
+    assert np.isnan(array_buf.average()).all()
+    array_buf.append(np.array([3.0, 4.0]))
+    assert list(array_buf.average()) == [2.0, 3.0]
+    array_buf.append(np.array([5.0, 6.0]))
+    assert list(array_buf.average()) == [4.0, 5.0]
@@ -0,0 +1,132 @@
+from pathlib import Path
+import datetime
+import os
+
+import opendssdirect as dss
+import pytest
+
+from pydss.dssInstance import OpenDSS
+from pydss.exceptions import InvalidConfiguration
+from pydss.pyControllers.Controllers.StorageController import StorageController
+from pydss.pyControllers.Controllers.StorageControllerFleet import StorageControllerFleet
+from pydss.utils.utils import load_data
+
+
+MASTER_FILE = Path("tests") / "data" / "custom_exports_project" / "DSSfiles" / "Master_Spohn_existing_VV.dss"
+SETTINGS_FILE = Path("src") / "pydss" / "defaults" / "pyControllerList" / "StorageController.toml"
+TARIFF = str({"summer": {"SD": 1, "ED": 365, "TOW": ["Monday", "Tuesday"], "ST": [0], "ET": [12]}})
+
+
+class Solver:
+    def reSolve(self):
+        dss.Solution.Solve()
+
+    def GetDateTime(self):
+        # A Monday
+        return datetime.datetime(2020, 6, 1, 0, 0)
+
+
+def _compile(commands=()):
+    orig = os.getcwd()
+    try:
+        dss.run_command("clear")
+        dss.run_command(f"compile {MASTER_FILE.absolute()}")
+    finally:
+        # OpenDSS changes the current directory on compile.
+        os.chdir(orig)
+    for command in commands:
+        dss.run_command(command)
+    dss.Solution.Solve()
+    buses = OpenDSS.CreateBusObjects()
+    elements, _ = OpenDSS.CreateDssObjects(buses)
+    names = ["Storage." + x for x in dss.Storages.AllNames()]
+    return names, elements
+
+
+def _get_storage_states():
+    states = []
+    flag = dss.Storages.First()
+    while flag > 0:
+        states.append((dss.Properties.Value("State"), dss.CktElement.Powers()[:2]))
+        flag = dss.Storages.Next()
+    return states
+
+
+def _run_control_loop(update):
+    results = []
+    for time_step in range(2):
+        for _ in range(5):
+            error = update(0, time_step)
+            dss.Solution.Solve()
+            results.append((error, _get_storage_states()))
+    return results
+
+
+def _make_settings(names, overrides):
+    base = load_data(SETTINGS_FILE)["Storage.1234"]
+    settings = {}
+    for i, name in enumerate(names):
+        settings[name] = dict(base)
+        settings[name]["touLoadLim"] = 0
+        settings[name]["%touCharge"] = 50
+        settings[name]["touTarrifStructure"] = TARIFF
+        settings[name]["Schedule"] = [0.5, -0.5]
+        settings[name].update(overrides)
+        # Vary the settings by storage system.
+        settings[name]["PS_ub"] = -50 * i
+        settings[name]["%kWOut"] = 50 * (i - 1)
+    return settings
+
+
+DISCHARGE = [f"Storage.ESS{x}.State=DISCHARGING %Discharge={x - 100}" for x in range(110, 114)]
+
+
+@pytest.mark.parametrize(
+    "overrides, commands",
+    [
+        ({"Control1": "PS"}, ()),
+        ({"Control1": "PS", "PowerMeaElem": "Total"}, ()),
+        ({"Control1": "RT"}, ()),
+        ({"Control1": "TT", "HrCharge": 0}, ()),
+        ({"Control1": "SH"}, ()),
+        ({"Control1": "TOU"}, ()),
+        ({"Control1": "NETT", "BaseLoadLim": 50}, ()),
+        (
+            {"Control1": "NETT", "ExpWindowStart": datetime.time(8), "ExpWindowEnd": datetime.time(18), "BaseLoadLim": 50},
+            (),
+        ),
+        ({"Control1": "VVar", "uDbMin": 0.98, "uDbMax": 0.99}, DISCHARGE),
+    ],
+)
+def test_storage_controller_fleet_matches_storage_controller(overrides, commands):
+    names, elements = _compile(commands)
+    settings = _make_settings(names, overrides)
+    controllers = [StorageController(elements[x], settings[x], dss, elements, Solver()) for x in names]
+
+    def update_controllers(priority, time_step):
+        errors = []
+        for controller in controllers:
+            dss.Circuit.SetActiveElement(controller.ControlledElement())
+            errors.append(controller.Update(priority, time_step, False))
+        return max(errors)
+
+    expected = _run_control_loop(update_controllers)
+
+    names, elements = _compile(commands)
+    fleet = StorageControllerFleet(settings, dss, elements, Solver())
+    assert fleet.ControlledElements() == names
+    actual = _run_control_loop(lambda priority, time_step: fleet.Update(priority, time_step, False))
+    assert sorted(fleet.DeviceErrors()) == sorted(names)
+
+    for (expected_error, expected_states), (error, states) in zip(expected, actual):
+        assert error == pytest.approx(expected_error, rel=1e-9)
+        for (expected_state, expected_powers), (state, powers) in zip(expected_states, states):
+            assert state == expected_state
+            assert powers == pytest.approx(expected_powers, rel=1e-9)
+
+
+def test_storage_controller_fleet_unsupported_control():
+    names, elements = _compile()
+    settings = _make_settings(names, {"Control2": "CPF"})
+    with pytest.raises(InvalidConfiguration):
+        StorageControllerFleet(settings, dss, elements, Solver())
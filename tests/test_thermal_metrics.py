@@ -0,0 +1,49 @@
+from datetime import datetime, timedelta
+import json
+import os
+import tempfile
+
+import numpy as np
+
+from pydss.thermal_metrics import ThermalMetrics
+
+
+def test_thermal_metrics_update():
+    metrics = ThermalMetrics(
+        None,
+        datetime(2020, 1, 1),
+        timedelta(hours=1),
+        line_window_size_hours=2,
+        line_window_size=2,
+        transformer_window_size_hours=3,
+        transformer_window_size=3,
+        line_loading_percent_threshold=100,
+        line_loading_percent_moving_average_threshold=75,
+        transformer_loading_percent_threshold=120,
+        transformer_loading_percent_moving_average_threshold=100,
+        store_per_element_data=True,
+    )
+    metrics.line_names = ["Line.a", "Line.b"]
+    metrics.transformer_names = ["Transformer.t"]
+    line_loadings = np.array([[50.0, 80.0], [110.0, 60.0], [40.0, np.nan], [20.0, 70.0]])
+    transformer_loadings = np.array([[90.0], [130.0], [100.0], [50.0]])
+    for time_step in range(len(line_loadings)):
+        metrics.update(time_step, line_loadings[time_step], transformer_loadings[time_step])
+        metrics.increment_steps()
+
+    with tempfile.TemporaryDirectory() as path:
+        metrics.generate_report(path)
+        with open(os.path.join(path, ThermalMetrics.FILENAME)) as f:
+            report = json.load(f)
+
+    lines = report["line_loadings"]
+    assert lines["max_instantaneous_loadings_pct"] == {"Line.a": 110.0, "Line.b": 80.0}
+    # Every window for Line.b after the second step contains the NaN.
+    assert lines["max_moving_average_loadings_pct"] == {"Line.a": 80.0, "Line.b": 70.0}
+    assert lines["num_time_points_with_instantaneous_violations"] == 1
+    assert lines["num_time_points_with_moving_average_violations"] == 1
+    transformers = report["transformer_loadings"]
+    assert transformers["max_instantaneous_loadings_pct"] == {"Transformer.t": 130.0}
+    assert transformers["max_moving_average_loadings_pct"] == {"Transformer.t": 320.0 / 3}
+    assert transformers["num_time_points_with_instantaneous_violations"] == 1
+    assert transformers["num_time_points_with_moving_average_violations"] == 1
@@ -0,0 +1,72 @@
+from pathlib import Path
+import os
+import tempfile
+
+import opendssdirect as dss
+import pytest
+
+from pydss.dssInstance import OpenDSS
+from pydss.topology_cache import compute_model_hash, load_topology, read_topology, save_topology
+
+
+MASTER_FILE = Path("tests") / "data" / "custom_exports_project" / "DSSfiles" / "Master_Spohn_existing_VV.dss"
+CACHE_FILE = Path(tempfile.gettempdir()) / "test_topology.json"
+# _Variables includes variable names that earlier elements added to the CktElement module.
+EXCLUDED_ATTRIBUTES = ("_sBus", "_BusInfo", "_CachedValueStorage", "_Variables")
+
+
+def _compile():
+    orig = os.getcwd()
+    try:
+        dss.run_command("clear")
+        dss.run_command(f"compile {MASTER_FILE.absolute()}")
+        dss.Solution.Solve()
+    finally:
+        # OpenDSS changes the current directory on compile.
+        os.chdir(orig)
+
+
+def _get_attributes(obj):
+    return {k: v for k, v in vars(obj).items() if k not in EXCLUDED_ATTRIBUTES}
+
+
+@pytest.fixture
+def cache_file():
+    yield CACHE_FILE
+    if CACHE_FILE.exists():
+        os.remove(CACHE_FILE)
+
+
+def test_topology_cache(cache_file):
+    model_hash = compute_model_hash(MASTER_FILE)
+    _compile()
+    assert load_topology(cache_file, model_hash, dss) is None
+    save_topology(cache_file, model_hash, read_topology(dss))
+    buses = OpenDSS.CreateBusObjects()
+    elements, _ = OpenDSS.CreateDssObjects(buses)
+    # Create all objects from this circuit.
+    buses = dict(buses)
+    elements = dict(elements)
+    for element in elements.values():
+        getattr(element, "sBus", None)
+
+    _compile()
+    assert load_topology(cache_file, "other model", dss) is None
+    topology = load_topology(cache_file, model_hash, dss)
+    assert topology is not None
+    cached_buses = OpenDSS.CreateBusObjects(topology)
+    cached_elements, _ = OpenDSS.CreateDssObjects(cached_buses, topology)
+
+    assert cached_buses.keys() == buses.keys()
+    for name, bus in buses.items():
+        assert _get_attributes(cached_buses[name]) == _get_attributes(bus)
+    assert cached_elements.keys() == elements.keys()
+    for name, element in elements.items():
+        cached_element = cached_elements[name]
+        assert type(cached_element) is type(element)
+        assert _get_attributes(cached_element) == _get_attributes(element)
+        for cached_bus, bus in zip(getattr(cached_element, "sBus", []), getattr(element, "sBus", [])):
+            assert _get_attributes(cached_bus) == _get_attributes(bus)
+
+    load = next(x for x in cached_elements.values() if x.FullName.startswith("Load."))
+    assert load.GetValue("kW") == elements[load.FullName].GetValue("kW")